@@ -10,7 +10,7 @@ import threading
 from pathlib import Path
 from typing import Any
 from contextlib import contextmanager
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
 
 
 class DatabaseConfig:
@@ -118,6 +118,23 @@ class DatabaseManager:
             rows = cursor.fetchall()
             return [dict(row) for row in rows] if rows else []
 
+    def fetch_iter(
+        self,
+        sql: str,
+        params: tuple[Any, ...] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[dict[str, Any]]:
+        """流式查询多条记录（按批次从游标读取，避免一次性加载全部结果）"""
+        sql = sql.replace('%s', '?')
+        with self.get_cursor() as cursor:
+            cursor.execute(sql, params or ())
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+
     def init_database(self) -> None:
         """初始化数据库（创建表）"""
         with self._lock:
@@ -352,6 +369,21 @@ class DatabaseManager:
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
             """,
+            # 分析问题表
+            """
+            CREATE TABLE IF NOT EXISTS analysis_issues (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                report_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                anomaly_id TEXT NOT NULL,
+                anomaly_type TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                count INTEGER DEFAULT 1,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
             # 测试场景表
             """
             CREATE TABLE IF NOT EXISTS test_scenarios (
@@ -49,6 +49,7 @@ from .system import (
     ChatSessionRepository,
     ChatMessageRepository,
     SystemConfigRepository,
+    LLMCacheRepository,
 )
 
 __all__ = [
@@ -70,4 +71,5 @@ __all__ = [
     'HealthCheckExecutionRepository', 'HealthCheckResultRepository',
     # System
     'ChatSessionRepository', 'ChatMessageRepository', 'SystemConfigRepository',
+    'LLMCacheRepository',
 ]
@@ -2,6 +2,7 @@
 监控相关 Repository：洞察、生产请求、健康检查
 """
 
+import json
 from datetime import datetime
 from typing import Any
 
@@ -324,7 +325,39 @@ class ProductionRequestRepository(BaseRepository[ProductionRequest]):
             data["last_check_status"],
             data["consecutive_failures"],
         )
-        return self.db.execute(sql, params)
+        affected = self.db.execute(sql, params)
+        self._save_tags(data["request_id"], data["tags"])
+        return affected
+
+    def _save_tags(self, request_id: str, tags: str | None) -> None:
+        """同步单个请求的标签关联（tags 为 JSON 数组文本）"""
+        try:
+            values = json.loads(tags) if tags else []
+        except json.JSONDecodeError:
+            values = []
+        self.sync_tags({request_id: values if isinstance(values, list) else []})
+
+    def sync_tags(self, tags_by_request: dict[str, list[Any]]) -> None:
+        """
+        批量同步请求标签关联表
+
+        先删除这些请求已有的标签关联，再批量写入新标签（去重、忽略非字符串标签）
+        """
+        if not tags_by_request:
+            return
+        self.db.execute_many(
+            "DELETE FROM request_tags WHERE request_id = %s",
+            [(request_id,) for request_id in tags_by_request]
+        )
+        params_list = [
+            (request_id, tag)
+            for request_id, tags in tags_by_request.items()
+            for tag in dict.fromkeys(tags)
+            if isinstance(tag, str)
+        ]
+        if params_list:
+            sql = "INSERT INTO request_tags (request_id, tag) VALUES (%s, %s)"
+            self.db.execute_many(sql, params_list)
 
     def get_by_id(self, request_id: str) -> ProductionRequest | None:
         """根据ID获取请求"""
@@ -347,7 +380,10 @@ class ProductionRequestRepository(BaseRepository[ProductionRequest]):
         params = [updates[key] for key in validated_fields] + [request_id]
 
         sql = f"UPDATE production_requests SET {', '.join(set_clauses)} WHERE request_id = %s"
-        return self.db.execute(sql, tuple(params))
+        affected = self.db.execute(sql, tuple(params))
+        if affected and "tags" in updates:
+            self._save_tags(request_id, updates["tags"])
+        return affected
 
     def update_check_status(
         self, request_id: str, status: str, increment_failures: bool = False
@@ -2,6 +2,7 @@
 系统相关 Repository：会话、消息、配置
 """
 
+import time
 from datetime import datetime
 from typing import Any
 
@@ -181,3 +182,56 @@ class SystemConfigRepository:
         """列出所有配置"""
         sql = "SELECT * FROM system_configs ORDER BY config_key"
         return self.db.fetch_all(sql)
+
+
+# =====================================================
+# LLM 响应缓存仓库
+# =====================================================
+
+class LLMCacheRepository:
+    """LLM 响应缓存仓库"""
+
+    table_name = "llm_cache"
+
+    # 过期清理的最小间隔（秒），写入时按此间隔顺带清理，避免缓存表无限增长
+    PURGE_INTERVAL_SECONDS = 3600
+    # 上次清理时间（进程内共享）
+    _last_purge_at = float("-inf")
+
+    def __init__(self, db: DatabaseManager | None = None) -> None:
+        self.db = db or get_db_manager()
+
+    def get(self, cache_key: str, ttl_hours: float = 24) -> str | None:
+        """获取未过期的缓存响应"""
+        sql = """
+            SELECT response FROM llm_cache
+            WHERE cache_key = %s
+            AND created_at >= datetime('now', %s)
+        """
+        result = self.db.fetch_one(sql, (cache_key, f"-{ttl_hours} hours"))
+        return result['response'] if result else None
+
+    def set(self, cache_key: str, response: str, ttl_hours: float = 24) -> None:
+        """写入缓存响应（已存在则覆盖），并按间隔清理超过 ttl_hours 的过期缓存"""
+        self._purge_if_due(ttl_hours)
+        sql = """
+            INSERT INTO llm_cache (cache_key, response, created_at)
+            VALUES (%s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                response = excluded.response,
+                created_at = CURRENT_TIMESTAMP
+        """
+        self.db.execute(sql, (cache_key, response))
+
+    def _purge_if_due(self, ttl_hours: float) -> None:
+        """距上次清理超过 PURGE_INTERVAL_SECONDS 时清理过期缓存"""
+        now = time.monotonic()
+        if now - LLMCacheRepository._last_purge_at < self.PURGE_INTERVAL_SECONDS:
+            return
+        LLMCacheRepository._last_purge_at = now
+        self.purge_expired(ttl_hours)
+
+    def purge_expired(self, ttl_hours: float = 24) -> int:
+        """清理过期缓存"""
+        sql = "DELETE FROM llm_cache WHERE created_at < datetime('now', %s)"
+        return self.db.execute(sql, (f"-{ttl_hours} hours",))
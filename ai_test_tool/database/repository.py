@@ -32,4 +32,5 @@ from .repositories import (  # noqa: F401
     ChatSessionRepository,
     ChatMessageRepository,
     SystemConfigRepository,
+    LLMCacheRepository,
 )
@@ -259,6 +259,24 @@ CREATE INDEX IF NOT EXISTS idx_analysis_reports_task_id ON analysis_reports(task
 CREATE INDEX IF NOT EXISTS idx_analysis_reports_report_type ON analysis_reports(report_type);
 CREATE INDEX IF NOT EXISTS idx_analysis_reports_severity ON analysis_reports(severity);
 
+-- 分析问题表（异常报告中的单条异常，按报告批量写入）
+CREATE TABLE IF NOT EXISTS analysis_issues (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    anomaly_id TEXT NOT NULL,
+    anomaly_type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    count INTEGER DEFAULT 1,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (task_id) REFERENCES analysis_tasks(task_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_issues_report_id ON analysis_issues(report_id);
+CREATE INDEX IF NOT EXISTS idx_analysis_issues_task_id ON analysis_issues(task_id);
+CREATE INDEX IF NOT EXISTS idx_analysis_issues_severity ON analysis_issues(severity);
+
 -- =====================================================
 -- 测试场景表
 -- =====================================================
@@ -442,6 +460,9 @@ CREATE INDEX IF NOT EXISTS idx_test_cases_endpoint_enabled ON test_cases(endpoin
 -- 优化执行结果统计查询
 CREATE INDEX IF NOT EXISTS idx_test_results_exec_status ON test_results(execution_id, status);
 
+-- 优化按用例统计近期失败率（覆盖索引）
+CREATE INDEX IF NOT EXISTS idx_test_results_case_executed_status ON test_results(case_id, executed_at, status);
+
 -- 优化请求状态码分析
 CREATE INDEX IF NOT EXISTS idx_parsed_requests_task_status ON parsed_requests(task_id, http_status);
 
@@ -492,6 +513,14 @@ CREATE TABLE IF NOT EXISTS system_configs (
 );
 CREATE INDEX IF NOT EXISTS idx_system_configs_key ON system_configs(config_key);
 
+-- LLM 响应缓存表（按提示词哈希缓存幂等提示词的生成结果）
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache(created_at);
+
 -- =====================================================
 -- 线上监控表
 -- =====================================================
@@ -522,6 +551,20 @@ CREATE INDEX IF NOT EXISTS idx_production_requests_is_enabled ON production_requ
 CREATE INDEX IF NOT EXISTS idx_production_requests_source ON production_requests(source);
 CREATE INDEX IF NOT EXISTS idx_production_requests_last_check_status ON production_requests(last_check_status);
 
+-- 监控请求标签关联表（按标签筛选时走索引，tags 列保留原始 JSON）
+CREATE TABLE IF NOT EXISTS request_tags (
+    request_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (request_id, tag),
+    FOREIGN KEY (request_id) REFERENCES production_requests(request_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_request_tags_tag ON request_tags(tag);
+-- 从 tags 列回填已有请求的标签（幂等）
+INSERT OR IGNORE INTO request_tags (request_id, tag)
+SELECT pr.request_id, t.value FROM production_requests pr, json_each(pr.tags) t
+WHERE json_valid(pr.tags) AND json_type(pr.tags) = 'array' AND t.type = 'text';
+
 -- AI 洞察表
 CREATE TABLE IF NOT EXISTS ai_insights (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -578,4 +621,6 @@ CREATE TABLE IF NOT EXISTS health_check_results (
 CREATE INDEX IF NOT EXISTS idx_health_check_results_execution_id ON health_check_results(execution_id);
 CREATE INDEX IF NOT EXISTS idx_health_check_results_request_id ON health_check_results(request_id);
 CREATE INDEX IF NOT EXISTS idx_health_check_results_success ON health_check_results(success);
+-- 失败统计（success = 0 AND checked_at >= ?）使用的覆盖索引
+CREATE INDEX IF NOT EXISTS idx_health_check_results_success_checked_at ON health_check_results(success, checked_at, request_id);
 CREATE INDEX IF NOT EXISTS idx_health_check_results_checked_at ON health_check_results(checked_at);
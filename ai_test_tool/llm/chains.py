@@ -18,6 +18,7 @@ from .prompts import (
     TEST_CASE_GENERATION_PROMPT,
     TEST_CASE_GENERATION_WITH_RAG_PROMPT,
     RESULT_VALIDATION_PROMPT,
+    RESULT_BATCH_VALIDATION_PROMPT,
     LOG_DIAGNOSIS_PROMPT,
     API_DOC_COMPARISON_PROMPT,
     KNOWLEDGE_EXTRACTION_PROMPT,
@@ -292,6 +293,71 @@ class ResultValidatorChain(BaseChain):
         )
         return self._parse_json_response(self._call_llm(prompt, "结果验证"))
 
+    def batch_validate(self, cases: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        批量验证测试结果
+
+        所有用例合并到一个Prompt中，只调用一次LLM；
+        批量响应无法解析时退回逐个调用 validate_response。
+
+        Args:
+            cases: 用例列表，每项包含 test_case、actual_response、expected_response
+
+        Returns:
+            与 cases 顺序一致的列表，每项包含 test_case_id 和 validation
+        """
+        if not cases:
+            return []
+
+        validations = self._parse_batch_response(
+            self._call_llm(self._build_batch_prompt(cases), "批量结果验证"), len(cases)
+        )
+        if validations is None:
+            self.logger.warn("批量验证响应解析失败，改为逐个验证")
+            validations = [
+                self.validate_response(
+                    case.get("test_case", {}),
+                    case.get("actual_response", {}),
+                    case.get("expected_response"),
+                )
+                for case in cases
+            ]
+
+        return [
+            {"test_case_id": case.get("test_case", {}).get("id"), "validation": validation}
+            for case, validation in zip(cases, validations)
+        ]
+
+    def _build_batch_prompt(self, cases: list[dict[str, Any]]) -> str:
+        """构建批量验证Prompt"""
+        blocks: list[str] = []
+        for i, case in enumerate(cases, 1):
+            blocks.append(
+                f"## 用例 {i}\n"
+                f"### 测试用例\n```json\n"
+                f"{json.dumps(case.get('test_case', {}), ensure_ascii=False, indent=2)}\n```\n"
+                f"### 实际响应\n```json\n"
+                f"{json.dumps(case.get('actual_response', {}), ensure_ascii=False, indent=2)}\n```\n"
+                f"### 预期响应\n```json\n"
+                f"{json.dumps(case.get('expected_response') or {}, ensure_ascii=False, indent=2)}\n```"
+            )
+        return RESULT_BATCH_VALIDATION_PROMPT.format(
+            count=len(cases), cases="\n\n".join(blocks)
+        )
+
+    def _parse_batch_response(
+        self, response: str, expected: int
+    ) -> list[dict[str, Any]] | None:
+        """解析批量验证响应，元素数量不符时返回None"""
+        result = self._parse_json_response(response)
+        if isinstance(result, dict):
+            result = result.get("data", result.get("validations"))
+        if not isinstance(result, list) or len(result) != expected:
+            return None
+        if not all(isinstance(item, dict) for item in result):
+            return None
+        return result
+
 
 class CurlGeneratorChain(BaseChain):
     """Curl命令生成Chain（纯代码实现，不依赖LLM）"""
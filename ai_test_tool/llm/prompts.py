@@ -257,6 +257,29 @@ RESULT_VALIDATION_PROMPT = """你是一位测试专家，请验证以下测试
 请验证："""
 
 
+# 批量结果验证Prompt - 一次调用验证多个失败用例
+RESULT_BATCH_VALIDATION_PROMPT = """你是一位测试专家，请验证以下{count}个失败的测试用例，分析失败原因并给出改进建议。
+
+{cases}
+
+## 输出格式
+**重要：你必须且只能输出一个有效的JSON数组，按用例顺序每个用例对应一个元素，不要输出任何其他内容。**
+
+```json
+[
+  {{
+    "test_case_id": "用例ID",
+    "passed": true/false,
+    "score": 0-100,
+    "issues": ["发现的问题"],
+    "suggestions": ["改进建议"]
+  }}
+]
+```
+
+请直接输出JSON数组："""
+
+
 # Curl命令生成Prompt（保留但标记为可选，用于调试）
 CURL_GENERATION_PROMPT = """请根据以下请求信息生成curl命令（仅用于调试目的）。
 
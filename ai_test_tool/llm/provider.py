@@ -55,6 +55,11 @@ class LLMProvider(ABC):
         self._chat_model: Any = None
         _setup_langchain_debug(config.debug)
     
+    @property
+    def cache_signature(self) -> str:
+        """缓存签名：提供商与模型，用于区分不同模型生成的缓存结果"""
+        return f"{self.config.provider}:{self.config.model}"
+    
     @abstractmethod
     def get_llm(self) -> BaseLLM:
         """获取LLM实例"""
@@ -75,6 +80,29 @@ class LLMProvider(ABC):
         chat_model = self.get_chat_model()
         response = chat_model.invoke(_convert_messages(messages))
         return response.content
+    
+    def batch_generate(
+        self, prompts: list[str], batch_size: int = 8, **kwargs: Any
+    ) -> list[str]:
+        """
+        批量生成文本
+        
+        按提示词长度排序后分组提交，使同一批次内的长度接近、减少填充浪费；
+        返回结果与输入顺序一致
+        """
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+        results: list[str] = [""] * len(prompts)
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            outputs = self._generate_chunk([prompts[i] for i in chunk], **kwargs)
+            for i, output in zip(chunk, outputs):
+                results[i] = output
+        return results
+    
+    def _generate_chunk(self, prompts: list[str], **kwargs: Any) -> list[str]:
+        """提交一个批次的提示词"""
+        llm = self.get_llm()
+        return llm.batch(prompts)
 
 
 class OllamaProvider(LLMProvider):
@@ -167,6 +195,12 @@ class AnthropicProvider(LLMProvider):
     def generate(self, prompt: str, **kwargs: Any) -> str:
         """Claude使用chat接口生成"""
         return self.chat([{"role": "user", "content": prompt}], **kwargs)
+    
+    def _generate_chunk(self, prompts: list[str], **kwargs: Any) -> list[str]:
+        """Claude使用chat接口批量生成"""
+        chat_model = self.get_chat_model()
+        responses = chat_model.batch([[HumanMessage(content=p)] for p in prompts])
+        return [r.content for r in responses]
 
 
 # 提供商注册表
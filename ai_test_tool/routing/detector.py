@@ -5,7 +5,9 @@
 """
 
 import re
+import json
 import logging
+from itertools import islice
 from typing import Any
 from dataclasses import dataclass, field
 
@@ -30,11 +32,15 @@ class DetectionRule:
     description: str = ""
 
     def __post_init__(self):
-        # 编译正则表达式
+        self.compile()
+
+    def compile(self) -> None:
+        """预编译正则表达式并预先转换关键词为小写，匹配时不再重复处理"""
         self._compiled_patterns = [
             re.compile(p, re.IGNORECASE | re.MULTILINE)
             for p in self.patterns
         ]
+        self._keywords_lower = [kw.lower() for kw in self.keywords]
 
 
 class ScenarioDetector:
@@ -240,11 +246,8 @@ class ScenarioDetector:
 
         # 编译所有规则的正则表达式
         for rule in self.rules:
-            if not hasattr(rule, '_compiled_patterns'):
-                rule._compiled_patterns = [
-                    re.compile(p, re.IGNORECASE | re.MULTILINE)
-                    for p in rule.patterns
-                ]
+            if not hasattr(rule, '_compiled_patterns') or not hasattr(rule, '_keywords_lower'):
+                rule.compile()
 
     def detect(
         self,
@@ -312,8 +315,8 @@ class ScenarioDetector:
         for rule in self.rules:
             # 检查关键词
             keyword_hits = sum(
-                1 for kw in rule.keywords
-                if kw.lower() in hint_lower
+                1 for kw in rule._keywords_lower
+                if kw in hint_lower
             )
 
             if keyword_hits > 0:
@@ -347,8 +350,8 @@ class ScenarioDetector:
 
             # 1. 关键词匹配
             keyword_hits = 0
-            for kw in rule.keywords:
-                count = content_lower.count(kw.lower())
+            for kw in rule._keywords_lower:
+                count = content_lower.count(kw)
                 if count > 0:
                     keyword_hits += min(count, 10)  # 限制单个关键词贡献
 
@@ -363,10 +366,15 @@ class ScenarioDetector:
                 ))
 
             # 2. 正则模式匹配
+            # 模式得分在 10 次命中时饱和，匹配方法只比较模式与关键词命中数，
+            # 因此计数到 hit_cap 即可停止扫描，结果与完整计数一致
             pattern_hits = 0
+            hit_cap = max(10, keyword_hits + 1)
             for pattern in rule._compiled_patterns:
-                matches = pattern.findall(content)
-                pattern_hits += len(matches)
+                # 只计数，不构建匹配结果列表
+                pattern_hits += sum(1 for _ in islice(pattern.finditer(content), hit_cap - pattern_hits))
+                if pattern_hits >= hit_cap:
+                    break
 
             if pattern_hits > 0:
                 pattern_score = min(1.0, pattern_hits / 10)
@@ -585,7 +593,6 @@ class ScenarioDetector:
             llm_response = self.llm_provider.generate(prompt)
 
             # 解析响应
-            import json
             # 尝试从响应中提取 JSON
             response_text = llm_response.strip()
             if response_text.startswith('```'):
@@ -645,10 +652,7 @@ class ScenarioDetector:
 
     def add_rule(self, rule: DetectionRule) -> None:
         """添加自定义规则"""
-        rule._compiled_patterns = [
-            re.compile(p, re.IGNORECASE | re.MULTILINE)
-            for p in rule.patterns
-        ]
+        rule.compile()
         self.rules.append(rule)
 
     def remove_rule(self, scenario_type: ScenarioType) -> int:
@@ -41,7 +41,7 @@ class MatchMethod(str, Enum):
     COMPOSITE = "composite"     # 组合匹配
 
 
-@dataclass
+@dataclass(slots=True)
 class ScenarioIndicator:
     """场景指标 - 用于场景识别的信号"""
     name: str                               # 指标名称
@@ -54,7 +54,7 @@ class ScenarioIndicator:
         return self.value * self.weight
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisScenario:
     """
     分析场景
@@ -90,13 +90,21 @@ class AnalysisScenario:
             "metadata": self.metadata
         }
 
+    def to_summary_dict(self) -> dict[str, Any]:
+        """精简表示（用于分析响应）"""
+        return {
+            "type": self.scenario_type.value,
+            "confidence": self.confidence,
+            "description": self.description
+        }
+
 
 # 策略处理函数类型
 StrategyHandler = Callable[[dict[str, Any]], dict[str, Any]]
 AsyncStrategyHandler = Callable[[dict[str, Any]], Coroutine[Any, Any, dict[str, Any]]]
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisStrategy:
     """
     分析策略
@@ -136,8 +144,16 @@ class AnalysisStrategy:
             "tags": self.tags
         }
 
+    def to_summary_dict(self) -> dict[str, Any]:
+        """精简表示（用于分析响应）"""
+        return {
+            "id": self.strategy_id,
+            "name": self.name,
+            "priority": self.priority.name
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class RouteDecision:
     """
     路由决策结果
@@ -180,6 +196,15 @@ class RouteDecision:
             "strategy_count": self.strategy_count
         }
 
+    def to_summary_dict(self) -> dict[str, Any]:
+        """精简表示（用于分析响应）"""
+        return {
+            "detected_scenarios": [s.to_summary_dict() for s in self.scenarios],
+            "primary_scenario": self.primary_scenario.scenario_type.value if self.primary_scenario else None,
+            "selected_strategies": [s.to_summary_dict() for s in self.selected_strategies],
+            "reasoning": self.reasoning
+        }
+
 
 @dataclass
 class AnalysisContext:
@@ -220,7 +245,7 @@ class AnalysisContext:
         return self.shared_data.get(key, default)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisResult:
     """
     分析结果
@@ -245,3 +270,14 @@ class AnalysisResult:
             "execution_time_ms": self.execution_time_ms,
             "metadata": self.metadata
         }
+
+    def to_summary_dict(self) -> dict[str, Any]:
+        """精简表示（用于分析响应）"""
+        return {
+            "strategy_id": self.strategy_id,
+            "scenario_type": self.scenario_type.value,
+            "success": self.success,
+            "execution_time_ms": self.execution_time_ms,
+            "data": self.data,
+            "error_message": self.error_message
+        }
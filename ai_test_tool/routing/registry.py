@@ -5,6 +5,7 @@
 """
 
 import logging
+from collections import Counter
 from typing import Any, Callable
 from functools import wraps
 
@@ -37,6 +38,12 @@ class StrategyRegistry:
     def __init__(self):
         self._strategies: dict[str, AnalysisStrategy] = {}
         self._scenario_index: dict[ScenarioType, list[str]] = {}
+        # 策略字典列表缓存（None 表示全部策略），注册/注销时失效
+        self._dicts_cache: dict[ScenarioType | None, list[dict[str, Any]]] = {}
+        # 统计计数，注册/注销时增量维护
+        self._priority_counts: Counter[str] = Counter()
+        self._llm_required_count = 0
+        self._async_count = 0
 
     @classmethod
     def get_instance(cls) -> "StrategyRegistry":
@@ -57,10 +64,13 @@ class StrategyRegistry:
         Args:
             strategy: 分析策略实例
         """
-        if strategy.strategy_id in self._strategies:
+        existing = self._strategies.get(strategy.strategy_id)
+        if existing is not None:
             logger.warning(f"策略 {strategy.strategy_id} 已存在，将被覆盖")
+            self._update_counts(existing, -1)
 
         self._strategies[strategy.strategy_id] = strategy
+        self._update_counts(strategy, 1)
 
         # 更新场景索引
         for scenario_type in strategy.scenario_types:
@@ -68,6 +78,7 @@ class StrategyRegistry:
                 self._scenario_index[scenario_type] = []
             if strategy.strategy_id not in self._scenario_index[scenario_type]:
                 self._scenario_index[scenario_type].append(strategy.strategy_id)
+        self._dicts_cache.clear()
 
         logger.debug(f"注册策略: {strategy.strategy_id} -> {[s.value for s in strategy.scenario_types]}")
 
@@ -85,16 +96,28 @@ class StrategyRegistry:
             return False
 
         strategy = self._strategies.pop(strategy_id)
+        self._update_counts(strategy, -1)
 
         # 更新场景索引
         for scenario_type in strategy.scenario_types:
             if scenario_type in self._scenario_index:
                 if strategy_id in self._scenario_index[scenario_type]:
                     self._scenario_index[scenario_type].remove(strategy_id)
+        self._dicts_cache.clear()
 
         logger.debug(f"注销策略: {strategy_id}")
         return True
 
+    def _update_counts(self, strategy: AnalysisStrategy, delta: int) -> None:
+        """增量更新统计计数"""
+        self._priority_counts[strategy.priority.name] += delta
+        if not self._priority_counts[strategy.priority.name]:
+            del self._priority_counts[strategy.priority.name]
+        if strategy.requires_llm:
+            self._llm_required_count += delta
+        if strategy.is_async:
+            self._async_count += delta
+
     def get(self, strategy_id: str) -> AnalysisStrategy | None:
         """获取策略"""
         return self._strategies.get(strategy_id)
@@ -163,6 +186,30 @@ class StrategyRegistry:
         strategies.sort(key=lambda s: s.priority.value, reverse=True)
         return strategies
 
+    def get_strategy_dicts(
+        self,
+        scenario_type: ScenarioType | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        获取策略字典列表（带缓存）
+
+        结果在注册表变更前保持不变，返回的是共享列表，调用方不应修改
+
+        Args:
+            scenario_type: 场景类型（None 表示全部策略）
+
+        Returns:
+            策略字典列表
+        """
+        cached = self._dicts_cache.get(scenario_type)
+        if cached is None:
+            if scenario_type is None:
+                strategies = self.get_all()
+            else:
+                strategies = self.find_by_scenario_type(scenario_type)
+            cached = self._dicts_cache[scenario_type] = [s.to_dict() for s in strategies]
+        return cached
+
     def find_by_tags(self, tags: list[str]) -> list[AnalysisStrategy]:
         """
         根据标签查找策略
@@ -182,22 +229,18 @@ class StrategyRegistry:
         return matched
 
     def get_statistics(self) -> dict[str, Any]:
-        """获取注册表统计信息"""
-        scenario_counts: dict[str, int] = {}
-        for scenario_type, strategy_ids in self._scenario_index.items():
-            scenario_counts[scenario_type.value] = len(strategy_ids)
-
-        priority_counts: dict[str, int] = {}
-        for strategy in self._strategies.values():
-            priority_name = strategy.priority.name
-            priority_counts[priority_name] = priority_counts.get(priority_name, 0) + 1
+        """获取注册表统计信息（基于增量计数，不遍历策略）"""
+        scenario_counts = {
+            scenario_type.value: len(strategy_ids)
+            for scenario_type, strategy_ids in self._scenario_index.items()
+        }
 
         return {
             "total_strategies": len(self._strategies),
             "scenario_coverage": scenario_counts,
-            "priority_distribution": priority_counts,
-            "llm_required_count": sum(1 for s in self._strategies.values() if s.requires_llm),
-            "async_count": sum(1 for s in self._strategies.values() if s.is_async)
+            "priority_distribution": dict(self._priority_counts),
+            "llm_required_count": self._llm_required_count,
+            "async_count": self._async_count
         }
 
     @property
@@ -6,7 +6,9 @@
 
 import asyncio
 import logging
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 from .models import (
@@ -43,7 +45,8 @@ class IntelligentRouter:
         llm_provider: Any = None,
         max_strategies: int = 3,
         enable_fallback: bool = True,
-        default_timeout: int = 60
+        default_timeout: int = 60,
+        max_workers: int = 8
     ):
         """
         初始化智能路由器
@@ -55,18 +58,25 @@ class IntelligentRouter:
             max_strategies: 最多执行的策略数量
             enable_fallback: 是否启用回退策略
             default_timeout: 默认超时时间（秒）
+            max_workers: 策略并发执行线程池大小（所有调用共享）
         """
-        self.registry = registry or get_registry()
+        self.registry = registry if registry is not None else get_registry()
         self.detector = detector or ScenarioDetector(llm_provider=llm_provider)
         self.llm_provider = llm_provider
         self.max_strategies = max_strategies
         self.enable_fallback = enable_fallback
         self.default_timeout = default_timeout
+        self.max_workers = max_workers
 
-        # 统计信息
+        # 策略执行线程池：首次并发执行时创建，跨调用复用，close() 时释放
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+        # 统计信息（路由器可被多个线程共享，计数在锁内更新）
         self._route_count = 0
         self._success_count = 0
         self._fallback_count = 0
+        self._stats_lock = threading.Lock()
 
     def route(
         self,
@@ -74,7 +84,8 @@ class IntelligentRouter:
         requests: list[dict[str, Any]] | None = None,
         metrics: dict[str, float] | None = None,
         user_hint: str = "",
-        options: dict[str, Any] | None = None
+        options: dict[str, Any] | None = None,
+        pre_detected: list[AnalysisScenario] | None = None
     ) -> RouteDecision:
         """
         路由决策
@@ -87,20 +98,25 @@ class IntelligentRouter:
             metrics: 统计指标
             user_hint: 用户提示
             options: 额外选项
+            pre_detected: 已识别的场景（提供时跳过场景识别）
 
         Returns:
             路由决策结果
         """
-        self._route_count += 1
+        with self._stats_lock:
+            self._route_count += 1
         options = options or {}
 
         # 1. 场景识别
-        scenarios = self.detector.detect(
-            log_content=log_content,
-            requests=requests,
-            metrics=metrics,
-            user_hint=user_hint
-        )
+        if pre_detected is not None:
+            scenarios = list(pre_detected)
+        else:
+            scenarios = self.detector.detect(
+                log_content=log_content,
+                requests=requests,
+                metrics=metrics,
+                user_hint=user_hint
+            )
 
         if not scenarios:
             logger.warning("未识别到任何分析场景")
@@ -138,7 +154,8 @@ class IntelligentRouter:
             if fallback_strategy:
                 selected_strategies.append(fallback_strategy)
                 reasoning_parts.append(f"使用回退策略: {fallback_strategy.name}")
-                self._fallback_count += 1
+                with self._stats_lock:
+                    self._fallback_count += 1
 
         # 4. 构建决策结果
         decision = RouteDecision(
@@ -179,17 +196,44 @@ class IntelligentRouter:
             )]
 
         results: list[AnalysisResult] = []
+        strategies = decision.selected_strategies
+        execute_all = context.get_option("execute_all", False)
+
+        if not execute_all or len(strategies) <= 1:
+            # 未开启 execute_all 时始终顺序执行并在首个成功结果处停止：
+            # 已开始的策略无法取消，并发会让低优先级的 LLM 策略白白消耗调用
+            for strategy in strategies:
+                result = self._execute_strategy(strategy, context)
+                results.append(result)
+
+                # 如果策略执行成功，可以选择跳过后续策略
+                if result.success and not execute_all:
+                    break
+        else:
+            # 执行全部策略时，策略多为 LLM 调用（I/O 密集），在共享线程池中并发执行，
+            # 单次调用最多 max_parallel 个在途；按优先级顺序收集结果
+            max_parallel = max(1, context.get_option("max_parallel", 4))
+            executor = self._get_executor()
+            futures: list[Future] = [
+                executor.submit(self._execute_strategy, strategy, context)
+                for strategy in strategies[:max_parallel]
+            ]
+            try:
+                for i in range(len(strategies)):
+                    results.append(futures[i].result())
+                    next_index = i + max_parallel
+                    if next_index < len(strategies):
+                        futures.append(
+                            executor.submit(self._execute_strategy, strategies[next_index], context)
+                        )
+            finally:
+                for future in futures:
+                    future.cancel()
 
-        for strategy in decision.selected_strategies:
-            result = self._execute_strategy(strategy, context)
-            results.append(result)
-
-            # 如果策略执行成功，可以选择跳过后续策略
-            if result.success and not context.get_option("execute_all", False):
-                break
-
-        if results:
-            self._success_count += sum(1 for r in results if r.success)
+        success_count = sum(1 for r in results if r.success)
+        if success_count:
+            with self._stats_lock:
+                self._success_count += success_count
 
         return results
 
@@ -255,7 +299,8 @@ class IntelligentRouter:
         metrics: dict[str, float] | None = None,
         user_hint: str = "",
         options: dict[str, Any] | None = None,
-        task_id: str = ""
+        task_id: str = "",
+        pre_detected: list[AnalysisScenario] | None = None
     ) -> tuple[RouteDecision, list[AnalysisResult]]:
         """
         一站式路由和执行
@@ -267,6 +312,7 @@ class IntelligentRouter:
             user_hint: 用户提示
             options: 选项
             task_id: 任务ID
+            pre_detected: 已识别的场景（提供时跳过场景识别）
 
         Returns:
             (路由决策, 执行结果列表)
@@ -277,7 +323,8 @@ class IntelligentRouter:
             requests=requests,
             metrics=metrics,
             user_hint=user_hint,
-            options=options
+            options=options,
+            pre_detected=pre_detected
         )
 
         # 2. 构建上下文
@@ -302,7 +349,8 @@ class IntelligentRouter:
         metrics: dict[str, float] | None = None,
         user_hint: str = "",
         options: dict[str, Any] | None = None,
-        task_id: str = ""
+        task_id: str = "",
+        pre_detected: list[AnalysisScenario] | None = None
     ) -> tuple[RouteDecision, list[AnalysisResult]]:
         """异步版本的一站式路由和执行"""
         decision = self.route(
@@ -310,7 +358,8 @@ class IntelligentRouter:
             requests=requests,
             metrics=metrics,
             user_hint=user_hint,
-            options=options
+            options=options,
+            pre_detected=pre_detected
         )
 
         context = AnalysisContext(
@@ -468,21 +517,44 @@ class IntelligentRouter:
 
         return None
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取共享的策略执行线程池"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="strategy"
+                    )
+        return self._executor
+
+    def close(self) -> None:
+        """释放策略执行线程池（已提交的策略继续执行完毕；之后再次并发执行时会重新创建）"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
     def get_statistics(self) -> dict[str, Any]:
         """获取路由器统计信息"""
+        with self._stats_lock:
+            route_count = self._route_count
+            success_count = self._success_count
+            fallback_count = self._fallback_count
         return {
-            "total_routes": self._route_count,
-            "successful_executions": self._success_count,
-            "fallback_uses": self._fallback_count,
-            "success_rate": self._success_count / self._route_count if self._route_count > 0 else 0,
+            "total_routes": route_count,
+            "successful_executions": success_count,
+            "fallback_uses": fallback_count,
+            "success_rate": success_count / route_count if route_count > 0 else 0,
             "registry_stats": self.registry.get_statistics()
         }
 
     def reset_statistics(self) -> None:
         """重置统计信息"""
-        self._route_count = 0
-        self._success_count = 0
-        self._fallback_count = 0
+        with self._stats_lock:
+            self._route_count = 0
+            self._success_count = 0
+            self._fallback_count = 0
 
 
 # 便捷函数
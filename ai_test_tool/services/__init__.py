@@ -7,7 +7,7 @@ from .endpoint_test_generator import EndpointTestGeneratorService
 from .production_monitor import ProductionMonitorService
 from .log_anomaly_detector import LogAnomalyDetectorService
 from .ai_assistant import AIAssistantService
-from .intelligent_analysis import IntelligentAnalysisService
+from .intelligent_analysis import IntelligentAnalysisService, RequestTable
 
 __all__ = [
     "EndpointTestGeneratorService",
@@ -15,4 +15,5 @@ __all__ = [
     "LogAnomalyDetectorService",
     "AIAssistantService",
     "IntelligentAnalysisService",
+    "RequestTable",
 ]
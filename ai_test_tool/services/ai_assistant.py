@@ -5,18 +5,23 @@
 
 import json
 import hashlib
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+from operator import itemgetter
 
 from ..database import get_db_manager
+from ..database.repository import LLMCacheRepository
 from ..llm.provider import get_llm_provider, LLMProvider
 from ..llm.chains import LogAnalysisChain, ReportGeneratorChain
 from ..utils.logger import get_logger
 
 
-class InsightType(Enum):
+class InsightType(str, Enum):
     """洞察类型"""
     API_CHANGE = "api_change"              # 接口变更检测
     PERFORMANCE_TREND = "performance_trend"  # 性能趋势分析
@@ -26,7 +31,7 @@ class InsightType(Enum):
     COVERAGE_GAP = "coverage_gap"          # 覆盖率缺口
 
 
-@dataclass
+@dataclass(slots=True)
 class AIInsight:
     """AI 洞察"""
     insight_id: str
@@ -40,6 +45,42 @@ class AIInsight:
     created_at: datetime = field(default_factory=datetime.now)
 
 
+_get_method_path_name = itemgetter('method', 'path', 'name')
+
+
+@dataclass
+class _TrendStats:
+    """单个接口的流式性能统计（只保留计算趋势所需的少量样本）"""
+    count: int = 0
+    total_ms: float = 0.0
+    error_count: int = 0
+    head: list[float] = field(default_factory=list)  # 最早的两个样本
+    recent: deque[float] = field(default_factory=lambda: deque(maxlen=5))
+
+    def add(self, response_time: float, status: str) -> None:
+        self.count += 1
+        self.total_ms += response_time
+        if len(self.head) < 2:
+            self.head.append(response_time)
+        self.recent.append(response_time)
+        if status in ('failed', 'error'):
+            self.error_count += 1
+
+    def older_avg(self) -> float | None:
+        """最近5次之前的平均响应时间；恰好5次时取最早两次"""
+        if self.count > 5:
+            return (self.total_ms - sum(self.recent)) / (self.count - 5)
+        if self.head:
+            return sum(self.head) / len(self.head)
+        return None
+
+
+def _endpoint_fingerprint(ep: dict[str, Any]) -> bytes:
+    """计算接口定义的指纹，用于快速判断新旧接口是否完全一致"""
+    canonical = json.dumps(ep, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=8).digest()
+
+
 class AIAssistantService:
     """
     AI 智能助手服务
@@ -52,10 +93,15 @@ class AIAssistantService:
     5. 代码生成 - 生成测试代码、Mock 数据等
     """
     
-    def __init__(self, verbose: bool = False):
+    # LLM 响应缓存有效期（小时）
+    LLM_CACHE_TTL_HOURS = 24
+    
+    def __init__(self, verbose: bool = False, use_llm_cache: bool = True):
         self.logger = get_logger(verbose)
         self.verbose = verbose
         self.db = get_db_manager()
+        self.use_llm_cache = use_llm_cache
+        self._llm_cache = LLMCacheRepository(self.db)
         self._provider: LLMProvider | None = None
     
     @property
@@ -65,6 +111,60 @@ class AIAssistantService:
             self._provider = get_llm_provider()
         return self._provider
     
+    def _prompt_key(self, prompt: str) -> str:
+        """提示词缓存键（包含提供商与模型，切换模型后不复用旧结果）"""
+        signature = f"{self.provider.cache_signature}\n{prompt}"
+        return hashlib.blake2b(signature.encode(), digest_size=16).hexdigest()
+    
+    def _cache_get(self, key: str) -> str | None:
+        """读取 LLM 缓存，缓存不可用时视为未命中"""
+        try:
+            return self._llm_cache.get(key, self.LLM_CACHE_TTL_HOURS)
+        except Exception as e:
+            self.logger.warn(f"读取LLM缓存失败: {e}")
+            return None
+    
+    def _cache_set(self, key: str, response: str) -> None:
+        """写入 LLM 缓存，写入失败不影响生成结果"""
+        try:
+            self._llm_cache.set(key, response, self.LLM_CACHE_TTL_HOURS)
+        except Exception as e:
+            self.logger.warn(f"写入LLM缓存失败: {e}")
+    
+    def _generate(self, prompt: str) -> str:
+        """
+        调用 LLM 生成文本
+        
+        提示词由数据库状态确定性构建，相同提示词直接复用缓存结果
+        """
+        if not self.use_llm_cache:
+            return self.provider.generate(prompt)
+        
+        key = self._prompt_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.logger.debug(f"命中LLM缓存: {key}")
+            return cached
+        
+        response = self.provider.generate(prompt)
+        self._cache_set(key, response)
+        return response
+    
+    def _batch_generate(self, prompts: list[str]) -> list[str]:
+        """批量调用 LLM，仅提交未命中缓存的提示词"""
+        if not self.use_llm_cache:
+            return self.provider.batch_generate(prompts)
+        
+        keys = [self._prompt_key(p) for p in prompts]
+        results: list[str | None] = [self._cache_get(key) for key in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            responses = self.provider.batch_generate([prompts[i] for i in missing])
+            for i, response in zip(missing, responses):
+                results[i] = response
+                self._cache_set(keys[i], response)
+        return results  # type: ignore[return-value]
+    
     # ==================== 功能1: 接口变更检测 ====================
     
     def detect_api_changes(
@@ -86,20 +186,20 @@ class AIAssistantService:
         
         insights: list[AIInsight] = []
         
-        old_map = {f"{e['method']}:{e['path']}": e for e in old_endpoints}
-        new_map = {f"{e['method']}:{e['path']}": e for e in new_endpoints}
+        old_map = {(e['method'], e['path']): e for e in old_endpoints}
+        new_map = {(e['method'], e['path']): e for e in new_endpoints}
         
         old_keys = set(old_map.keys())
         new_keys = set(new_map.keys())
         
         # 新增接口
         added = new_keys - old_keys
-        for key in added:
-            ep = new_map[key]
+        for method, path in added:
+            ep = new_map[(method, path)]
             insights.append(AIInsight(
-                insight_id=hashlib.md5(f"added:{key}".encode()).hexdigest()[:16],
+                insight_id=hashlib.md5(f"added:{method}:{path}".encode()).hexdigest()[:16],
                 insight_type=InsightType.API_CHANGE,
-                title=f"新增接口: {ep['method']} {ep['path']}",
+                title=f"新增接口: {method} {path}",
                 description=f"发现新增接口 {ep.get('name', '')}",
                 severity="medium",
                 confidence=1.0,
@@ -109,12 +209,12 @@ class AIAssistantService:
         
         # 删除接口
         removed = old_keys - new_keys
-        for key in removed:
-            ep = old_map[key]
+        for method, path in removed:
+            ep = old_map[(method, path)]
             insights.append(AIInsight(
-                insight_id=hashlib.md5(f"removed:{key}".encode()).hexdigest()[:16],
+                insight_id=hashlib.md5(f"removed:{method}:{path}".encode()).hexdigest()[:16],
                 insight_type=InsightType.API_CHANGE,
-                title=f"删除接口: {ep['method']} {ep['path']}",
+                title=f"删除接口: {method} {path}",
                 description=f"接口 {ep.get('name', '')} 已被删除",
                 severity="high",
                 confidence=1.0,
@@ -122,19 +222,23 @@ class AIAssistantService:
                 recommendations=["确认删除是否符合预期", "检查是否有依赖此接口的功能", "更新相关测试用例"]
             ))
         
-        # 修改接口
+        # 修改接口（先用指纹过滤掉完全未变化的接口，只对有差异的接口做详细比较）
         common = old_keys & new_keys
-        for key in common:
-            old_ep = old_map[key]
-            new_ep = new_map[key]
+        changed = [
+            key for key in common
+            if _endpoint_fingerprint(old_map[key]) != _endpoint_fingerprint(new_map[key])
+        ]
+        for method, path in changed:
+            old_ep = old_map[(method, path)]
+            new_ep = new_map[(method, path)]
             
             changes = self._compare_endpoints(old_ep, new_ep)
             if changes:
                 severity = "high" if any(c.get("breaking") for c in changes) else "medium"
                 insights.append(AIInsight(
-                    insight_id=hashlib.md5(f"modified:{key}".encode()).hexdigest()[:16],
+                    insight_id=hashlib.md5(f"modified:{method}:{path}".encode()).hexdigest()[:16],
                     insight_type=InsightType.API_CHANGE,
-                    title=f"修改接口: {new_ep['method']} {new_ep['path']}",
+                    title=f"修改接口: {method} {path}",
                     description=f"接口 {new_ep.get('name', '')} 发生变更: {', '.join(c['field'] for c in changes)}",
                     severity=severity,
                     confidence=1.0,
@@ -207,14 +311,7 @@ class AIAssistantService:
                 })
         
         # 比较请求体
-        old_body = old_ep.get('request_body', {})
-        new_body = new_ep.get('request_body', {})
-        if isinstance(old_body, str):
-            old_body = json.loads(old_body) if old_body else {}
-        if isinstance(new_body, str):
-            new_body = json.loads(new_body) if new_body else {}
-        
-        if old_body != new_body:
+        if self._json_field_changed(old_ep.get('request_body', {}), new_ep.get('request_body', {})):
             changes.append({
                 "field": "request_body",
                 "type": "modified",
@@ -223,14 +320,7 @@ class AIAssistantService:
             })
         
         # 比较响应
-        old_responses = old_ep.get('responses', {})
-        new_responses = new_ep.get('responses', {})
-        if isinstance(old_responses, str):
-            old_responses = json.loads(old_responses) if old_responses else {}
-        if isinstance(new_responses, str):
-            new_responses = json.loads(new_responses) if new_responses else {}
-        
-        if old_responses != new_responses:
+        if self._json_field_changed(old_ep.get('responses', {}), new_ep.get('responses', {})):
             changes.append({
                 "field": "responses",
                 "type": "modified",
@@ -240,6 +330,20 @@ class AIAssistantService:
         
         return changes
     
+    def _json_field_changed(self, old_value: Any, new_value: Any) -> bool:
+        """
+        比较 JSON 字段是否变化
+        
+        原始值为相同字符串时直接判定未变化，无需解析和递归比较
+        """
+        if isinstance(old_value, str) and isinstance(new_value, str) and old_value == new_value:
+            return False
+        if isinstance(old_value, str):
+            old_value = json.loads(old_value) if old_value else {}
+        if isinstance(new_value, str):
+            new_value = json.loads(new_value) if new_value else {}
+        return old_value != new_value
+    
     def _normalize_params(self, params: Any) -> dict[str, dict]:
         """规范化参数列表为字典"""
         if isinstance(params, str):
@@ -252,20 +356,26 @@ class AIAssistantService:
         """根据变更生成建议"""
         recommendations: list[str] = []
         
-        has_breaking = any(c.get("breaking") for c in changes)
+        # 单次遍历收集各类变更标记
+        has_breaking = has_param = has_body = has_response = False
+        for c in changes:
+            if c.get("breaking"):
+                has_breaking = True
+            field_name = c['field']
+            if field_name.startswith('parameter:'):
+                has_param = True
+            elif field_name == 'request_body':
+                has_body = True
+            elif field_name == 'responses':
+                has_response = True
+        
         if has_breaking:
             recommendations.append("此变更可能影响现有功能，建议进行回归测试")
-        
-        param_changes = [c for c in changes if c['field'].startswith('parameter:')]
-        if param_changes:
+        if has_param:
             recommendations.append("更新相关测试用例的参数")
-        
-        body_changes = [c for c in changes if c['field'] == 'request_body']
-        if body_changes:
+        if has_body:
             recommendations.append("检查请求体结构变化是否兼容")
-        
-        response_changes = [c for c in changes if c['field'] == 'responses']
-        if response_changes:
+        if has_response:
             recommendations.append("更新响应断言")
         
         return recommendations
@@ -302,7 +412,7 @@ class AIAssistantService:
                 AND tr.executed_at >= datetime('now', '-' || %s || ' days')
                 ORDER BY tr.executed_at
             """
-            results = self.db.fetch_all(sql, (f"{endpoint_id}%", days))
+            rows = self.db.fetch_iter(sql, (f"{endpoint_id}%", days))
         else:
             sql = """
                 SELECT tc.case_id, tc.method, tc.url, tr.actual_response_time_ms,
@@ -312,38 +422,33 @@ class AIAssistantService:
                 WHERE tr.executed_at >= datetime('now', '-' || %s || ' days')
                 ORDER BY tr.executed_at
             """
-            results = self.db.fetch_all(sql, (days,))
-        
-        if not results:
+            rows = self.db.fetch_iter(sql, (days,))
+        
+        # 按接口流式聚合，内存占用与接口数量相关而非结果行数
+        endpoint_stats: dict[tuple[str, str], _TrendStats] = {}
+        for r in rows:
+            key = (r['method'], r['url'])
+            stats = endpoint_stats.get(key)
+            if stats is None:
+                stats = endpoint_stats[key] = _TrendStats()
+            stats.add(float(r['actual_response_time_ms'] or 0), r['status'])
+        
+        if not endpoint_stats:
             self.logger.warn("没有足够的执行数据进行分析")
             return insights
         
-        # 按接口分组分析
-        from collections import defaultdict
-        endpoint_data: dict[str, list] = defaultdict(list)
-        
-        for r in results:
-            key = f"{r['method']}:{r['url']}"
-            endpoint_data[key].append({
-                "response_time": float(r['actual_response_time_ms'] or 0),
-                "status": r['status'],
-                "executed_at": r['executed_at']
-            })
-        
-        for endpoint_key, data in endpoint_data.items():
-            if len(data) < 5:  # 数据太少
+        for (method, url), stats in endpoint_stats.items():
+            if stats.count < 5:  # 数据太少
                 continue
             
-            # 计算趋势
-            times = [d['response_time'] for d in data]
-            recent = times[-5:]
-            older = times[:-5] if len(times) > 5 else times[:len(times)//2]
+            endpoint_key = f"{method}:{url}"
             
-            if not older:
+            # 计算趋势
+            older_avg = stats.older_avg()
+            if older_avg is None:
                 continue
             
-            recent_avg = sum(recent) / len(recent)
-            older_avg = sum(older) / len(older)
+            recent_avg = sum(stats.recent) / len(stats.recent)
             
             # 性能下降检测
             if recent_avg > older_avg * 1.5 and recent_avg > 1000:  # 响应时间增加50%且超过1秒
@@ -351,7 +456,7 @@ class AIAssistantService:
                 insights.append(AIInsight(
                     insight_id=hashlib.md5(f"perf_degraded:{endpoint_key}".encode()).hexdigest()[:16],
                     insight_type=InsightType.PERFORMANCE_TREND,
-                    title=f"性能下降: {endpoint_key.split(':')[1][:50]}",
+                    title=f"性能下降: {url[:50]}",
                     description=f"接口响应时间从 {older_avg:.0f}ms 增加到 {recent_avg:.0f}ms (+{change_pct:.0f}%)",
                     severity="high" if change_pct > 100 else "medium",
                     confidence=0.8,
@@ -374,7 +479,7 @@ class AIAssistantService:
                 insights.append(AIInsight(
                     insight_id=hashlib.md5(f"perf_improved:{endpoint_key}".encode()).hexdigest()[:16],
                     insight_type=InsightType.PERFORMANCE_TREND,
-                    title=f"性能改善: {endpoint_key.split(':')[1][:50]}",
+                    title=f"性能改善: {url[:50]}",
                     description=f"接口响应时间从 {older_avg:.0f}ms 降低到 {recent_avg:.0f}ms (-{change_pct:.0f}%)",
                     severity="low",
                     confidence=0.8,
@@ -387,22 +492,22 @@ class AIAssistantService:
                 ))
             
             # 错误率分析
-            error_count = sum(1 for d in data if d['status'] in ['failed', 'error'])
-            error_rate = error_count / len(data)
+            error_count = stats.error_count
+            error_rate = error_count / stats.count
             
             if error_rate > 0.1:  # 错误率超过10%
                 insights.append(AIInsight(
                     insight_id=hashlib.md5(f"error_rate:{endpoint_key}".encode()).hexdigest()[:16],
                     insight_type=InsightType.RISK_ASSESSMENT,
-                    title=f"高错误率: {endpoint_key.split(':')[1][:50]}",
-                    description=f"接口错误率 {error_rate:.0%} ({error_count}/{len(data)})",
+                    title=f"高错误率: {url[:50]}",
+                    description=f"接口错误率 {error_rate:.0%} ({error_count}/{stats.count})",
                     severity="high" if error_rate > 0.3 else "medium",
                     confidence=0.9,
                     details={
                         "endpoint": endpoint_key,
                         "error_rate": error_rate,
                         "error_count": error_count,
-                        "total_count": len(data)
+                        "total_count": stats.count
                     },
                     recommendations=[
                         "检查错误日志定位问题",
@@ -427,22 +532,30 @@ class AIAssistantService:
         
         insights: list[AIInsight] = []
         
-        # 1. 检查测试覆盖率缺口
-        coverage_insights = self._analyze_coverage_gaps()
-        insights.extend(coverage_insights)
-        
-        # 2. 分析高风险接口
-        risk_insights = self._analyze_high_risk_endpoints()
-        insights.extend(risk_insights)
-        
-        # 3. 推荐优先测试的接口
-        priority_insights = self._get_priority_recommendations()
-        insights.extend(priority_insights)
+        # 三项分析查询互相独立，并发执行（每个线程使用独立的数据库连接）
+        analyses = (
+            self._analyze_coverage_gaps,        # 1. 检查测试覆盖率缺口
+            self._analyze_high_risk_endpoints,  # 2. 分析高风险接口
+            self._get_priority_recommendations,  # 3. 推荐优先测试的接口
+        )
+        with ThreadPoolExecutor(
+            max_workers=len(analyses), thread_name_prefix="recommendation"
+        ) as executor:
+            futures = [executor.submit(self._run_in_worker, analyze) for analyze in analyses]
+            for future in futures:
+                insights.extend(future.result())
         
         self.logger.end_step(f"生成 {len(insights)} 条建议")
         
         return insights
     
+    def _run_in_worker(self, analyze: Callable[[], list[AIInsight]]) -> list[AIInsight]:
+        """在工作线程中执行分析，结束后关闭该线程的数据库连接"""
+        try:
+            return analyze()
+        finally:
+            self.db.close()
+    
     def analyze_coverage_gaps(self) -> list[AIInsight]:
         """分析测试覆盖率缺口（公开方法）"""
         self.logger.start_step("分析覆盖率缺口")
@@ -462,30 +575,34 @@ class AIAssistantService:
         insights: list[AIInsight] = []
         
         # 获取没有测试用例的接口（通过 case_id 前缀匹配）
+        # 只取前20条展示，总数通过窗口函数随每行返回
         sql = """
-            SELECT e.endpoint_id, e.method, e.path, e.name
+            SELECT e.endpoint_id, e.method, e.path, e.name,
+                   COUNT(*) OVER () AS total
             FROM api_endpoints e
             WHERE NOT EXISTS (
                 SELECT 1 FROM test_cases tc WHERE tc.case_id LIKE (e.endpoint_id || '%')
             )
             ORDER BY e.path
+            LIMIT 20
         """
         uncovered = self.db.fetch_all(sql)
         
         if uncovered:
+            total = uncovered[0]['total']
             insights.append(AIInsight(
-                insight_id=hashlib.md5(f"coverage_gap:{len(uncovered)}".encode()).hexdigest()[:16],
+                insight_id=hashlib.md5(f"coverage_gap:{total}".encode()).hexdigest()[:16],
                 insight_type=InsightType.COVERAGE_GAP,
-                title=f"发现 {len(uncovered)} 个接口未覆盖测试",
+                title=f"发现 {total} 个接口未覆盖测试",
                 description="以下接口没有对应的测试用例",
                 severity="medium",
                 confidence=1.0,
                 details={
                     "uncovered_endpoints": [
-                        {"method": e['method'], "path": e['path'], "name": e.get('name', '')}
-                        for e in uncovered[:20]
+                        {"method": method, "path": path, "name": name or ''}
+                        for method, path, name in map(_get_method_path_name, uncovered)
                     ],
-                    "total_uncovered": len(uncovered)
+                    "total_uncovered": total
                 },
                 recommendations=[
                     "为这些接口生成测试用例",
@@ -499,43 +616,42 @@ class AIAssistantService:
         """分析高风险接口"""
         insights: list[AIInsight] = []
         
-        # 获取最近失败率高的接口（从 test_results 和 test_cases 查询）
+        # 获取最近失败率超过20%的接口（从 test_results 和 test_cases 查询，过滤在 SQL 中完成）
         sql = """
             SELECT tc.case_id, tc.method, tc.url,
                    COUNT(*) as total,
-                   SUM(CASE WHEN tr.status IN ('failed', 'error') THEN 1 ELSE 0 END) as failures
+                   SUM(tr.status IN ('failed', 'error')) as failures
             FROM test_results tr
             JOIN test_cases tc ON tr.case_id = tc.case_id
             WHERE tr.executed_at >= datetime('now', '-7 days')
             GROUP BY tc.case_id, tc.method, tc.url
-            HAVING failures > 0
-            ORDER BY failures / total DESC
+            HAVING CAST(failures AS REAL) / total > 0.2
+            ORDER BY CAST(failures AS REAL) / total DESC
             LIMIT 10
         """
         high_risk = self.db.fetch_all(sql)
         
         for ep in high_risk:
             failure_rate = ep['failures'] / ep['total']
-            if failure_rate > 0.2:  # 失败率超过20%
-                insights.append(AIInsight(
-                    insight_id=hashlib.md5(f"high_risk:{ep['case_id']}".encode()).hexdigest()[:16],
-                    insight_type=InsightType.RISK_ASSESSMENT,
-                    title=f"高风险接口: {ep['method']} {ep['url'][:50]}",
-                    description=f"最近7天失败率 {failure_rate:.0%} ({ep['failures']}/{ep['total']})",
-                    severity="high" if failure_rate > 0.5 else "medium",
-                    confidence=0.9,
-                    details={
-                        "case_id": ep['case_id'],
-                        "failure_rate": failure_rate,
-                        "failures": ep['failures'],
-                        "total": ep['total']
-                    },
-                    recommendations=[
-                        "优先修复此接口的问题",
-                        "增加更多测试用例覆盖边界情况",
-                        "检查测试环境是否稳定"
-                    ]
-                ))
+            insights.append(AIInsight(
+                insight_id=hashlib.md5(f"high_risk:{ep['case_id']}".encode()).hexdigest()[:16],
+                insight_type=InsightType.RISK_ASSESSMENT,
+                title=f"高风险接口: {ep['method']} {ep['url'][:50]}",
+                description=f"最近7天失败率 {failure_rate:.0%} ({ep['failures']}/{ep['total']})",
+                severity="high" if failure_rate > 0.5 else "medium",
+                confidence=0.9,
+                details={
+                    "case_id": ep['case_id'],
+                    "failure_rate": failure_rate,
+                    "failures": ep['failures'],
+                    "total": ep['total']
+                },
+                recommendations=[
+                    "优先修复此接口的问题",
+                    "增加更多测试用例覆盖边界情况",
+                    "检查测试环境是否稳定"
+                ]
+            ))
         
         return insights
     
@@ -612,13 +728,75 @@ class AIAssistantService:
         if not endpoint:
             raise ValueError(f"接口不存在: {endpoint_id}")
         
+        prompt = self._build_mock_prompt(endpoint, count)
+        response = self._generate(prompt)
+        mock_data = self._parse_mock_response(response)
+        
+        self.logger.ai_end(f"生成 {len(mock_data)} 个Mock数据")
+        
+        return {
+            "endpoint_id": endpoint_id,
+            "method": endpoint['method'],
+            "path": endpoint['path'],
+            "mock_responses": mock_data
+        }
+    
+    def generate_mock_data_batch(
+        self,
+        endpoint_ids: list[str],
+        count: int = 5
+    ) -> list[dict[str, Any]]:
+        """
+        批量为多个接口生成 Mock 数据
+        
+        提示词通过 provider.batch_generate 分批提交（按长度排序打包）
+        
+        Args:
+            endpoint_ids: 接口ID列表
+            count: 每个接口的生成数量
+            
+        Returns:
+            Mock 数据列表，顺序与 endpoint_ids 一致
+        """
+        if not endpoint_ids:
+            return []
+        
+        self.logger.ai_start("批量生成Mock数据", f"{len(endpoint_ids)} 个接口")
+        
+        placeholders = ", ".join(["%s"] * len(endpoint_ids))
+        sql = f"SELECT * FROM api_endpoints WHERE endpoint_id IN ({placeholders})"
+        rows = self.db.fetch_all(sql, tuple(endpoint_ids))
+        endpoints = {row['endpoint_id']: row for row in rows}
+        
+        missing = [eid for eid in endpoint_ids if eid not in endpoints]
+        if missing:
+            raise ValueError(f"接口不存在: {', '.join(missing)}")
+        
+        prompts = [self._build_mock_prompt(endpoints[eid], count) for eid in endpoint_ids]
+        responses = self._batch_generate(prompts)
+        
+        results: list[dict[str, Any]] = []
+        for eid, response in zip(endpoint_ids, responses):
+            endpoint = endpoints[eid]
+            results.append({
+                "endpoint_id": eid,
+                "method": endpoint['method'],
+                "path": endpoint['path'],
+                "mock_responses": self._parse_mock_response(response)
+            })
+        
+        self.logger.ai_end(f"完成 {len(results)} 个接口的Mock数据生成")
+        
+        return results
+    
+    def _build_mock_prompt(self, endpoint: dict[str, Any], count: int) -> str:
+        """构建 Mock 数据生成提示词"""
         # 解析响应定义
         responses = endpoint.get('responses', {})
         if isinstance(responses, str):
             responses = json.loads(responses) if responses else {}
         
-        # 构建提示词
-        prompt = f"""根据以下接口定义，生成 {count} 个符合规范的 Mock 响应数据。
+        return f"""根据以下接口定义，生成 {count} 个符合规范的 Mock 响应数据。
 
 接口信息：
 - 方法: {endpoint['method']}
@@ -636,29 +814,18 @@ class AIAssistantService:
 3. 数据多样化，覆盖不同场景
 
 只返回 JSON 数组，不要其他说明："""
-        
-        response = self.provider.generate(prompt)
-        
-        # 解析响应
+    
+    def _parse_mock_response(self, response: str) -> list[Any]:
+        """解析 Mock 数据生成结果"""
         try:
             # 尝试提取 JSON
             import re
             json_match = re.search(r'\[[\s\S]*\]', response)
             if json_match:
-                mock_data = json.loads(json_match.group(0))
-            else:
-                mock_data = json.loads(response)
+                return json.loads(json_match.group(0))
+            return json.loads(response)
         except json.JSONDecodeError:
-            mock_data = [{"error": "生成失败", "raw_response": response[:500]}]
-        
-        self.logger.ai_end(f"生成 {len(mock_data)} 个Mock数据")
-        
-        return {
-            "endpoint_id": endpoint_id,
-            "method": endpoint['method'],
-            "path": endpoint['path'],
-            "mock_responses": mock_data
-        }
+            return [{"error": "生成失败", "raw_response": response[:500]}]
     
     def generate_test_code(
         self,
@@ -723,7 +890,7 @@ class AIAssistantService:
 
 只返回代码，不要其他说明："""
         
-        code = self.provider.generate(prompt)
+        code = self._generate(prompt)
         
         # 清理代码（移除 markdown 代码块标记）
         import re
@@ -774,7 +941,7 @@ class AIAssistantService:
 
 请提供清晰、准确、有帮助的回答。如果问题涉及具体数据，请基于上述统计信息回答。"""
         
-        answer = self.provider.generate(prompt)
+        answer = self._generate(prompt)
         
         self.logger.ai_end("回答完成")
         
@@ -3,20 +3,72 @@
 根据导入的接口文档，为每个接口自动生成完整的测试用例
 """
 
+import copy
 import json
 import hashlib
+import queue
+import threading
+from collections import Counter
+from collections.abc import Callable
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 from dataclasses import dataclass, field
 from datetime import datetime
 
 from ..database import get_db_manager
+from ..database.repository import LLMCacheRepository
 from ..database.models import ApiEndpoint, TestCaseRecord, TestCaseCategory, TestCasePriority
 from ..llm.chains import TestCaseGeneratorChain
 from ..llm.provider import get_llm_provider
 from ..utils.logger import get_logger
 
 
-@dataclass
+# 默认生成的测试类型
+_DEFAULT_TEST_TYPES: tuple[str, ...] = ("normal", "boundary", "exception", "security")
+# 携带请求体的 HTTP 方法
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+# JSON 请求头模板（用例之间不共享同一个 dict，使用时复制）
+_JSON_HEADERS: dict[str, str] = {"Content-Type": "application/json"}
+# 安全测试载荷
+_SQL_PAYLOADS: tuple[str, ...] = ("' OR '1'='1", "1; DROP TABLE users--", "1 UNION SELECT * FROM users")
+_XSS_PAYLOAD = "<script>alert('xss')</script>"
+
+# 复用的 JSON 编码器：json.dumps 传入非默认参数时每次都会新建编码器
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=False).encode
+_EMPTY_JSON_OBJECT = "{}"
+
+# 用例插入语句：固定文本让 sqlite3 连接的语句缓存命中，免去重复解析
+_INSERT_CASE_SQL = """
+    INSERT OR IGNORE INTO test_cases
+    (case_id, endpoint_id, name, description, category, priority,
+     method, url, headers, body, query_params, expected_status_code,
+     expected_response, max_response_time_ms, tags, is_enabled)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# 示例值查找表：类型优先于格式，日期类格式依赖当前时间
+_TYPE_SAMPLES: dict[str, str] = {"integer": "1", "number": "1.0", "boolean": "true"}
+_FORMAT_SAMPLES: dict[str, str] = {
+    "email": "test@example.com",
+    "uuid": "550e8400-e29b-41d4-a716-446655440000",
+}
+_DATE_FORMATTERS: dict[str, Callable[[datetime], str]] = {
+    "date": lambda now: now.strftime('%Y-%m-%d'),
+    "date-time": datetime.isoformat,
+}
+# 请求体字段示例值（array/object 每次生成新实例）
+_BODY_TYPE_SAMPLES: dict[str, Callable[[str], Any]] = {
+    "string": lambda name: f"test_{name}",
+    "integer": lambda name: 1,
+    "number": lambda name: 1.0,
+    "boolean": lambda name: True,
+    "array": lambda name: [],
+    "object": lambda name: {},
+}
+
+
+@dataclass(slots=True)
 class GeneratedTestCase:
     """生成的测试用例"""
     name: str
@@ -44,18 +96,51 @@ class EndpointTestGeneratorService:
     4. 支持批量生成和单接口生成
     """
     
-    def __init__(self, verbose: bool = False):
+    # AI 用例缓存有效期（小时）
+    AI_CASE_CACHE_TTL_HOURS = 24
+    # 批量 IN 查询的分批大小
+    QUERY_CHUNK_SIZE = 500
+    # 批量生成时每次写库的行数
+    SAVE_BATCH_SIZE = 500
+    # 视为"覆盖充分"所需的各类型规则用例数（ai_only_when_sparse 开启时生效）
+    SUFFICIENT_RULE_CASES: dict[str, int] = {
+        "normal": 1,
+        "boundary": 3,
+        "exception": 3,
+        "security": 3,
+    }
+    
+    def __init__(
+        self,
+        verbose: bool = False,
+        use_ai_cache: bool = True,
+        max_workers: int = 8,
+        ai_only_when_sparse: bool = False,
+        max_llm_concurrency: int | None = None
+    ):
         self.logger = get_logger(verbose)
         self.verbose = verbose
+        self.max_workers = max(1, max_workers)
+        # 规则用例已充分覆盖所有测试类型时跳过 AI 生成
+        self.ai_only_when_sparse = ai_only_when_sparse
         self.db = get_db_manager()
         self._llm_chain: TestCaseGeneratorChain | None = None
+        self._llm_lock = threading.Lock()
+        # 限制同时进行的 LLM 调用数，避免并发生成时触发服务端限流
+        self._llm_semaphore = threading.BoundedSemaphore(max(1, max_llm_concurrency or self.max_workers))
+        self.use_ai_cache = use_ai_cache
+        self._llm_cache = LLMCacheRepository(self.db)
+        # 进程内缓存：cache_key -> LLM 返回的 test_cases 原始数据
+        self._ai_cache: dict[str, list[dict[str, Any]]] = {}
     
     @property
     def llm_chain(self) -> TestCaseGeneratorChain:
-        """懒加载 LLM Chain"""
+        """懒加载 LLM Chain（并发生成时所有线程共享同一实例）"""
         if self._llm_chain is None:
-            provider = get_llm_provider()
-            self._llm_chain = TestCaseGeneratorChain(provider, self.verbose)
+            with self._llm_lock:
+                if self._llm_chain is None:
+                    provider = get_llm_provider()
+                    self._llm_chain = TestCaseGeneratorChain(provider, self.verbose)
         return self._llm_chain
     
     def generate_for_endpoint(
@@ -115,40 +200,72 @@ class EndpointTestGeneratorService:
         """
         self.logger.start_step("批量生成测试用例")
         
-        # 获取接口列表
+        # 获取接口列表：需要跳过已有用例的接口时，先按轻量列过滤，
+        # 只为剩余接口加载完整定义（parameters/request_body/responses）
         if endpoint_ids:
             # 根据指定的 endpoint_ids 获取
-            endpoints = [self._get_endpoint(eid) for eid in endpoint_ids]
-            endpoints = [e for e in endpoints if e is not None]
+            candidates = [{'endpoint_id': eid} for eid in dict.fromkeys(endpoint_ids)]
+            if skip_existing:
+                candidates = self._filter_endpoints_without_cases(candidates)
+            endpoints = self._get_endpoints_by_ids([c['endpoint_id'] for c in candidates])
+        elif skip_existing:
+            candidates = self._filter_endpoints_without_cases(
+                self._get_all_endpoints(tag_filter, summary_only=True)
+            )
+            endpoints = self._get_endpoints_by_ids([c['endpoint_id'] for c in candidates])
         else:
             endpoints = self._get_all_endpoints(tag_filter)
         
-        if skip_existing:
-            # 过滤掉已有测试用例的接口
-            endpoints = self._filter_endpoints_without_cases(endpoints)
-        
         total = len(endpoints)
         success_count = 0
         failed_count = 0
         total_cases = 0
         errors: list[str] = []
+        case_counts: dict[str, int] = {}
         
-        for i, endpoint in enumerate(endpoints):
-            try:
-                self.logger.debug(f"处理接口 {i+1}/{total}: {endpoint['method']} {endpoint['path']}")
-                
-                test_cases = self._generate_test_cases(endpoint, test_types, use_ai=use_ai)
-                
-                if save_to_db and test_cases:
-                    self._save_test_cases(endpoint['endpoint_id'], test_cases)
-                
-                success_count += 1
-                total_cases += len(test_cases)
-                
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"{endpoint['method']} {endpoint['path']}: {str(e)}")
-                self.logger.error(f"生成失败: {e}")
+        # 每个接口的生成主要耗时在 LLM 网络调用上，使用线程池并发生成；
+        # 保存交给单独的写入线程批量执行，生成与写库互不阻塞
+        writer = _CaseWriter(self, self.SAVE_BATCH_SIZE) if save_to_db else None
+        if writer:
+            writer.start()
+        try:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, total or 1),
+                thread_name_prefix="testcase-gen"
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        self._process_endpoint, endpoint, test_types, use_ai, writer
+                    ): endpoint
+                    for endpoint in endpoints
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    endpoint = futures[future]
+                    try:
+                        case_count = future.result()
+                        success_count += 1
+                        total_cases += case_count
+                        case_counts[endpoint['endpoint_id']] = case_count
+                        self.logger.debug(f"完成接口 {done}/{total}: {endpoint['method']} {endpoint['path']}")
+                    except Exception as e:
+                        failed_count += 1
+                        errors.append(f"{endpoint['method']} {endpoint['path']}: {str(e)}")
+                        self.logger.error(f"生成失败: {e}")
+        finally:
+            if writer:
+                writer.close()
+        
+        # 用例未能保存的接口不计为成功
+        if writer:
+            endpoint_map = {e['endpoint_id']: e for e in endpoints}
+            for endpoint_id, error in writer.failed_endpoints.items():
+                if endpoint_id in case_counts:
+                    success_count -= 1
+                    failed_count += 1
+                    total_cases -= case_counts.pop(endpoint_id)
+                endpoint = endpoint_map.get(endpoint_id)
+                label = f"{endpoint['method']} {endpoint['path']}" if endpoint else endpoint_id
+                errors.append(f"{label}: 保存失败: {error}")
         
         self.logger.end_step(f"完成: {success_count}个接口, {total_cases}个用例")
         
@@ -157,9 +274,27 @@ class EndpointTestGeneratorService:
             "success_count": success_count,
             "failed_count": failed_count,
             "total_cases_generated": total_cases,
+            "total_cases_saved": writer.saved_count if writer else 0,
             "errors": errors
         }
     
+    def _process_endpoint(
+        self,
+        endpoint: dict[str, Any],
+        test_types: list[str] | None,
+        use_ai: bool,
+        writer: "_CaseWriter | None"
+    ) -> int:
+        """在工作线程中为单个接口生成用例并提交写入队列，返回用例数量"""
+        try:
+            test_cases = self._generate_test_cases(endpoint, test_types, use_ai=use_ai)
+            if writer and test_cases:
+                writer.put(endpoint['endpoint_id'], test_cases)
+            return len(test_cases)
+        finally:
+            # 关闭工作线程的数据库连接
+            self.db.close()
+    
     def _generate_test_cases(
         self,
         endpoint: dict[str, Any],
@@ -167,7 +302,7 @@ class EndpointTestGeneratorService:
         use_ai: bool = True
     ) -> list[GeneratedTestCase]:
         """生成测试用例的核心逻辑"""
-        test_types = test_types or ["normal", "boundary", "exception", "security"]
+        test_types = test_types or list(_DEFAULT_TEST_TYPES)
         test_cases: list[GeneratedTestCase] = []
         
         # 1. 基于规则生成基础测试用例
@@ -175,6 +310,9 @@ class EndpointTestGeneratorService:
         test_cases.extend(rule_based_cases)
         
         # 2. 使用 AI 增强生成更智能的测试用例（如果启用）
+        if use_ai and self.ai_only_when_sparse and self._rule_cases_sufficient(rule_based_cases, test_types):
+            self.logger.debug(f"规则用例已覆盖充分，跳过 AI 生成: {endpoint['method']} {endpoint['path']}")
+            use_ai = False
         if use_ai:
             try:
                 ai_cases = self._generate_ai_cases(endpoint, test_types)
@@ -187,6 +325,18 @@ class EndpointTestGeneratorService:
         
         return test_cases
     
+    def _rule_cases_sufficient(
+        self,
+        rule_based_cases: list[GeneratedTestCase],
+        test_types: list[str]
+    ) -> bool:
+        """规则用例是否已覆盖所有请求的测试类型"""
+        coverage = Counter(case.category for case in rule_based_cases)
+        return all(
+            coverage[t] >= self.SUFFICIENT_RULE_CASES.get(t, 1)
+            for t in test_types
+        )
+    
     def _generate_rule_based_cases(
         self,
         endpoint: dict[str, Any],
@@ -195,17 +345,10 @@ class EndpointTestGeneratorService:
         """基于规则生成测试用例"""
         cases: list[GeneratedTestCase] = []
         
-        method = endpoint['method']
-        path = endpoint['path']
+        # JSON 字段已在 _parse_endpoint_row 中解析
         parameters = endpoint.get('parameters') or []
         request_body = endpoint.get('request_body') or {}
         
-        # 解析参数
-        if isinstance(parameters, str):
-            parameters = json.loads(parameters) if parameters else []
-        if isinstance(request_body, str):
-            request_body = json.loads(request_body) if request_body else {}
-        
         # 1. 正常场景测试
         if "normal" in test_types:
             cases.append(self._create_normal_case(endpoint, parameters, request_body))
@@ -236,16 +379,17 @@ class EndpointTestGeneratorService:
         
         # 生成正常的请求参数
         query_params = {}
-        headers = {"Content-Type": "application/json"}
+        headers = dict(_JSON_HEADERS)
         body = None
         
-        # 处理 query 参数
+        # 处理 query 参数（同一用例内共用一个当前时间）
+        now = datetime.now()
         for param in parameters:
             if param.get('in') == 'query':
-                query_params[param['name']] = self._generate_sample_value(param)
+                query_params[param['name']] = self._generate_sample_value(param, now)
         
         # 处理 request body
-        if request_body and method.upper() in ['POST', 'PUT', 'PATCH']:
+        if request_body and method.upper() in _BODY_METHODS:
             body = self._generate_request_body(request_body)
         
         return GeneratedTestCase(
@@ -309,7 +453,7 @@ class EndpointTestGeneratorService:
                         priority="medium",
                         method=method,
                         url=path,
-                        headers={"Content-Type": "application/json"},
+                        headers=dict(_JSON_HEADERS),
                         body={param_name: minimum} if param.get('in') == 'body' else None,
                         query_params={param_name: str(minimum)} if param.get('in') == 'query' else {},
                         expected_status_code=200,
@@ -324,7 +468,7 @@ class EndpointTestGeneratorService:
                         priority="medium",
                         method=method,
                         url=path,
-                        headers={"Content-Type": "application/json"},
+                        headers=dict(_JSON_HEADERS),
                         body={param_name: maximum} if param.get('in') == 'body' else None,
                         query_params={param_name: str(maximum)} if param.get('in') == 'query' else {},
                         expected_status_code=200,
@@ -344,7 +488,7 @@ class EndpointTestGeneratorService:
                     priority="medium",
                     method=method,
                     url=path,
-                    headers={"Content-Type": "application/json"},
+                    headers=dict(_JSON_HEADERS),
                     body={param_name: ""} if param.get('in') == 'body' else None,
                     query_params={param_name: ""} if param.get('in') == 'query' else {},
                     expected_status_code=400 if schema.get('required') else 200,
@@ -360,7 +504,7 @@ class EndpointTestGeneratorService:
                         priority="medium",
                         method=method,
                         url=path,
-                        headers={"Content-Type": "application/json"},
+                        headers=dict(_JSON_HEADERS),
                         body={param_name: "x" * (max_length + 10)} if param.get('in') == 'body' else None,
                         query_params={param_name: "x" * (max_length + 10)} if param.get('in') == 'query' else {},
                         expected_status_code=400,
@@ -390,8 +534,8 @@ class EndpointTestGeneratorService:
                 priority="high",
                 method=method,
                 url=path,
-                headers={"Content-Type": "application/json"},
-                body={} if method.upper() in ['POST', 'PUT', 'PATCH'] else None,
+                headers=dict(_JSON_HEADERS),
+                body={} if method.upper() in _BODY_METHODS else None,
                 query_params={},
                 expected_status_code=400,
                 assertions=[
@@ -401,7 +545,7 @@ class EndpointTestGeneratorService:
             ))
         
         # 2. 类型错误
-        for param in parameters[:3]:
+        for param in islice(parameters, 3):
             param_name = param.get('name', '')
             schema = param.get('schema', param)
             param_type = schema.get('type', 'string')
@@ -415,7 +559,7 @@ class EndpointTestGeneratorService:
                     priority="high",
                     method=method,
                     url=path,
-                    headers={"Content-Type": "application/json"},
+                    headers=dict(_JSON_HEADERS),
                     body={param_name: "not_a_number"} if param.get('in') == 'body' else None,
                     query_params={param_name: "not_a_number"} if param.get('in') == 'query' else {},
                     expected_status_code=400,
@@ -423,22 +567,21 @@ class EndpointTestGeneratorService:
                 ))
         
         # 3. 无效的 HTTP 方法
-        invalid_methods = ['DELETE', 'PATCH'] if method.upper() == 'GET' else ['GET']
-        for invalid_method in invalid_methods[:1]:
-            cases.append(GeneratedTestCase(
-                name=f"异常 - 无效HTTP方法 {invalid_method}",
-                description=f"测试使用 {invalid_method} 方法请求接口",
-                category="exception",
-                priority="low",
-                method=invalid_method,
-                url=path,
-                headers={"Content-Type": "application/json"},
-                expected_status_code=405,
-                tags=["exception", "method-not-allowed"]
-            ))
+        invalid_method = 'DELETE' if method.upper() == 'GET' else 'GET'
+        cases.append(GeneratedTestCase(
+            name=f"异常 - 无效HTTP方法 {invalid_method}",
+            description=f"测试使用 {invalid_method} 方法请求接口",
+            category="exception",
+            priority="low",
+            method=invalid_method,
+            url=path,
+            headers=dict(_JSON_HEADERS),
+            expected_status_code=405,
+            tags=["exception", "method-not-allowed"]
+        ))
         
         # 4. 空请求体（对于需要body的接口）
-        if method.upper() in ['POST', 'PUT', 'PATCH'] and request_body:
+        if method.upper() in _BODY_METHODS and request_body:
             cases.append(GeneratedTestCase(
                 name=f"异常 - 空请求体",
                 description="测试请求体为空的情况",
@@ -446,7 +589,7 @@ class EndpointTestGeneratorService:
                 priority="high",
                 method=method,
                 url=path,
-                headers={"Content-Type": "application/json"},
+                headers=dict(_JSON_HEADERS),
                 body={},
                 expected_status_code=400,
                 tags=["exception", "empty-body"]
@@ -466,8 +609,8 @@ class EndpointTestGeneratorService:
         path = endpoint['path']
         
         # 1. SQL 注入测试
-        sql_payloads = ["' OR '1'='1", "1; DROP TABLE users--", "1 UNION SELECT * FROM users"]
-        for param in parameters[:2]:
+        sql_payload = _SQL_PAYLOADS[0]
+        for param in islice(parameters, 2):
             param_name = param.get('name', '')
             cases.append(GeneratedTestCase(
                 name=f"安全 - SQL注入 {param_name}",
@@ -476,9 +619,9 @@ class EndpointTestGeneratorService:
                 priority="high",
                 method=method,
                 url=path,
-                headers={"Content-Type": "application/json"},
-                body={param_name: sql_payloads[0]} if param.get('in') == 'body' else None,
-                query_params={param_name: sql_payloads[0]} if param.get('in') == 'query' else {},
+                headers=dict(_JSON_HEADERS),
+                body={param_name: sql_payload} if param.get('in') == 'body' else None,
+                query_params={param_name: sql_payload} if param.get('in') == 'query' else {},
                 expected_status_code=400,
                 assertions=[
                     {"type": "status_code", "operator": "in", "expected": [400, 403, 200]},
@@ -488,8 +631,7 @@ class EndpointTestGeneratorService:
             ))
         
         # 2. XSS 测试
-        xss_payload = "<script>alert('xss')</script>"
-        for param in parameters[:2]:
+        for param in islice(parameters, 2):
             param_name = param.get('name', '')
             schema = param.get('schema', param)
             if schema.get('type') == 'string':
@@ -500,9 +642,9 @@ class EndpointTestGeneratorService:
                     priority="high",
                     method=method,
                     url=path,
-                    headers={"Content-Type": "application/json"},
-                    body={param_name: xss_payload} if param.get('in') == 'body' else None,
-                    query_params={param_name: xss_payload} if param.get('in') == 'query' else {},
+                    headers=dict(_JSON_HEADERS),
+                    body={param_name: _XSS_PAYLOAD} if param.get('in') == 'body' else None,
+                    query_params={param_name: _XSS_PAYLOAD} if param.get('in') == 'query' else {},
                     expected_status_code=200,
                     assertions=[
                         {"type": "response_body", "operator": "not_contains", "expected": "<script>"}
@@ -547,15 +689,21 @@ class EndpointTestGeneratorService:
             "responses": endpoint.get('responses', {})
         }
         
-        # 调用 LLM 生成
-        result = self.llm_chain.generate_test_cases(
-            api_info=api_info,
-            sample_requests=[],
-            test_strategy="comprehensive"
-        )
+        # 调用 LLM 生成（相同接口签名复用缓存结果）
+        cache_key = self._ai_cache_key(api_info, self.llm_chain.provider.cache_signature)
+        raw_cases = self._get_cached_ai_cases(cache_key)
+        if raw_cases is None:
+            with self._llm_semaphore:
+                result = self.llm_chain.generate_test_cases(
+                    api_info=api_info,
+                    sample_requests=[],
+                    test_strategy="comprehensive"
+                )
+            raw_cases = result.get("test_cases", [])
+            self._set_cached_ai_cases(cache_key, raw_cases)
         
         cases: list[GeneratedTestCase] = []
-        for tc_data in result.get("test_cases", []):
+        for tc_data in raw_cases:
             try:
                 case = GeneratedTestCase(
                     name=tc_data.get("name", "AI生成用例"),
@@ -578,38 +726,89 @@ class EndpointTestGeneratorService:
         self.logger.ai_end(f"生成 {len(cases)} 个用例")
         return cases[:5]  # 限制 AI 生成数量
     
-    def _generate_sample_value(self, param: dict) -> str:
+    @staticmethod
+    def _ai_cache_key(api_info: dict[str, Any], llm_signature: str) -> str:
+        """
+        AI 用例缓存键
+        
+        由方法、路径模板、参数与请求体定义决定，名称/描述的差异不影响生成结果；
+        提供商与模型参与计算，切换模型后不复用旧模型的用例
+        """
+        signature = {
+            "llm": llm_signature,
+            "method": str(api_info.get("method", "")).upper(),
+            "path": api_info.get("path", ""),
+            "parameters": api_info.get("parameters") or [],
+            "request_body": api_info.get("request_body") or {},
+        }
+        canonical = json.dumps(signature, sort_keys=True, ensure_ascii=False, default=str)
+        return "ai_cases:" + hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    
+    def _get_cached_ai_cases(self, cache_key: str) -> list[dict[str, Any]] | None:
+        """
+        读取缓存的 AI 用例（先查进程内缓存，再查数据库）
+        
+        进程内缓存存取均深拷贝，生成的用例引用其中的嵌套字典，修改用例不会污染缓存
+        """
+        if not self.use_ai_cache:
+            return None
+        
+        cached = self._ai_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        try:
+            raw = self._llm_cache.get(cache_key, self.AI_CASE_CACHE_TTL_HOURS)
+            if raw is None:
+                return None
+            cached = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        except Exception as e:
+            self.logger.warn(f"读取AI用例缓存失败: {e}")
+            return None
+        
+        self.logger.debug(f"命中AI用例缓存: {cache_key}")
+        self._ai_cache[cache_key] = copy.deepcopy(cached)
+        return cached
+    
+    def _set_cached_ai_cases(self, cache_key: str, raw_cases: list[dict[str, Any]]) -> None:
+        """写入 AI 用例缓存（写库失败只记录日志，不影响本次生成结果）"""
+        if not self.use_ai_cache or not raw_cases:
+            return
+        self._ai_cache[cache_key] = copy.deepcopy(raw_cases)
+        try:
+            self._llm_cache.set(
+                cache_key,
+                json.dumps(raw_cases, ensure_ascii=False, default=str),
+                self.AI_CASE_CACHE_TTL_HOURS
+            )
+        except Exception as e:
+            self.logger.warn(f"写入AI用例缓存失败: {e}")
+    
+    def _generate_sample_value(self, param: dict, now: datetime | None = None) -> str:
         """根据参数定义生成示例值"""
         schema = param.get('schema', param)
-        param_type = schema.get('type', 'string')
-        param_format = schema.get('format', '')
-        enum_values = schema.get('enum')
-        example = schema.get('example')
-        default = schema.get('default')
         
+        example = schema.get('example')
         if example is not None:
             return str(example)
+        default = schema.get('default')
         if default is not None:
             return str(default)
+        enum_values = schema.get('enum')
         if enum_values:
             return str(enum_values[0])
         
-        if param_type == 'integer':
-            return "1"
-        elif param_type == 'number':
-            return "1.0"
-        elif param_type == 'boolean':
-            return "true"
-        elif param_format == 'date':
-            return datetime.now().strftime('%Y-%m-%d')
-        elif param_format == 'date-time':
-            return datetime.now().isoformat()
-        elif param_format == 'email':
-            return "test@example.com"
-        elif param_format == 'uuid':
-            return "550e8400-e29b-41d4-a716-446655440000"
-        else:
-            return "test_value"
+        sample = _TYPE_SAMPLES.get(schema.get('type', 'string'))
+        if sample is not None:
+            return sample
+        
+        param_format = schema.get('format', '')
+        formatter = _DATE_FORMATTERS.get(param_format)
+        if formatter is not None:
+            return formatter(now or datetime.now())
+        return _FORMAT_SAMPLES.get(param_format, "test_value")
     
     def _generate_request_body(self, request_body: dict) -> dict[str, Any]:
         """根据 request_body 定义生成请求体"""
@@ -624,45 +823,53 @@ class EndpointTestGeneratorService:
         body: dict[str, Any] = {}
         
         for name, prop in properties.items():
-            prop_type = prop.get('type', 'string')
             example = prop.get('example')
-            default = prop.get('default')
-            
             if example is not None:
                 body[name] = example
-            elif default is not None:
+                continue
+            default = prop.get('default')
+            if default is not None:
                 body[name] = default
-            elif prop_type == 'string':
-                body[name] = f"test_{name}"
-            elif prop_type == 'integer':
-                body[name] = 1
-            elif prop_type == 'number':
-                body[name] = 1.0
-            elif prop_type == 'boolean':
-                body[name] = True
-            elif prop_type == 'array':
-                body[name] = []
-            elif prop_type == 'object':
-                body[name] = {}
+                continue
+            sample = _BODY_TYPE_SAMPLES.get(prop.get('type', 'string'))
+            if sample is not None:
+                body[name] = sample(name)
         
         return body
     
     def _deduplicate_cases(self, cases: list[GeneratedTestCase]) -> list[GeneratedTestCase]:
         """去重测试用例"""
-        seen: set[str] = set()
+        seen: set[tuple[Any, ...]] = set()
         unique_cases: list[GeneratedTestCase] = []
         
         for case in cases:
-            # 基于关键字段生成唯一标识
-            key = f"{case.method}:{case.url}:{case.category}:{json.dumps(case.body, sort_keys=True) if case.body else ''}"
-            key_hash = hashlib.md5(key.encode()).hexdigest()
+            # 基于关键字段生成唯一标识（直接使用可哈希元组，无需序列化）
+            key = (case.method, case.url, case.category, self._body_key(case.body))
             
-            if key_hash not in seen:
-                seen.add(key_hash)
+            if key not in seen:
+                seen.add(key)
                 unique_cases.append(case)
         
         return unique_cases
     
+    @staticmethod
+    def _body_key(body: Any) -> Any:
+        """
+        请求体去重键
+        
+        规则生成的请求体均为扁平字典，直接转为 frozenset；值的类型一并参与比较，
+        避免 1、True、1.0 相等且哈希相同而被误判为重复（类型校验用例依赖这一区别）；
+        包含嵌套结构时退化为排序后的 JSON 字符串
+        """
+        if not body:
+            return None
+        if isinstance(body, dict):
+            try:
+                return frozenset((k, type(v), v) for k, v in body.items())
+            except TypeError:
+                pass
+        return json.dumps(body, sort_keys=True, ensure_ascii=False, default=str)
+    
     def _get_endpoint(self, endpoint_id: str) -> dict[str, Any] | None:
         """获取单个接口"""
         sql = "SELECT * FROM api_endpoints WHERE endpoint_id = %s"
@@ -671,11 +878,22 @@ class EndpointTestGeneratorService:
             return self._parse_endpoint_row(row)
         return None
     
-    def _get_all_endpoints(self, tag_filter: str | None = None) -> list[dict[str, Any]]:
-        """获取所有接口"""
+    def _get_all_endpoints(
+        self,
+        tag_filter: str | None = None,
+        summary_only: bool = False
+    ) -> list[dict[str, Any]]:
+        """
+        获取所有接口
+        
+        Args:
+            tag_filter: 按标签筛选接口
+            summary_only: 仅查询 endpoint_id/method/path，不加载 JSON 定义
+        """
+        columns = "e.endpoint_id, e.method, e.path" if summary_only else "e.*"
         if tag_filter:
-            sql = """
-                SELECT e.* FROM api_endpoints e
+            sql = f"""
+                SELECT {columns} FROM api_endpoints e
                 JOIN api_endpoint_tags et ON e.endpoint_id = et.endpoint_id
                 JOIN api_tags t ON et.tag_id = t.id
                 WHERE t.name = %s
@@ -683,72 +901,182 @@ class EndpointTestGeneratorService:
             """
             rows = self.db.fetch_all(sql, (tag_filter,))
         else:
-            sql = "SELECT * FROM api_endpoints ORDER BY path, method"
+            sql = f"SELECT {columns} FROM api_endpoints e ORDER BY e.path, e.method"
             rows = self.db.fetch_all(sql)
         
+        if summary_only:
+            return rows
         return [self._parse_endpoint_row(row) for row in rows]
     
+    def _get_endpoints_by_ids(self, endpoint_ids: list[str]) -> list[dict[str, Any]]:
+        """按 ID 批量获取接口，保持传入顺序，忽略不存在的 ID"""
+        found: dict[str, dict[str, Any]] = {}
+        for start in range(0, len(endpoint_ids), self.QUERY_CHUNK_SIZE):
+            chunk = endpoint_ids[start:start + self.QUERY_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            sql = f"SELECT * FROM api_endpoints WHERE endpoint_id IN ({placeholders})"
+            for row in self.db.fetch_all(sql, tuple(chunk)):
+                found[row['endpoint_id']] = row
+        return [
+            self._parse_endpoint_row(found[eid])
+            for eid in endpoint_ids if eid in found
+        ]
+    
     def _filter_endpoints_without_cases(self, endpoints: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """过滤掉已有测试用例的接口"""
-        result: list[dict[str, Any]] = []
-        for ep in endpoints:
-            # test_cases 表没有 endpoint_id 列，通过 case_id 前缀匹配
-            sql = "SELECT COUNT(*) as count FROM test_cases WHERE case_id LIKE %s"
-            row = self.db.fetch_one(sql, (f"{ep['endpoint_id']}%",))
-            if row and row['count'] == 0:
-                result.append(ep)
-        return result
+        endpoint_ids = [ep['endpoint_id'] for ep in endpoints]
+        covered: set[str] = set()
+        
+        # 分批 IN 查询，避免逐个接口查询以及超出 SQLite 参数数量上限
+        for start in range(0, len(endpoint_ids), self.QUERY_CHUNK_SIZE):
+            chunk = endpoint_ids[start:start + self.QUERY_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            sql = f"SELECT DISTINCT endpoint_id FROM test_cases WHERE endpoint_id IN ({placeholders})"
+            covered.update(row['endpoint_id'] for row in self.db.fetch_all(sql, tuple(chunk)))
+        
+        return [ep for ep in endpoints if ep['endpoint_id'] not in covered]
     
     def _parse_endpoint_row(self, row: dict[str, Any]) -> dict[str, Any]:
-        """解析数据库行"""
+        """解析数据库行（JSON 字段仅解析一次）"""
         endpoint = dict(row)
-        if isinstance(endpoint.get('parameters'), str):
-            endpoint['parameters'] = json.loads(endpoint['parameters']) if endpoint['parameters'] else []
-        if isinstance(endpoint.get('request_body'), str):
-            endpoint['request_body'] = json.loads(endpoint['request_body']) if endpoint['request_body'] else {}
-        if isinstance(endpoint.get('responses'), str):
-            endpoint['responses'] = json.loads(endpoint['responses']) if endpoint['responses'] else {}
+        for key, default in (('parameters', []), ('request_body', {}), ('responses', {})):
+            value = endpoint.get(key)
+            if isinstance(value, str):
+                endpoint[key] = json.loads(value) if value else default
         return endpoint
     
+    @staticmethod
+    def _case_id(endpoint_id: str, case: GeneratedTestCase) -> str:
+        """生成用例ID：endpoint_id 前缀 + 名称/类型的 8 位十六进制指纹"""
+        digest = hashlib.blake2b(f"{case.name}:{case.category}".encode(), digest_size=4).hexdigest()
+        return f"{endpoint_id}_{digest}"
+    
     def _save_test_cases(self, endpoint_id: str, test_cases: list[GeneratedTestCase]) -> None:
         """保存测试用例到数据库"""
-        for case in test_cases:
-            # case_id 以 endpoint_id 为前缀，便于后续通过前缀匹配查询
-            case_id = f"{endpoint_id}_{hashlib.md5(f'{case.name}:{case.category}'.encode()).hexdigest()[:8]}"
-            
-            # 检查是否已存在
-            existing = self.db.fetch_one(
-                "SELECT case_id FROM test_cases WHERE case_id = %s",
-                (case_id,)
+        rows = self._build_case_rows(endpoint_id, test_cases)
+        if rows:
+            self._insert_case_rows(rows)
+        
+        self.logger.debug(f"保存 {len(rows)}/{len(test_cases)} 个测试用例到数据库")
+    
+    def _build_case_rows(
+        self,
+        endpoint_id: str,
+        test_cases: list[GeneratedTestCase]
+    ) -> list[tuple[Any, ...]]:
+        """构建待插入的行，跳过数据库中已存在的用例"""
+        # 一次查询载入该接口已有的 case_id，在内存中跳过重复用例，避免无谓的序列化
+        existing = {
+            row['case_id'] for row in self.db.fetch_all(
+                "SELECT case_id FROM test_cases WHERE endpoint_id = %s",
+                (endpoint_id,)
             )
-            if existing:
+        }
+        
+        rows: list[tuple[Any, ...]] = []
+        for case in test_cases:
+            case_id = self._case_id(endpoint_id, case)
+            if case_id in existing:
                 continue
-            
-            # 注意：test_cases 表没有 endpoint_id 列，使用 task_id 存储 endpoint_id
-            sql = """
-                INSERT INTO test_cases 
-                (case_id, task_id, name, description, category, priority,
-                 method, url, headers, body, query_params, expected_status_code,
-                 expected_response, max_response_time_ms, tags, is_enabled)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            self.db.execute(sql, (
-                case_id,
-                endpoint_id,  # 使用 task_id 字段存储 endpoint_id
-                case.name[:255],
-                case.description[:16000] if case.description else "",
-                case.category,
-                case.priority,
-                case.method,
-                case.url,
-                json.dumps(case.headers, ensure_ascii=False),
-                json.dumps(case.body, ensure_ascii=False) if case.body else None,
-                json.dumps(case.query_params, ensure_ascii=False),
-                case.expected_status_code,
-                json.dumps({}, ensure_ascii=False),  # expected_response
-                3000,  # max_response_time_ms
-                json.dumps(case.tags, ensure_ascii=False),
-                True
-            ))
+            existing.add(case_id)
+            rows.append(self._case_row(case_id, endpoint_id, case))
+        return rows
+    
+    def _insert_case_rows(self, rows: list[tuple[Any, ...]]) -> None:
+        """批量插入用例行，唯一约束兜底并发写入时的重复"""
+        self.db.execute_many(_INSERT_CASE_SQL, rows)
+    
+    @staticmethod
+    def _case_row(case_id: str, endpoint_id: str, case: GeneratedTestCase) -> tuple[Any, ...]:
+        """构建 test_cases 插入行"""
+        return (
+            case_id,
+            endpoint_id,
+            case.name[:255],
+            case.description[:16000] if case.description else "",
+            case.category,
+            case.priority,
+            case.method,
+            case.url,
+            _JSON_ENCODE(case.headers),
+            _JSON_ENCODE(case.body) if case.body else None,
+            _JSON_ENCODE(case.query_params),
+            case.expected_status_code,
+            _EMPTY_JSON_OBJECT,  # expected_response
+            3000,  # max_response_time_ms
+            _JSON_ENCODE(case.tags),
+            True
+        )
+
+class _CaseWriter:
+    """
+    测试用例写入线程（生产者/消费者模式中的消费者）
+    
+    生成线程把 (endpoint_id, 用例列表) 放入有界队列，
+    写入线程攒够一批后一次性写库，SQLite 同一时刻只有一个写入者
+    """
+    
+    def __init__(self, service: EndpointTestGeneratorService, batch_size: int, maxsize: int = 16):
+        self._service = service
+        self._batch_size = batch_size
+        self._queue: queue.Queue[tuple[str, list[GeneratedTestCase]] | None] = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="testcase-writer", daemon=True)
+        # 保存失败的接口：endpoint_id -> 错误信息
+        self.failed_endpoints: dict[str, str] = {}
+        self.saved_count = 0
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def put(self, endpoint_id: str, test_cases: list[GeneratedTestCase]) -> None:
+        """提交待保存的用例（队列满时阻塞）"""
+        self._queue.put((endpoint_id, test_cases))
+    
+    def close(self) -> None:
+        """写完剩余数据并等待写入线程结束"""
+        self._queue.put(None)
+        self._thread.join()
+        self._service.logger.debug(f"批量保存 {self.saved_count} 个测试用例到数据库")
+    
+    def _run(self) -> None:
+        pending: list[tuple[str, list[tuple[Any, ...]]]] = []
+        pending_rows = 0
+        try:
+            while (item := self._queue.get()) is not None:
+                endpoint_id, test_cases = item
+                try:
+                    rows = self._service._build_case_rows(endpoint_id, test_cases)
+                except Exception as e:
+                    self.failed_endpoints[endpoint_id] = str(e)
+                    continue
+                pending.append((endpoint_id, rows))
+                pending_rows += len(rows)
+                if pending_rows >= self._batch_size:
+                    self._flush(pending)
+                    pending = []
+                    pending_rows = 0
+            self._flush(pending)
+        finally:
+            self._service.db.close()
+    
+    def _flush(self, batches: list[tuple[str, list[tuple[Any, ...]]]]) -> None:
+        """批量写入；整批失败时逐个接口重试，单个接口的坏数据不影响其他接口"""
+        rows = [row for _, endpoint_rows in batches for row in endpoint_rows]
+        if not rows:
+            return
+        try:
+            self._service._insert_case_rows(rows)
+            self.saved_count += len(rows)
+            return
+        except Exception as e:
+            if len(batches) == 1:
+                self.failed_endpoints[batches[0][0]] = str(e)
+                return
+            self._service.logger.warn(f"批量保存失败({len(rows)}条)，逐个接口重试: {e}")
         
-        self.logger.debug(f"保存 {len(test_cases)} 个测试用例到数据库")
+        for endpoint_id, endpoint_rows in batches:
+            try:
+                self._service._insert_case_rows(endpoint_rows)
+                self.saved_count += len(endpoint_rows)
+            except Exception as e:
+                self.failed_endpoints[endpoint_id] = str(e)
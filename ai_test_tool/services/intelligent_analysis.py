@@ -4,10 +4,26 @@
 将路由分发器封装为服务层，便于API调用
 """
 
+import copy
+import hashlib
 import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
+import numpy as np
+
+try:
+    import orjson  # 可选依赖：存在时用于更快的 JSON 序列化
+except ImportError:
+    orjson = None
+
 from ..routing import (
+    AnalysisScenario,
     IntelligentRouter,
     ScenarioDetector,
     StrategyRegistry,
@@ -16,10 +32,115 @@ from ..routing import (
     create_router,
     get_registry,
 )
+from ..config import get_config
 from ..llm.provider import get_llm_provider
 from ..utils.logger import get_logger
 
 
+@dataclass(slots=True)
+class RequestTable:
+    """
+    请求列式视图
+
+    将请求列表中的热点字段预先转换为 NumPy 数组，同一批请求多次分析时只需转换一次；
+    rows 保留原始请求列表供策略使用
+    """
+    rows: list[dict[str, Any]]
+    response_time_ms: np.ndarray
+    http_status: np.ndarray
+    url: list[str]
+
+    @classmethod
+    def from_dicts(cls, requests: list[dict[str, Any]]) -> "RequestTable":
+        """从请求字典列表构建（缺失值记为 0）"""
+        n = len(requests)
+        return cls(
+            rows=requests,
+            response_time_ms=np.fromiter(
+                (r.get("response_time_ms") or 0 for r in requests), dtype=np.float64, count=n
+            ),
+            http_status=np.fromiter(
+                (r.get("http_status") or 0 for r in requests), dtype=np.int32, count=n
+            ),
+            url=[r.get("url", "") for r in requests],
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+RequestsInput = list[dict[str, Any]] | RequestTable
+
+
+def _request_rows(requests: RequestsInput | None) -> list[dict[str, Any]] | None:
+    """取出原始请求列表"""
+    if isinstance(requests, RequestTable):
+        return requests.rows
+    return requests
+
+
+class _AnalysisCache:
+    """
+    分析结果缓存（LRU + TTL）
+
+    相同输入的重复分析直接返回已有结果，避免再次触发策略中的 LLM 调用
+    """
+
+    def __init__(self, max_size: int = 128, ttl_seconds: float = 600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**inputs: Any) -> str:
+        """由分析输入生成缓存键"""
+        canonical = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored_at, response = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: dict[str, Any]) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic(), response)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+@lru_cache(maxsize=4)
+def _create_shared_router(llm_config_key: str) -> IntelligentRouter:
+    """按 LLM 配置创建并缓存路由器，避免每个服务实例重复初始化识别器和 LLM 提供者"""
+    try:
+        llm_provider = get_llm_provider()
+    except Exception:
+        llm_provider = None
+    return create_router(llm_provider=llm_provider)
+
+
+def _get_shared_router() -> IntelligentRouter:
+    """获取当前 LLM 配置对应的共享路由器"""
+    try:
+        llm_config_key = get_config().llm.model_dump_json()
+    except Exception:
+        llm_config_key = ""
+    return _create_shared_router(llm_config_key)
+
+
 class IntelligentAnalysisService:
     """
     智能分析服务
@@ -27,27 +148,36 @@ class IntelligentAnalysisService:
     提供基于路由的智能日志分析能力，自动识别场景并选择合适的分析策略
     """
 
-    def __init__(self, verbose: bool = False):
+    DETECTION_CACHE_SIZE = 64
+
+    def __init__(
+        self,
+        verbose: bool = False,
+        cache_size: int = 128,
+        cache_ttl_seconds: float = 600
+    ):
         self.verbose = verbose
         self.logger = get_logger(verbose)
         self._router: IntelligentRouter | None = None
         self._llm_provider = None
+        self._cache = _AnalysisCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+        # 场景识别结果缓存：失败重试或先识别再分析时不再重复扫描日志内容
+        self._detection_cache = _AnalysisCache(
+            max_size=self.DETECTION_CACHE_SIZE, ttl_seconds=cache_ttl_seconds
+        )
 
     @property
     def router(self) -> IntelligentRouter:
-        """懒加载路由器"""
+        """懒加载路由器（同一 LLM 配置下进程内共享）"""
         if self._router is None:
-            try:
-                self._llm_provider = get_llm_provider()
-            except Exception:
-                self._llm_provider = None
-            self._router = create_router(llm_provider=self._llm_provider)
+            self._router = _get_shared_router()
+            self._llm_provider = self._router.llm_provider
         return self._router
 
     def analyze(
         self,
         log_content: str = "",
-        requests: list[dict[str, Any]] | None = None,
+        requests: RequestsInput | None = None,
         metrics: dict[str, float] | None = None,
         user_hint: str = "",
         task_id: str = "",
@@ -60,79 +190,134 @@ class IntelligentAnalysisService:
 
         Args:
             log_content: 日志内容
-            requests: 解析后的请求列表
+            requests: 解析后的请求列表（或 RequestTable）
             metrics: 统计指标（如错误率、响应时间等）
             user_hint: 用户提示（如"分析错误"、"查看性能"）
             task_id: 任务ID
             options: 额外选项
                 - execute_all: 是否执行所有匹配策略（默认False，只执行第一个成功的）
                 - max_strategies: 最多执行策略数量
+                - max_parallel: execute_all 时的策略并发执行数（默认4，设为1时顺序执行）；
+                  未开启 execute_all 时忽略，策略始终顺序执行
+                - cache: 是否使用结果缓存（默认True）
 
         Returns:
-            分析结果，包含场景识别、策略执行结果等
+            分析结果，包含场景识别、策略执行结果等；有成功结果时 analysis 为首个成功结果的数据，
+            analysis_index 为其在 results 中的下标
         """
+        requests = _request_rows(requests)
+        options = dict(options or {})
+        use_cache = options.pop("cache", True)
+        cache_key = ""
+        detection_key = ""
+        if use_cache:
+            detection_key = self._detection_key(log_content, requests, metrics, user_hint)
+            cache_key = self._cache.make_key(
+                detection_key=detection_key,
+                task_id=task_id,
+                options=options
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self.logger.debug(f"命中分析缓存: {cache_key}")
+                # 缓存中的结果与返回给调用方的结果互不共享，调用方可以随意修改
+                return {**copy.deepcopy(cached), "cache_hit": True}
+
         self.logger.start_step("智能路由分析")
 
+        # 场景识别（可缓存），结果直接交给路由器，避免重复识别
+        pre_detected = None
+        if use_cache:
+            pre_detected = self._detect(detection_key, log_content, requests, metrics, user_hint)
+
         # 执行路由和分析
         decision, results = self.router.route_and_execute(
             log_content=log_content,
             requests=requests,
             metrics=metrics,
             user_hint=user_hint,
-            options=options or {},
-            task_id=task_id
+            options=options,
+            task_id=task_id,
+            pre_detected=pre_detected
         )
 
-        # 整理结果
+        # 整理结果（单次遍历区分成功结果）
+        successful_indexes = [i for i, r in enumerate(results) if r.success]
         response = {
-            "success": any(r.success for r in results),
-            "routing": {
-                "detected_scenarios": [
-                    {
-                        "type": s.scenario_type.value,
-                        "confidence": s.confidence,
-                        "description": s.description
-                    }
-                    for s in decision.scenarios
-                ],
-                "primary_scenario": decision.primary_scenario.scenario_type.value if decision.primary_scenario else None,
-                "selected_strategies": [
-                    {
-                        "id": s.strategy_id,
-                        "name": s.name,
-                        "priority": s.priority.name
-                    }
-                    for s in decision.selected_strategies
-                ],
-                "reasoning": decision.reasoning
-            },
-            "results": [
-                {
-                    "strategy_id": r.strategy_id,
-                    "scenario_type": r.scenario_type.value,
-                    "success": r.success,
-                    "execution_time_ms": r.execution_time_ms,
-                    "data": r.data,
-                    "error_message": r.error_message
-                }
-                for r in results
-            ]
+            "success": bool(successful_indexes),
+            "routing": decision.to_summary_dict(),
+            "results": [r.to_summary_dict() for r in results]
         }
 
         # 如果有成功结果，提取主要数据
-        successful_results = [r for r in results if r.success]
-        if successful_results:
-            primary_result = successful_results[0]
+        # analysis 与 results[analysis_index]["data"] 为同一对象（不复制），
+        # 需要精简输出的调用方可按 analysis_index 取数据
+        if successful_indexes:
+            primary_index = successful_indexes[0]
+            primary_result = results[primary_index]
             response["analysis"] = primary_result.data
+            response["analysis_index"] = primary_index
             response["scenario_type"] = primary_result.scenario_type.value
 
         self.logger.end_step(
             f"完成: {len(decision.scenarios)} 场景, "
             f"{len(results)} 策略执行, "
-            f"{len(successful_results)} 成功"
+            f"{len(successful_indexes)} 成功"
         )
 
-        return response
+        # 仅缓存成功结果，失败的分析下次重新执行
+        if use_cache and response["success"]:
+            self._cache.set(cache_key, copy.deepcopy(response))
+
+        return {**response, "cache_hit": False}
+
+    def analyze_batch(
+        self,
+        inputs: list[dict[str, Any]],
+        max_parallel: int = 8
+    ) -> list[dict[str, Any]]:
+        """
+        批量智能分析
+
+        每项参数同 analyze()，多项并发执行并共享结果缓存和场景识别缓存；
+        单项失败不影响其他项
+
+        Args:
+            inputs: analyze() 参数字典列表
+            max_parallel: 最大并发数
+
+        Returns:
+            与 inputs 顺序一致的分析结果列表
+        """
+        if not inputs:
+            return []
+
+        def run(kwargs: dict[str, Any]) -> dict[str, Any]:
+            try:
+                return self.analyze(**kwargs)
+            except Exception as e:
+                self.logger.error(f"批量分析失败: {e}")
+                return {"success": False, "error": str(e), "cache_hit": False}
+
+        if max_parallel <= 1 or len(inputs) == 1:
+            return [run(kwargs) for kwargs in inputs]
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_parallel, len(inputs)),
+            thread_name_prefix="analysis"
+        ) as executor:
+            return list(executor.map(run, inputs))
+
+    def analyze_json(self, **kwargs: Any) -> bytes:
+        """
+        智能分析并直接返回 JSON 字节串
+
+        参数同 analyze()，适合需要原样输出 JSON 的调用方；安装了 orjson 时使用 orjson 序列化
+        """
+        response = self.analyze(**kwargs)
+        if orjson is not None:
+            return orjson.dumps(response, option=orjson.OPT_NON_STR_KEYS, default=str)
+        return json.dumps(response, ensure_ascii=False, default=str).encode()
 
     def detect_scenarios(
         self,
@@ -153,14 +338,47 @@ class IntelligentAnalysisService:
         Returns:
             检测到的场景列表
         """
+        detection_key = self._detection_key(log_content, requests, metrics, user_hint)
+        scenarios = self._detect(detection_key, log_content, requests, metrics, user_hint)
+
+        return [s.to_dict() for s in scenarios]
+
+    def _detection_key(
+        self,
+        log_content: str,
+        requests: list[dict[str, Any]] | None,
+        metrics: dict[str, float] | None,
+        user_hint: str
+    ) -> str:
+        """场景识别缓存键（用户提示也参与识别，因此一并计入）"""
+        return self._detection_cache.make_key(
+            log_content=log_content,
+            requests=requests or [],
+            metrics=metrics or {},
+            user_hint=user_hint
+        )
+
+    def _detect(
+        self,
+        detection_key: str,
+        log_content: str,
+        requests: list[dict[str, Any]] | None,
+        metrics: dict[str, float] | None,
+        user_hint: str
+    ) -> list[AnalysisScenario]:
+        """识别场景，相同输入复用缓存结果（存取时均深拷贝，调用方修改场景不影响缓存）"""
+        cached = self._detection_cache.get(detection_key)
+        if cached is not None:
+            return copy.deepcopy(cached["scenarios"])
+
         scenarios = self.router.detector.detect(
             log_content=log_content,
             requests=requests,
             metrics=metrics,
             user_hint=user_hint
         )
-
-        return [s.to_dict() for s in scenarios]
+        self._detection_cache.set(detection_key, {"scenarios": copy.deepcopy(scenarios)})
+        return scenarios
 
     def get_available_strategies(
         self,
@@ -180,13 +398,11 @@ class IntelligentAnalysisService:
         if scenario_type:
             try:
                 st = ScenarioType(scenario_type)
-                strategies = registry.find_by_scenario_type(st)
             except ValueError:
-                strategies = []
-        else:
-            strategies = registry.get_all()
+                return []
+            return registry.get_strategy_dicts(st)
 
-        return [s.to_dict() for s in strategies]
+        return registry.get_strategy_dicts()
 
     def get_statistics(self) -> dict[str, Any]:
         """获取路由统计信息"""
@@ -197,14 +413,14 @@ class IntelligentAnalysisService:
 
     def analyze_errors(
         self,
-        requests: list[dict[str, Any]],
+        requests: RequestsInput,
         log_content: str = ""
     ) -> dict[str, Any]:
         """
         专门的错误分析
 
         Args:
-            requests: 请求列表
+            requests: 请求列表（或 RequestTable）
             log_content: 日志内容
 
         Returns:
@@ -218,33 +434,38 @@ class IntelligentAnalysisService:
 
     def analyze_performance(
         self,
-        requests: list[dict[str, Any]]
+        requests: RequestsInput
     ) -> dict[str, Any]:
         """
         专门的性能分析
 
         Args:
-            requests: 请求列表
+            requests: 请求列表（或 RequestTable）
 
         Returns:
             性能分析结果
         """
-        # 计算性能指标
-        response_times = [
-            r.get("response_time_ms", 0)
-            for r in requests
-            if r.get("response_time_ms")
-        ]
+        # 计算性能指标（NumPy 向量化）
+        if isinstance(requests, RequestTable):
+            response_times = requests.response_time_ms[requests.response_time_ms != 0]
+        else:
+            response_times = np.fromiter(
+                (t for r in requests if (t := r.get("response_time_ms"))),
+                dtype=np.float64
+            )
 
         metrics = {}
-        if response_times:
-            response_times.sort()
-            n = len(response_times)
+        n = response_times.size
+        if n:
+            # 选择算法（O(n)）只定位两个分位点，无需整体排序；
+            # 样本少于 100 时 int(n * 0.99) 即 n - 1，P99 取最大值
+            k90, k99 = int(n * 0.9), int(n * 0.99)
+            response_times.partition([k90, k99])
             metrics = {
-                "avg_latency_ms": sum(response_times) / n,
-                "p90_latency_ms": response_times[int(n * 0.9)],
-                "p99_latency_ms": response_times[int(n * 0.99)] if n >= 100 else response_times[-1],
-                "slow_request_rate": sum(1 for t in response_times if t > 3000) / n
+                "avg_latency_ms": float(response_times.mean()),
+                "p90_latency_ms": float(response_times[k90]),
+                "p99_latency_ms": float(response_times[k99]),
+                "slow_request_rate": float(np.count_nonzero(response_times > 3000) / n)
             }
 
         return self.analyze(
@@ -255,14 +476,14 @@ class IntelligentAnalysisService:
 
     def analyze_security(
         self,
-        requests: list[dict[str, Any]],
+        requests: RequestsInput,
         log_content: str = ""
     ) -> dict[str, Any]:
         """
         专门的安全分析
 
         Args:
-            requests: 请求列表
+            requests: 请求列表（或 RequestTable）
             log_content: 日志内容
 
         Returns:
@@ -276,13 +497,13 @@ class IntelligentAnalysisService:
 
     def health_check(
         self,
-        requests: list[dict[str, Any]]
+        requests: RequestsInput
     ) -> dict[str, Any]:
         """
         健康检查分析
 
         Args:
-            requests: 请求列表
+            requests: 请求列表（或 RequestTable）
 
         Returns:
             健康状态分析结果
@@ -6,11 +6,20 @@
 import json
 import re
 import hashlib
-from typing import Any
+import io
+from array import array
+from typing import Any, Iterable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from collections import defaultdict
+from collections import Counter
+
+import numpy as np
+
+try:
+    import orjson  # 可选依赖：存在时用于更快的 JSON 序列化
+except ImportError:
+    orjson = None
 
 from ..database import get_db_manager
 from ..llm.chains import LogAnalysisChain, ReportGeneratorChain
@@ -18,6 +27,106 @@ from ..llm.provider import get_llm_provider
 from ..utils.logger import get_logger
 
 
+# 预编译的辅助正则
+_TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}')
+_EXCEPTION_TYPE_RE = re.compile(r'(\w+(?:Error|Exception))')
+_TITLE_TYPE_RE = re.compile(r'(\w+(?:Error|Exception|Warning|Failed))')
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """序列化为 JSON 字符串（保留非 ASCII 字符）；安装了 orjson 时使用 orjson"""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option, default=str).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None, default=str)
+
+
+# 各类异常 ID 的 blake2b 密钥（按类别区分域，避免为每条记录拼接前缀字符串）
+_ID_ERROR = b'error'
+_ID_WARNING = b'warning'
+_ID_5XX = b'5xx'
+_ID_4XX = b'4xx'
+_ID_SLOW = b'slow'
+_ID_TIMEOUT = b'timeout'
+_ID_SECURITY = b'security'
+_ID_ERROR_RATE = b'error_rate'
+_ID_REPORT = b'anomaly_report'
+
+
+def _short_id(text: str, key: bytes = b'') -> str:
+    """生成 16 位十六进制短 ID（blake2b 直接输出 8 字节摘要；key 用于区分 ID 类别）"""
+    return hashlib.blake2b(text.encode(), key=key, digest_size=8).hexdigest()
+
+
+def _iter_lines(f: Iterable[str]) -> Iterable[str]:
+    """逐行读取文本文件，产出的行与 content.split('\\n') 一致（末尾换行后产出空行）"""
+    line = ""
+    for line in f:
+        yield line[:-1] if line.endswith('\n') else line
+    if not line or line.endswith('\n'):
+        yield ""
+
+
+def _parse_timestamp(line: str) -> datetime | None:
+    """
+    提取日志行中的时间戳（YYYY-MM-DD HH:MM:SS 或 YYYY-MM-DDTHH:MM:SS）
+
+    常见的行首时间戳按固定位置校验分隔符后直接切片解析，不经过正则；
+    解析失败或时间戳不在行首时仍用正则查找
+    """
+    if (
+        len(line) >= 19 and line[4] == '-' and line[7] == '-' and line[10] in ' T'
+        and line[13] == ':' and line[16] == ':'
+    ):
+        try:
+            return datetime.fromisoformat(line[:19])
+        except ValueError:
+            pass
+    
+    ts_match = _TIMESTAMP_RE.search(line)
+    if ts_match:
+        try:
+            return datetime.fromisoformat(ts_match.group(0).replace(' ', 'T'))
+        except ValueError:
+            pass
+    return None
+
+
+def _find_stack_traces(content: str) -> list[str]:
+    """逐行扫描提取内容中的异常堆栈（Python、Java、JavaScript 依次排列）"""
+    # Java / JavaScript 堆栈必含 "at " 帧，Python 堆栈必含固定表头；都没有时无需逐行扫描
+    if "at " not in content and _StackTraceCollector._PYTHON_HEADER not in content:
+        return []
+    collector = _StackTraceCollector()
+    for line in content.split('\n'):
+        collector.feed(line)
+    return collector.finish()
+
+
+def _fuse_by_severity(
+    patterns: list[tuple[re.Pattern, "AnomalySeverity"]]
+) -> list[tuple[re.Pattern, "AnomalySeverity"]]:
+    """
+    将相邻的同级别模式合并为一个交替正则
+
+    按顺序依次匹配合并后的正则，首个命中的级别与逐个匹配原模式列表的结果一致，
+    但每行的正则调用次数从模式数降为级别段数
+    """
+    fused: list[tuple[re.Pattern, AnomalySeverity]] = []
+    run: list[str] = []
+    run_severity = None
+    for pattern, severity in [*patterns, (None, None)]:
+        if run and severity != run_severity:
+            fused.append((re.compile('|'.join(run)), run_severity))
+            run = []
+        if pattern is None:
+            break
+        source = pattern.pattern.removeprefix('(?i)')
+        run.append(f"(?i:{source})" if pattern.flags & re.IGNORECASE else f"(?:{source})")
+        run_severity = severity
+    return fused
+
+
 class AnomalySeverity(Enum):
     """异常严重程度"""
     CRITICAL = "critical"    # 严重
@@ -26,6 +135,15 @@ class AnomalySeverity(Enum):
     INFO = "info"            # 信息
 
 
+# 严重级别排序（数值越小越严重）
+_SEVERITY_RANK = {
+    AnomalySeverity.CRITICAL: 0,
+    AnomalySeverity.ERROR: 1,
+    AnomalySeverity.WARNING: 2,
+    AnomalySeverity.INFO: 3
+}
+
+
 class AnomalyType(Enum):
     """异常类型"""
     ERROR_LOG = "error_log"              # 错误日志
@@ -38,7 +156,7 @@ class AnomalyType(Enum):
     SECURITY_ALERT = "security_alert"    # 安全告警
 
 
-@dataclass
+@dataclass(slots=True)
 class LogAnomaly:
     """日志异常"""
     anomaly_id: str
@@ -55,7 +173,7 @@ class LogAnomaly:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnomalyReport:
     """异常报告"""
     report_id: str
@@ -83,39 +201,63 @@ class LogAnomalyDetectorService:
     4. 生成异常报告
     """
     
-    # 常见错误模式
+    # 常见错误模式（类加载时预编译）
     ERROR_PATTERNS = [
-        (r'\b(ERROR|FATAL|CRITICAL)\b', AnomalySeverity.ERROR),
-        (r'\b(Exception|Error|Failure)\b.*?:', AnomalySeverity.ERROR),
-        (r'(?i)(failed|failure|error|exception)', AnomalySeverity.ERROR),
-        (r'(?i)(timeout|timed out)', AnomalySeverity.ERROR),
-        (r'(?i)(connection refused|connection reset)', AnomalySeverity.ERROR),
-        (r'(?i)(out of memory|oom)', AnomalySeverity.CRITICAL),
-        (r'(?i)(deadlock|race condition)', AnomalySeverity.CRITICAL),
+        (re.compile(r'\b(ERROR|FATAL|CRITICAL)\b'), AnomalySeverity.ERROR),
+        (re.compile(r'\b(Exception|Error|Failure)\b.*?:'), AnomalySeverity.ERROR),
+        (re.compile(r'(?i)(failed|failure|error|exception)'), AnomalySeverity.ERROR),
+        (re.compile(r'(?i)(timeout|timed out)'), AnomalySeverity.ERROR),
+        (re.compile(r'(?i)(connection refused|connection reset)'), AnomalySeverity.ERROR),
+        (re.compile(r'(?i)(out of memory|oom)'), AnomalySeverity.CRITICAL),
+        (re.compile(r'(?i)(deadlock|race condition)'), AnomalySeverity.CRITICAL),
     ]
     
     WARNING_PATTERNS = [
-        (r'\b(WARN|WARNING)\b', AnomalySeverity.WARNING),
-        (r'(?i)(deprecated|deprecation)', AnomalySeverity.WARNING),
-        (r'(?i)(slow query|slow request)', AnomalySeverity.WARNING),
-        (r'(?i)(retry|retrying)', AnomalySeverity.WARNING),
-        (r'(?i)(high memory|high cpu)', AnomalySeverity.WARNING),
+        (re.compile(r'\b(WARN|WARNING)\b'), AnomalySeverity.WARNING),
+        (re.compile(r'(?i)(deprecated|deprecation)'), AnomalySeverity.WARNING),
+        (re.compile(r'(?i)(slow query|slow request)'), AnomalySeverity.WARNING),
+        (re.compile(r'(?i)(retry|retrying)'), AnomalySeverity.WARNING),
+        (re.compile(r'(?i)(high memory|high cpu)'), AnomalySeverity.WARNING),
     ]
     
     SECURITY_PATTERNS = [
-        (r'(?i)(sql injection|xss|csrf)', AnomalySeverity.CRITICAL),
-        (r'(?i)(unauthorized|forbidden|access denied)', AnomalySeverity.ERROR),
-        (r'(?i)(invalid token|token expired)', AnomalySeverity.WARNING),
-        (r'(?i)(brute force|too many attempts)', AnomalySeverity.ERROR),
+        (re.compile(r'(?i)(sql injection|xss|csrf)'), AnomalySeverity.CRITICAL),
+        (re.compile(r'(?i)(unauthorized|forbidden|access denied)'), AnomalySeverity.ERROR),
+        (re.compile(r'(?i)(invalid token|token expired)'), AnomalySeverity.WARNING),
+        (re.compile(r'(?i)(brute force|too many attempts)'), AnomalySeverity.ERROR),
+    ]
+    
+    # 逐行预过滤关键词（小写）：任一行命中上述任一模式时，其小写形式必包含其中某个关键词。
+    # 修改模式时需同步维护
+    LINE_KEYWORDS = (
+        "error", "fail", "exception", "fatal", "critical", "timeout", "timed out",
+        "connection refused", "connection reset", "out of memory", "oom",
+        "deadlock", "race condition",
+        "warn", "deprecat", "slow query", "slow request", "retry", "high memory", "high cpu",
+        "sql injection", "xss", "csrf", "unauthorized", "forbidden", "access denied",
+        "invalid token", "token expired", "brute force", "too many attempts",
+    )
+    # 关键词合并为一个正则，每行只需一次 C 层扫描
+    _LINE_KEYWORDS_RE = re.compile('|'.join(map(re.escape, LINE_KEYWORDS)))
+    
+    # 逐行检测规则：(异常类型, 按级别合并后的模式)
+    _LINE_RULES = [
+        (AnomalyType.ERROR_LOG, _fuse_by_severity(ERROR_PATTERNS)),
+        (AnomalyType.WARNING_LOG, _fuse_by_severity(WARNING_PATTERNS)),
+        (AnomalyType.SECURITY_ALERT, _fuse_by_severity(SECURITY_PATTERNS)),
     ]
     
-    # 异常堆栈模式
-    STACK_TRACE_PATTERNS = [
-        r'Traceback \(most recent call last\):[\s\S]*?(?=\n\n|\Z)',  # Python
-        r'at [\w.$]+\([\w.]+:\d+\)[\s\S]*?(?=\n\n|\Z)',  # Java
-        r'Error:.*\n\s+at .*\n(?:\s+at .*\n)*',  # JavaScript
+    # 安全模式的区分大小写版本（模式本身均为小写），用于已整体转小写的 ASCII 内容
+    _SECURITY_PATTERNS_LOWER = [
+        re.compile(pattern.pattern.removeprefix('(?i)')) for pattern, _ in SECURITY_PATTERNS
     ]
     
+    # 从数据库流式读取请求记录的批大小
+    FETCH_BATCH_SIZE = 5000
+    
+    # Markdown 报告中每个严重级别最多展示的异常数
+    REPORT_SECTION_LIMIT = 10
+    
     def __init__(self, verbose: bool = False):
         self.logger = get_logger(verbose)
         self.verbose = verbose
@@ -162,32 +304,10 @@ class LogAnomalyDetectorService:
             WHERE task_id = %s
             ORDER BY timestamp
         """
-        requests = self.db.fetch_all(sql, (task_id,))
-        
-        anomalies: list[LogAnomaly] = []
+        requests = self.db.fetch_iter(sql, (task_id,), batch_size=self.FETCH_BATCH_SIZE)
         
-        # 1. 检测错误和警告日志
-        error_anomalies = self._detect_error_logs(requests)
-        anomalies.extend(error_anomalies)
-        
-        # 2. 检测异常堆栈
-        exception_anomalies = self._detect_exceptions(requests)
-        anomalies.extend(exception_anomalies)
-        
-        # 3. 检测性能异常
-        perf_anomalies = self._detect_performance_anomalies(requests)
-        anomalies.extend(perf_anomalies)
-        
-        # 4. 检测安全异常
-        security_anomalies = self._detect_security_anomalies(requests)
-        anomalies.extend(security_anomalies)
-        
-        # 5. 检测错误率异常
-        rate_anomalies = self._detect_error_rate_anomalies(requests)
-        anomalies.extend(rate_anomalies)
-        
-        # 去重和聚合
-        anomalies = self._aggregate_anomalies(anomalies)
+        # 单次遍历检测并聚合
+        anomalies = self._detect_anomalies_from_requests(requests)
         
         # 统计
         critical_count = sum(1 for a in anomalies if a.severity == AnomalySeverity.CRITICAL)
@@ -234,57 +354,57 @@ class LogAnomalyDetectorService:
         Returns:
             异常列表
         """
-        anomalies: list[LogAnomaly] = []
+        return self._detect_anomalies_from_lines(log_content.split('\n'))
+    
+    def _detect_anomalies_from_lines(self, lines: Iterable[str]) -> list[LogAnomaly]:
+        """
+        逐行检测异常
+
+        行可以来自内存中的日志内容，也可以逐行读取自文件；异常堆栈由
+        _StackTraceCollector 增量收集，内存占用与日志总大小无关
         
-        # 按行分析
-        lines = log_content.split('\n')
+        Args:
+            lines: 日志行（不含换行符）
+            
+        Returns:
+            聚合后的异常列表
+        """
+        anomalies: list[LogAnomaly] = []
+        traces = _StackTraceCollector()
         
+        keywords_search = self._LINE_KEYWORDS_RE.search
         for i, line in enumerate(lines):
+            traces.feed(line)
             if not line.strip():
                 continue
             
-            # 检测错误
-            for pattern, severity in self.ERROR_PATTERNS:
-                if re.search(pattern, line):
-                    anomaly = self._create_anomaly_from_line(
-                        line, i + 1, AnomalyType.ERROR_LOG, severity
-                    )
-                    anomalies.append(anomaly)
-                    break
-            
-            # 检测警告
-            for pattern, severity in self.WARNING_PATTERNS:
-                if re.search(pattern, line):
-                    anomaly = self._create_anomaly_from_line(
-                        line, i + 1, AnomalyType.WARNING_LOG, severity
-                    )
-                    anomalies.append(anomaly)
-                    break
+            # 关键词预过滤：绝大多数普通日志行不含任何关键词，可跳过全部正则匹配。
+            # 仅对 ASCII 行使用（此时 lower() 与正则的忽略大小写规则一致）
+            if line.isascii() and not keywords_search(line.lower()):
+                continue
             
-            # 检测安全问题
-            for pattern, severity in self.SECURITY_PATTERNS:
-                if re.search(pattern, line):
-                    anomaly = self._create_anomaly_from_line(
-                        line, i + 1, AnomalyType.SECURITY_ALERT, severity
-                    )
-                    anomalies.append(anomaly)
-                    break
+            # 依次检测错误、警告、安全问题，每类取首个命中的级别
+            for anomaly_type, rules in self._LINE_RULES:
+                for pattern, severity in rules:
+                    if pattern.search(line):
+                        anomaly = self._create_anomaly_from_line(
+                            line, i + 1, anomaly_type, severity
+                        )
+                        anomalies.append(anomaly)
+                        break
         
         # 检测异常堆栈
-        for pattern in self.STACK_TRACE_PATTERNS:
-            matches = re.finditer(pattern, log_content)
-            for match in matches:
-                stack_trace = match.group(0)
-                anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(stack_trace[:100].encode()).hexdigest()[:16],
-                    anomaly_type=AnomalyType.EXCEPTION,
-                    severity=AnomalySeverity.ERROR,
-                    title="异常堆栈",
-                    description="检测到异常堆栈信息",
-                    log_content=stack_trace[:500],
-                    stack_trace=stack_trace
-                )
-                anomalies.append(anomaly)
+        for stack_trace in traces.finish():
+            anomaly = LogAnomaly(
+                anomaly_id=_short_id(stack_trace[:100]),
+                anomaly_type=AnomalyType.EXCEPTION,
+                severity=AnomalySeverity.ERROR,
+                title="异常堆栈",
+                description="检测到异常堆栈信息",
+                log_content=stack_trace[:500],
+                stack_trace=stack_trace
+            )
+            anomalies.append(anomaly)
         
         return self._aggregate_anomalies(anomalies)
     
@@ -309,17 +429,14 @@ class LogAnomalyDetectorService:
         """
         self.logger.start_step(f"从文件检测异常: {file_path}")
         
-        # 读取文件内容
+        # 逐行读取并检测异常（不把整个文件读入内存）
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                log_content = f.read()
+                anomalies = self._detect_anomalies_from_lines(_iter_lines(f))
         except Exception as e:
             self.logger.error(f"读取文件失败: {e}")
             raise
         
-        # 检测异常
-        anomalies = self.detect_anomalies_from_log_content(log_content, file_path)
-        
         # 按类型过滤
         if detect_types:
             type_set = set(detect_types)
@@ -355,132 +472,205 @@ class LogAnomalyDetectorService:
         
         return report
     
-    def _detect_error_logs(self, requests: list[dict[str, Any]]) -> list[LogAnomaly]:
+    def _detect_anomalies_from_requests(
+        self,
+        requests: Iterable[dict[str, Any]]
+    ) -> list[LogAnomaly]:
+        """
+        单次遍历请求记录检测异常
+        
+        每条记录依次交给各检测器处理，处理完即可释放；性能与错误率检测只保留
+        统计量和候选请求，内存占用与记录总数无关（响应时间数组除外，每条 8 字节）。
+        各类异常按原检测顺序拼接后聚合
+        
+        Args:
+            requests: 请求记录（可为数据库流式游标）
+            
+        Returns:
+            聚合后的异常列表
+        """
+        error_anomalies: list[LogAnomaly] = []
+        exception_anomalies: list[LogAnomaly] = []
+        security_anomalies: list[LogAnomaly] = []
+        latency = _LatencyCollector()
+        error_rates = _ErrorRateCounter()
+        
+        for req in requests:
+            # 1. 错误和警告日志
+            error_anomalies.extend(self._error_log_anomalies(req))
+            # 2. 异常堆栈
+            exception_anomalies.extend(self._exception_anomalies(req))
+            # 3. 性能异常（先收集，遍历结束后按全局平均值判断）
+            latency.feed(req)
+            # 4. 安全异常
+            security_anomaly = self._security_anomaly(req)
+            if security_anomaly:
+                security_anomalies.append(security_anomaly)
+            # 5. 错误率异常（先计数）
+            error_rates.feed(req)
+        
+        anomalies = error_anomalies + exception_anomalies
+        anomalies.extend(self._performance_anomalies(latency))
+        anomalies.extend(security_anomalies)
+        anomalies.extend(self._error_rate_anomalies(error_rates))
+        
+        # 去重和聚合
+        return self._aggregate_anomalies(anomalies)
+    
+    def _detect_error_logs(self, requests: Iterable[dict[str, Any]]) -> list[LogAnomaly]:
         """检测错误日志"""
+        return [a for req in requests for a in self._error_log_anomalies(req)]
+    
+    def _error_log_anomalies(self, req: dict[str, Any]) -> list[LogAnomaly]:
+        """检测单条请求的错误日志"""
         anomalies: list[LogAnomaly] = []
         
-        for req in requests:
-            # 检查 has_error 标记
-            if req.get('has_error'):
-                error_msg = req.get('error_message', '')
-                anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(f"error:{req['request_id']}".encode()).hexdigest()[:16],
-                    anomaly_type=AnomalyType.ERROR_LOG,
-                    severity=AnomalySeverity.ERROR,
-                    title=f"请求错误: {req['method']} {req['url'][:50]}",
-                    description=error_msg[:500] if error_msg else "请求处理出错",
-                    log_content=req.get('raw_logs', '')[:1000] if req.get('raw_logs') else '',
-                    affected_endpoints=[f"{req['method']} {req['url']}"]
-                )
-                anomalies.append(anomaly)
-            
-            # 检查 has_warning 标记
-            if req.get('has_warning'):
-                warning_msg = req.get('warning_message', '')
-                anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(f"warning:{req['request_id']}".encode()).hexdigest()[:16],
-                    anomaly_type=AnomalyType.WARNING_LOG,
-                    severity=AnomalySeverity.WARNING,
-                    title=f"请求警告: {req['method']} {req['url'][:50]}",
-                    description=warning_msg[:500] if warning_msg else "请求处理有警告",
-                    log_content=req.get('raw_logs', '')[:1000] if req.get('raw_logs') else '',
-                    affected_endpoints=[f"{req['method']} {req['url']}"]
-                )
-                anomalies.append(anomaly)
-            
-            # 检查 HTTP 错误状态码
-            status = req.get('http_status', 0)
-            if status >= 500:
-                anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(f"5xx:{req['request_id']}".encode()).hexdigest()[:16],
-                    anomaly_type=AnomalyType.ERROR_LOG,
-                    severity=AnomalySeverity.ERROR,
-                    title=f"服务器错误 {status}: {req['method']} {req['url'][:50]}",
-                    description=f"HTTP {status} 服务器内部错误",
-                    log_content=req.get('response_body', '')[:500] if req.get('response_body') else '',
-                    affected_endpoints=[f"{req['method']} {req['url']}"],
-                    metadata={"status_code": status}
-                )
-                anomalies.append(anomaly)
-            elif status >= 400:
-                anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(f"4xx:{req['request_id']}".encode()).hexdigest()[:16],
-                    anomaly_type=AnomalyType.WARNING_LOG,
-                    severity=AnomalySeverity.WARNING,
-                    title=f"客户端错误 {status}: {req['method']} {req['url'][:50]}",
-                    description=f"HTTP {status} 客户端请求错误",
-                    log_content=req.get('response_body', '')[:500] if req.get('response_body') else '',
-                    affected_endpoints=[f"{req['method']} {req['url']}"],
-                    metadata={"status_code": status}
-                )
-                anomalies.append(anomaly)
+        status = req.get('http_status') or 0
+        has_error = req.get('has_error')
+        has_warning = req.get('has_warning')
+        if not (has_error or has_warning or status >= 400):
+            return anomalies
+        
+        # 同一请求的多条异常共用接口描述，只拼接一次
+        endpoint = f"{req['method']} {req['url']}"
+        short_endpoint = f"{req['method']} {req['url'][:50]}"
+        
+        # 检查 has_error 标记
+        if has_error:
+            error_msg = req.get('error_message', '')
+            anomaly = LogAnomaly(
+                anomaly_id=_short_id(req['request_id'], _ID_ERROR),
+                anomaly_type=AnomalyType.ERROR_LOG,
+                severity=AnomalySeverity.ERROR,
+                title=f"请求错误: {short_endpoint}",
+                description=error_msg[:500] if error_msg else "请求处理出错",
+                log_content=req.get('raw_logs', '')[:1000] if req.get('raw_logs') else '',
+                affected_endpoints=[endpoint]
+            )
+            anomalies.append(anomaly)
+        
+        # 检查 has_warning 标记
+        if has_warning:
+            warning_msg = req.get('warning_message', '')
+            anomaly = LogAnomaly(
+                anomaly_id=_short_id(req['request_id'], _ID_WARNING),
+                anomaly_type=AnomalyType.WARNING_LOG,
+                severity=AnomalySeverity.WARNING,
+                title=f"请求警告: {short_endpoint}",
+                description=warning_msg[:500] if warning_msg else "请求处理有警告",
+                log_content=req.get('raw_logs', '')[:1000] if req.get('raw_logs') else '',
+                affected_endpoints=[endpoint]
+            )
+            anomalies.append(anomaly)
+        
+        # 检查 HTTP 错误状态码
+        if status >= 500:
+            anomaly = LogAnomaly(
+                anomaly_id=_short_id(req['request_id'], _ID_5XX),
+                anomaly_type=AnomalyType.ERROR_LOG,
+                severity=AnomalySeverity.ERROR,
+                title=f"服务器错误 {status}: {short_endpoint}",
+                description=f"HTTP {status} 服务器内部错误",
+                log_content=req.get('response_body', '')[:500] if req.get('response_body') else '',
+                affected_endpoints=[endpoint],
+                metadata={"status_code": status}
+            )
+            anomalies.append(anomaly)
+        elif status >= 400:
+            anomaly = LogAnomaly(
+                anomaly_id=_short_id(req['request_id'], _ID_4XX),
+                anomaly_type=AnomalyType.WARNING_LOG,
+                severity=AnomalySeverity.WARNING,
+                title=f"客户端错误 {status}: {short_endpoint}",
+                description=f"HTTP {status} 客户端请求错误",
+                log_content=req.get('response_body', '')[:500] if req.get('response_body') else '',
+                affected_endpoints=[endpoint],
+                metadata={"status_code": status}
+            )
+            anomalies.append(anomaly)
         
         return anomalies
     
-    def _detect_exceptions(self, requests: list[dict[str, Any]]) -> list[LogAnomaly]:
+    def _detect_exceptions(self, requests: Iterable[dict[str, Any]]) -> list[LogAnomaly]:
         """检测异常堆栈"""
+        return [a for req in requests for a in self._exception_anomalies(req)]
+    
+    def _exception_anomalies(self, req: dict[str, Any]) -> list[LogAnomaly]:
+        """检测单条请求的异常堆栈"""
         anomalies: list[LogAnomaly] = []
         
-        for req in requests:
-            raw_logs = req.get('raw_logs', '') or ''
-            response_body = req.get('response_body', '') or ''
-            
-            content = f"{raw_logs}\n{response_body}"
+        raw_logs = req.get('raw_logs', '') or ''
+        response_body = req.get('response_body', '') or ''
+        
+        content = f"{raw_logs}\n{response_body}"
+        
+        stack_traces = _find_stack_traces(content)
+        if not stack_traces:
+            return anomalies
+        
+        endpoint = f"{req['method']} {req['url']}"
+        short_url = req['url'][:50]
+        
+        for stack_trace in stack_traces:
+            # 提取异常类型
+            exception_type = "Unknown Exception"
+            type_match = _EXCEPTION_TYPE_RE.search(stack_trace)
+            if type_match:
+                exception_type = type_match.group(1)
             
-            for pattern in self.STACK_TRACE_PATTERNS:
-                matches = re.finditer(pattern, content)
-                for match in matches:
-                    stack_trace = match.group(0)
-                    # 提取异常类型
-                    exception_type = "Unknown Exception"
-                    type_match = re.search(r'(\w+(?:Error|Exception))', stack_trace)
-                    if type_match:
-                        exception_type = type_match.group(1)
-                    
-                    anomaly = LogAnomaly(
-                        anomaly_id=hashlib.md5(stack_trace[:100].encode()).hexdigest()[:16],
-                        anomaly_type=AnomalyType.EXCEPTION,
-                        severity=AnomalySeverity.ERROR,
-                        title=f"异常: {exception_type}",
-                        description=f"在请求 {req['method']} {req['url'][:50]} 中检测到异常",
-                        log_content=stack_trace[:500],
-                        stack_trace=stack_trace,
-                        affected_endpoints=[f"{req['method']} {req['url']}"]
-                    )
-                    anomalies.append(anomaly)
+            anomaly = LogAnomaly(
+                anomaly_id=_short_id(stack_trace[:100]),
+                anomaly_type=AnomalyType.EXCEPTION,
+                severity=AnomalySeverity.ERROR,
+                title=f"异常: {exception_type}",
+                description=f"在请求 {req['method']} {short_url} 中检测到异常",
+                log_content=stack_trace[:500],
+                stack_trace=stack_trace,
+                affected_endpoints=[endpoint]
+            )
+            anomalies.append(anomaly)
         
         return anomalies
     
-    def _detect_performance_anomalies(self, requests: list[dict[str, Any]]) -> list[LogAnomaly]:
+    def _detect_performance_anomalies(self, requests: Iterable[dict[str, Any]]) -> list[LogAnomaly]:
         """检测性能异常"""
+        latency = _LatencyCollector()
+        for req in requests:
+            latency.feed(req)
+        return self._performance_anomalies(latency)
+    
+    def _performance_anomalies(self, latency: "_LatencyCollector") -> list[LogAnomaly]:
+        """根据收集到的响应时间生成性能异常"""
         anomalies: list[LogAnomaly] = []
         
-        # 计算响应时间统计
-        response_times = [
-            float(req.get('response_time_ms', 0))
-            for req in requests
-            if req.get('response_time_ms')
-        ]
+        # 统计与阈值判断均在响应时间数组上向量化完成，仅为命中行构造异常
+        response_times = np.frombuffer(latency.times, dtype=np.float64)
+        timed = response_times[response_times != 0]
         
-        if not response_times:
+        if not timed.size:
             return anomalies
         
-        avg_time = sum(response_times) / len(response_times)
+        avg_time = float(timed.mean())
         
         # 检测高延迟请求（超过平均值3倍或超过5秒）
-        threshold = max(avg_time * 3, 5000)
-        
-        for req in requests:
-            response_time = float(req.get('response_time_ms', 0))
+        threshold = max(avg_time * 3, _LatencyCollector.MIN_THRESHOLD_MS)
+        
+        # 超时（30秒）与高延迟的请求都在该下标集合中，按请求顺序依次生成
+        # 阈值不低于 MIN_THRESHOLD_MS，命中行必然在候选请求中
+        for i in np.flatnonzero(response_times > min(threshold, 30000)).tolist():
+            req = latency.candidates[i]
+            response_time = float(response_times[i])
+            endpoint = f"{req['method']} {req['url']}"
+            short_url = req['url'][:50]
             if response_time > threshold:
                 anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(f"slow:{req['request_id']}".encode()).hexdigest()[:16],
+                    anomaly_id=_short_id(req['request_id'], _ID_SLOW),
                     anomaly_type=AnomalyType.HIGH_LATENCY,
                     severity=AnomalySeverity.WARNING if response_time < 10000 else AnomalySeverity.ERROR,
                     title=f"高延迟请求: {response_time:.0f}ms",
-                    description=f"请求 {req['method']} {req['url'][:50]} 响应时间 {response_time:.0f}ms，超过阈值 {threshold:.0f}ms",
+                    description=f"请求 {req['method']} {short_url} 响应时间 {response_time:.0f}ms，超过阈值 {threshold:.0f}ms",
                     log_content=f"响应时间: {response_time}ms, 平均: {avg_time:.0f}ms",
-                    affected_endpoints=[f"{req['method']} {req['url']}"],
+                    affected_endpoints=[endpoint],
                     metadata={
                         "response_time_ms": response_time,
                         "threshold_ms": threshold,
@@ -492,89 +682,93 @@ class LogAnomalyDetectorService:
             # 检测超时
             if response_time > 30000:  # 30秒
                 anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(f"timeout:{req['request_id']}".encode()).hexdigest()[:16],
+                    anomaly_id=_short_id(req['request_id'], _ID_TIMEOUT),
                     anomaly_type=AnomalyType.TIMEOUT,
                     severity=AnomalySeverity.ERROR,
                     title=f"请求超时: {response_time:.0f}ms",
-                    description=f"请求 {req['method']} {req['url'][:50]} 可能超时",
+                    description=f"请求 {req['method']} {short_url} 可能超时",
                     log_content="",
-                    affected_endpoints=[f"{req['method']} {req['url']}"],
+                    affected_endpoints=[endpoint],
                     metadata={"response_time_ms": response_time}
                 )
                 anomalies.append(anomaly)
         
         return anomalies
     
-    def _detect_security_anomalies(self, requests: list[dict[str, Any]]) -> list[LogAnomaly]:
+    def _detect_security_anomalies(self, requests: Iterable[dict[str, Any]]) -> list[LogAnomaly]:
         """检测安全异常"""
-        anomalies: list[LogAnomaly] = []
-        
-        for req in requests:
-            url = req.get('url', '')
-            body = req.get('body', '') or ''
-            raw_logs = req.get('raw_logs', '') or ''
-            
-            content = f"{url}\n{body}\n{raw_logs}"
-            
-            for pattern, severity in self.SECURITY_PATTERNS:
-                if re.search(pattern, content, re.IGNORECASE):
-                    match = re.search(pattern, content, re.IGNORECASE)
-                    matched_text = match.group(0) if match else ""
-                    
-                    anomaly = LogAnomaly(
-                        anomaly_id=hashlib.md5(f"security:{req['request_id']}:{pattern}".encode()).hexdigest()[:16],
-                        anomaly_type=AnomalyType.SECURITY_ALERT,
-                        severity=severity,
-                        title=f"安全告警: {matched_text[:30]}",
-                        description=f"在请求 {req['method']} {req['url'][:50]} 中检测到潜在安全问题",
-                        log_content=content[:500],
-                        affected_endpoints=[f"{req['method']} {req['url']}"],
-                        suggested_actions=[
-                            "检查请求来源是否合法",
-                            "验证输入参数是否经过安全过滤",
-                            "检查相关日志确认是否为攻击行为"
-                        ]
-                    )
-                    anomalies.append(anomaly)
-                    break
+        return [a for a in map(self._security_anomaly, requests) if a]
+    
+    def _security_anomaly(self, req: dict[str, Any]) -> LogAnomaly | None:
+        """检测单条请求的安全异常（首个命中的模式生效）"""
+        url = req.get('url', '')
+        body = req.get('body', '') or ''
+        raw_logs = req.get('raw_logs', '') or ''
+        
+        content = f"{url}\n{body}\n{raw_logs}"
+        
+        # ASCII 内容整体转小写一次（长度不变，可按位置取回原文），匹配时无需逐字符忽略大小写；
+        # 非 ASCII 内容的忽略大小写语义与 lower() 不同，仍使用原模式
+        ascii_only = content.isascii()
+        haystack = content.lower() if ascii_only else content
+        
+        for (pattern, severity), lowered in zip(self.SECURITY_PATTERNS, self._SECURITY_PATTERNS_LOWER):
+            match = (lowered if ascii_only else pattern).search(haystack)
+            if match:
+                matched_text = content[match.start():match.end()]
+                
+                anomaly = LogAnomaly(
+                    anomaly_id=_short_id(f"{req['request_id']}:{pattern.pattern}", _ID_SECURITY),
+                    anomaly_type=AnomalyType.SECURITY_ALERT,
+                    severity=severity,
+                    title=f"安全告警: {matched_text[:30]}",
+                    description=f"在请求 {req['method']} {url[:50]} 中检测到潜在安全问题",
+                    log_content=content[:500],
+                    affected_endpoints=[f"{req['method']} {url}"],
+                    suggested_actions=[
+                        "检查请求来源是否合法",
+                        "验证输入参数是否经过安全过滤",
+                        "检查相关日志确认是否为攻击行为"
+                    ]
+                )
+                return anomaly
         
-        return anomalies
+        return None
     
-    def _detect_error_rate_anomalies(self, requests: list[dict[str, Any]]) -> list[LogAnomaly]:
+    def _detect_error_rate_anomalies(self, requests: Iterable[dict[str, Any]]) -> list[LogAnomaly]:
         """检测错误率异常"""
-        anomalies: list[LogAnomaly] = []
-        
-        # 按接口分组统计
-        endpoint_stats: dict[str, dict[str, int]] = defaultdict(lambda: {"total": 0, "errors": 0})
-        
+        error_rates = _ErrorRateCounter()
         for req in requests:
-            key = f"{req['method']} {req['url'].split('?')[0]}"
-            endpoint_stats[key]["total"] += 1
-            
-            status = req.get('http_status', 0)
-            if status >= 400 or req.get('has_error'):
-                endpoint_stats[key]["errors"] += 1
+            error_rates.feed(req)
+        return self._error_rate_anomalies(error_rates)
+    
+    def _error_rate_anomalies(self, error_rates: "_ErrorRateCounter") -> list[LogAnomaly]:
+        """根据按接口计数生成错误率异常"""
+        anomalies: list[LogAnomaly] = []
+        total_counts = error_rates.total_counts
+        error_counts = error_rates.error_counts
         
         # 检测高错误率接口
-        for endpoint, stats in endpoint_stats.items():
-            if stats["total"] < 5:  # 样本太少，跳过
+        for endpoint, total in total_counts.items():
+            if total < 5:  # 样本太少，跳过
                 continue
             
-            error_rate = stats["errors"] / stats["total"]
+            errors = error_counts[endpoint]
+            error_rate = errors / total
             
             if error_rate > 0.5:  # 错误率超过50%
                 anomaly = LogAnomaly(
-                    anomaly_id=hashlib.md5(f"error_rate:{endpoint}".encode()).hexdigest()[:16],
+                    anomaly_id=_short_id(endpoint, _ID_ERROR_RATE),
                     anomaly_type=AnomalyType.ERROR_RATE_SPIKE,
                     severity=AnomalySeverity.CRITICAL if error_rate > 0.8 else AnomalySeverity.ERROR,
                     title=f"高错误率: {error_rate:.0%}",
-                    description=f"接口 {endpoint} 错误率 {error_rate:.0%} ({stats['errors']}/{stats['total']})",
+                    description=f"接口 {endpoint} 错误率 {error_rate:.0%} ({errors}/{total})",
                     log_content="",
                     affected_endpoints=[endpoint],
                     metadata={
                         "error_rate": error_rate,
-                        "total_requests": stats["total"],
-                        "error_count": stats["errors"]
+                        "total_requests": total,
+                        "error_count": errors
                     },
                     suggested_actions=[
                         "检查接口实现是否有bug",
@@ -594,30 +788,21 @@ class LogAnomalyDetectorService:
         severity: AnomalySeverity
     ) -> LogAnomaly:
         """从日志行创建异常"""
-        # 提取时间戳
-        timestamp = None
-        ts_match = re.search(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}', line)
-        if ts_match:
-            try:
-                timestamp = datetime.fromisoformat(ts_match.group(0).replace(' ', 'T'))
-            except ValueError:
-                pass
-        
         return LogAnomaly(
-            anomaly_id=hashlib.md5(f"{line_number}:{line[:50]}".encode()).hexdigest()[:16],
+            anomaly_id=_short_id(f"{line_number}:{line[:50]}"),
             anomaly_type=anomaly_type,
             severity=severity,
             title=self._extract_title(line, anomaly_type),
             description=line[:200],
             log_content=line,
-            timestamp=timestamp,
+            timestamp=_parse_timestamp(line),
             metadata={"line_number": line_number}
         )
     
     def _extract_title(self, line: str, anomaly_type: AnomalyType) -> str:
         """从日志行提取标题"""
         # 尝试提取错误类型
-        error_match = re.search(r'(\w+(?:Error|Exception|Warning|Failed))', line)
+        error_match = _TITLE_TYPE_RE.search(line)
         if error_match:
             return error_match.group(1)
         
@@ -632,50 +817,22 @@ class LogAnomalyDetectorService:
     
     def _aggregate_anomalies(self, anomalies: list[LogAnomaly]) -> list[LogAnomaly]:
         """聚合相似异常"""
-        # 按标题分组
-        groups: dict[str, list[LogAnomaly]] = defaultdict(list)
+        # 使用类型和标题作为分组键，单次遍历累计次数、最高严重级别和受影响接口
+        groups: dict[tuple[AnomalyType, str], _AnomalyGroup] = {}
         
         for anomaly in anomalies:
-            # 使用标题和类型作为分组键
-            key = f"{anomaly.anomaly_type.value}:{anomaly.title}"
-            groups[key].append(anomaly)
-        
-        # 聚合
-        aggregated: list[LogAnomaly] = []
-        for key, group in groups.items():
-            if len(group) == 1:
-                aggregated.append(group[0])
+            key = (anomaly.anomaly_type, anomaly.title)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = _AnomalyGroup(anomaly)
             else:
-                # 合并同类异常
-                first = group[0]
-                all_endpoints = []
-                for a in group:
-                    all_endpoints.extend(a.affected_endpoints)
-                
-                merged = LogAnomaly(
-                    anomaly_id=first.anomaly_id,
-                    anomaly_type=first.anomaly_type,
-                    severity=max(a.severity.value for a in group) and first.severity,  # 取最高严重级别
-                    title=f"{first.title} (x{len(group)})",
-                    description=first.description,
-                    log_content=first.log_content,
-                    timestamp=first.timestamp,
-                    count=len(group),
-                    affected_endpoints=list(set(all_endpoints))[:10],
-                    stack_trace=first.stack_trace,
-                    suggested_actions=first.suggested_actions,
-                    metadata={**first.metadata, "occurrence_count": len(group)}
-                )
-                aggregated.append(merged)
+                group.add(anomaly)
+        
+        # 聚合（不修改传入的异常对象）
+        aggregated = [group.merged() for group in groups.values()]
         
         # 按严重程度排序
-        severity_order = {
-            AnomalySeverity.CRITICAL: 0,
-            AnomalySeverity.ERROR: 1,
-            AnomalySeverity.WARNING: 2,
-            AnomalySeverity.INFO: 3
-        }
-        aggregated.sort(key=lambda a: (severity_order.get(a.severity, 9), -a.count))
+        aggregated.sort(key=lambda a: (_SEVERITY_RANK[a.severity], -a.count))
         
         return aggregated
     
@@ -697,7 +854,7 @@ class LogAnomalyDetectorService:
         
         # 调用 AI 诊断
         result = self.analysis_chain.diagnose_errors(
-            error_logs=json.dumps(anomaly_summary, ensure_ascii=False, indent=2),
+            error_logs=_dumps(anomaly_summary, indent=True),
             context={
                 "total_anomalies": len(anomalies),
                 "critical_count": sum(1 for a in anomalies if a.severity == AnomalySeverity.CRITICAL),
@@ -717,9 +874,7 @@ class LogAnomalyDetectorService:
         recommendations: list[str]
     ) -> AnomalyReport:
         """创建异常报告"""
-        report_id = hashlib.md5(
-            f"anomaly_report:{task_id}:{datetime.now().isoformat()}".encode()
-        ).hexdigest()[:16]
+        report_id = _short_id(f"{task_id}:{datetime.now().isoformat()}", _ID_REPORT)
         
         critical_count = sum(1 for a in anomalies if a.severity == AnomalySeverity.CRITICAL)
         error_count = sum(1 for a in anomalies if a.severity == AnomalySeverity.ERROR)
@@ -750,14 +905,19 @@ class LogAnomalyDetectorService:
         )
     
     def _save_report(self, report: AnomalyReport) -> None:
-        """保存报告到数据库"""
+        """
+        保存报告到数据库
+        
+        报告行保留前 50 条问题摘要（issues 列，供报告详情读取），
+        全部问题逐条写入 analysis_issues；两者在同一事务中提交
+        """
         # 生成 Markdown 内容
         content = self._generate_markdown_report(report)
         
         sql = """
             INSERT INTO analysis_reports 
-            (task_id, report_type, title, content, format, statistics, issues, recommendations)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            (task_id, report_type, title, content, format, statistics, issues, recommendations, metadata)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         
         statistics = {
@@ -779,105 +939,312 @@ class LogAnomalyDetectorService:
             for a in report.anomalies[:50]
         ]
         
-        self.db.execute(sql, (
-            report.task_id,
-            'analysis',
-            report.title,
-            content,
-            'markdown',
-            json.dumps(statistics, ensure_ascii=False),
-            json.dumps(issues, ensure_ascii=False),
-            json.dumps(report.recommendations, ensure_ascii=False)
-        ))
+        issue_sql = """
+            INSERT INTO analysis_issues 
+            (report_id, task_id, anomaly_id, anomaly_type, severity, title, description, count)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        issue_rows = [
+            (
+                report.report_id,
+                report.task_id,
+                a.anomaly_id,
+                a.anomaly_type.value,
+                a.severity.value,
+                a.title,
+                a.description[:500],
+                a.count
+            )
+            for a in report.anomalies
+        ]
+        
+        # 直接使用游标，使报告行与问题行在同一事务中提交或回滚
+        with self.db.get_cursor() as cursor:
+            cursor.execute(sql.replace('%s', '?'), (
+                report.task_id,
+                'analysis',
+                report.title,
+                content,
+                'markdown',
+                _dumps(statistics),
+                _dumps(issues),
+                _dumps(report.recommendations),
+                _dumps({"report_id": report.report_id})
+            ))
+            if issue_rows:
+                cursor.executemany(issue_sql.replace('%s', '?'), issue_rows)
     
     def _generate_markdown_report(self, report: AnomalyReport) -> str:
         """生成 Markdown 格式报告"""
-        lines = [
-            f"# {report.title}",
-            "",
-            f"**生成时间**: {report.created_at.strftime('%Y-%m-%d %H:%M:%S')}",
-            "",
-            "## 摘要",
-            "",
-            report.summary,
-            "",
-            "## 统计",
-            "",
-            f"- 总异常数: {report.total_anomalies}",
-            f"- 严重: {report.critical_count}",
-            f"- 错误: {report.error_count}",
-            f"- 警告: {report.warning_count}",
-            "",
-        ]
+        # 直接写入缓冲区；每个段落以分隔空行开头、以换行结尾
+        buf = io.StringIO()
+        w = buf.write
+        w(
+            f"# {report.title}\n"
+            "\n"
+            f"**生成时间**: {report.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            "\n"
+            "## 摘要\n"
+            "\n"
+            f"{report.summary}\n"
+            "\n"
+            "## 统计\n"
+            "\n"
+            f"- 总异常数: {report.total_anomalies}\n"
+            f"- 严重: {report.critical_count}\n"
+            f"- 错误: {report.error_count}\n"
+            f"- 警告: {report.warning_count}\n"
+        )
+        
+        # 单次遍历按级别分桶，每级最多展示 10 条，三个桶都满后提前结束
+        critical_anomalies: list[LogAnomaly] = []
+        error_anomalies: list[LogAnomaly] = []
+        warning_anomalies: list[LogAnomaly] = []
+        buckets = {
+            AnomalySeverity.CRITICAL: critical_anomalies,
+            AnomalySeverity.ERROR: error_anomalies,
+            AnomalySeverity.WARNING: warning_anomalies,
+        }
+        full = 0
+        for a in report.anomalies:
+            bucket = buckets.get(a.severity)
+            if bucket is None or len(bucket) >= self.REPORT_SECTION_LIMIT:
+                continue
+            bucket.append(a)
+            if len(bucket) == self.REPORT_SECTION_LIMIT:
+                full += 1
+                if full == len(buckets):
+                    break
         
         # 严重问题
-        critical_anomalies = [a for a in report.anomalies if a.severity == AnomalySeverity.CRITICAL]
         if critical_anomalies:
-            lines.extend([
-                "## 🔴 严重问题",
-                ""
-            ])
-            for a in critical_anomalies[:10]:
-                lines.extend([
-                    f"### {a.title}",
-                    "",
-                    a.description,
-                    "",
-                    f"- 类型: {a.anomaly_type.value}",
-                    f"- 出现次数: {a.count}",
-                    ""
-                ])
+            w("\n## 🔴 严重问题\n")
+            for a in critical_anomalies:
+                w(
+                    f"\n### {a.title}\n"
+                    "\n"
+                    f"{a.description}\n"
+                    "\n"
+                    f"- 类型: {a.anomaly_type.value}\n"
+                    f"- 出现次数: {a.count}\n"
+                )
                 if a.suggested_actions:
-                    lines.append("**建议操作**:")
+                    w("\n**建议操作**:\n")
                     for action in a.suggested_actions:
-                        lines.append(f"- {action}")
-                    lines.append("")
+                        w(f"- {action}\n")
         
         # 错误
-        error_anomalies = [a for a in report.anomalies if a.severity == AnomalySeverity.ERROR]
         if error_anomalies:
-            lines.extend([
-                "## 🟠 错误",
-                ""
-            ])
-            for a in error_anomalies[:10]:
-                lines.extend([
-                    f"### {a.title}",
-                    "",
-                    a.description[:300],
-                    "",
-                    f"- 出现次数: {a.count}",
-                    ""
-                ])
+            w("\n## 🟠 错误\n")
+            for a in error_anomalies:
+                w(
+                    f"\n### {a.title}\n"
+                    "\n"
+                    f"{a.description[:300]}\n"
+                    "\n"
+                    f"- 出现次数: {a.count}\n"
+                )
         
         # 警告
-        warning_anomalies = [a for a in report.anomalies if a.severity == AnomalySeverity.WARNING]
         if warning_anomalies:
-            lines.extend([
-                "## 🟡 警告",
-                ""
-            ])
-            for a in warning_anomalies[:10]:
-                lines.append(f"- **{a.title}**: {a.description[:100]} (x{a.count})")
-            lines.append("")
+            w("\n## 🟡 警告\n\n")
+            for a in warning_anomalies:
+                w(f"- **{a.title}**: {a.description[:100]} (x{a.count})\n")
         
         # AI 分析
         if report.ai_analysis:
-            lines.extend([
-                "## AI 分析",
-                "",
-                report.ai_analysis,
-                ""
-            ])
+            w(f"\n## AI 分析\n\n{report.ai_analysis}\n")
         
         # 建议
         if report.recommendations:
-            lines.extend([
-                "## 改进建议",
-                ""
-            ])
+            w("\n## 改进建议\n\n")
             for i, rec in enumerate(report.recommendations, 1):
-                lines.append(f"{i}. {rec}")
-            lines.append("")
+                w(f"{i}. {rec}\n")
         
-        return "\n".join(lines)
+        return buf.getvalue()
+
+
+class _StackTraceCollector:
+    """
+    逐行收集异常堆栈
+
+    输入为按 "\\n" 切分的日志行，结果与在完整日志上执行以下正则一致：
+    - Python：从 "Traceback (most recent call last):" 到下一个空行（或日志结尾）
+    - Java：从首个 "at x.y(File.java:N)" 帧到下一个空行（或日志结尾）
+    - JavaScript："Error:" 行后紧跟至少一个 "at" 帧行（每行以换行结尾）
+    单个堆栈最多保留 MAX_LINES 行，超出部分只消费不保存，内存占用与日志总大小无关
+    """
+
+    MAX_LINES = 200
+    _PYTHON_HEADER = "Traceback (most recent call last):"
+    _JAVA_FRAME_RE = re.compile(r'at [\w.$]+\([\w.]+:\d+\)')
+    _JS_FRAME_RE = re.compile(r'\s+at ')
+    _JS_FRAME_AFTER_GAP_RE = re.compile(r'\s*at ')
+
+    def __init__(self):
+        self._blocks: dict[str, list[str] | None] = {"python": None, "java": None}
+        # 块内遇到空行后暂不结束：下一行到来时结束，若空行是最后一行则堆栈包含结尾换行
+        self._ended: dict[str, bool] = {"python": False, "java": False}
+        self._js_header: str | None = None
+        self._js: list[str] | None = None
+        self._js_gap: list[str] = []
+        self._traces: dict[str, list[str]] = {"python": [], "java": [], "js": []}
+
+    def feed(self, line: str) -> None:
+        """处理一行日志"""
+        self._feed_block("python", line)
+        self._feed_block("java", line)
+        self._feed_js(line)
+
+    def finish(self) -> list[str]:
+        """结束输入，返回按 Python、Java、JavaScript 顺序排列的堆栈文本"""
+        for kind, block in self._blocks.items():
+            if block is not None:
+                text = "\n".join(block)
+                self._traces[kind].append(text + "\n" if self._ended[kind] else text)
+                self._blocks[kind] = None
+        if self._js is not None:
+            # 最后一帧之后没有换行时不属于堆栈
+            frames = self._js if self._js_gap else self._js[:-1]
+            if len(frames) > 1:
+                self._traces["js"].append("\n".join(frames) + "\n")
+        self._js = None
+        self._js_header = None
+        self._js_gap = []
+        return [*self._traces["python"], *self._traces["java"], *self._traces["js"]]
+
+    def _feed_block(self, kind: str, line: str) -> None:
+        block = self._blocks[kind]
+        if block is not None:
+            if self._ended[kind]:
+                self._traces[kind].append("\n".join(block))
+                self._blocks[kind] = None
+                self._ended[kind] = False
+            elif line:
+                if len(block) < self.MAX_LINES:
+                    block.append(line)
+                return
+            else:
+                self._ended[kind] = True
+                return
+
+        if kind == "python":
+            idx = line.find(self._PYTHON_HEADER)
+            if idx >= 0:
+                self._blocks[kind] = [line[idx:]]
+        elif "at " in line:
+            match = self._JAVA_FRAME_RE.search(line)
+            if match:
+                self._blocks[kind] = [line[match.start():]]
+
+    def _feed_js(self, line: str) -> None:
+        if self._js is not None or self._js_header is not None:
+            # 帧之前的空白行可被 \s+ 跨越，先暂存
+            if not line.strip():
+                self._js_gap.append(line)
+                return
+            frame_re = self._JS_FRAME_AFTER_GAP_RE if self._js_gap else self._JS_FRAME_RE
+            if frame_re.match(line):
+                if self._js is None:
+                    self._js = [self._js_header]
+                    self._js_header = None
+                if len(self._js) < self.MAX_LINES:
+                    # 空白行与其后的帧作为一个整体，便于结尾时一并舍弃
+                    self._js.append("\n".join([*self._js_gap, line]))
+                self._js_gap = []
+                return
+            if self._js is not None:
+                self._traces["js"].append("\n".join(self._js) + "\n")
+            self._js = None
+            self._js_header = None
+            self._js_gap = []
+
+        idx = line.find("Error:")
+        if idx >= 0:
+            self._js_header = line[idx:]
+
+
+class _LatencyCollector:
+    """
+    流式收集响应时间
+
+    全部响应时间存入紧凑的 float64 数组（每条 8 字节），请求记录本身只保留
+    超过最低阈值的候选行，供遍历结束后按全局平均值判断高延迟与超时
+    """
+
+    MIN_THRESHOLD_MS = 5000
+
+    def __init__(self) -> None:
+        self.times = array('d')
+        self.candidates: dict[int, dict[str, Any]] = {}
+
+    def feed(self, req: dict[str, Any]) -> None:
+        response_time = float(req.get('response_time_ms') or 0)
+        if response_time > self.MIN_THRESHOLD_MS:
+            self.candidates[len(self.times)] = req
+        self.times.append(response_time)
+
+
+class _ErrorRateCounter:
+    """按接口流式统计请求数与错误数（两个平铺计数器，键相同）"""
+
+    def __init__(self) -> None:
+        self.total_counts: Counter[str] = Counter()
+        self.error_counts: Counter[str] = Counter()
+
+    def feed(self, req: dict[str, Any]) -> None:
+        url = req['url']
+        q = url.find('?')
+        key = f"{req['method']} {url if q < 0 else url[:q]}"
+        self.total_counts[key] += 1
+        
+        status = req.get('http_status') or 0
+        if status >= 400 or req.get('has_error'):
+            self.error_counts[key] += 1
+
+
+class _AnomalyGroup:
+    """同类异常的聚合状态（受影响接口去重后最多保留 10 个）"""
+
+    __slots__ = ("first", "count", "severity", "endpoints")
+
+    MAX_ENDPOINTS = 10
+
+    def __init__(self, first: LogAnomaly) -> None:
+        self.first = first
+        self.count = 1
+        self.severity = first.severity
+        self.endpoints: dict[str, None] = {}
+        self._add_endpoints(first)
+
+    def add(self, anomaly: LogAnomaly) -> None:
+        self.count += 1
+        if _SEVERITY_RANK[anomaly.severity] < _SEVERITY_RANK[self.severity]:
+            self.severity = anomaly.severity
+        self._add_endpoints(anomaly)
+
+    def _add_endpoints(self, anomaly: LogAnomaly) -> None:
+        for endpoint in anomaly.affected_endpoints:
+            if len(self.endpoints) >= self.MAX_ENDPOINTS:
+                return
+            self.endpoints[endpoint] = None
+
+    def merged(self) -> LogAnomaly:
+        """单个异常原样返回，多个异常合并为一条（取首个异常的内容和最高严重级别）"""
+        first = self.first
+        if self.count == 1:
+            return first
+        return LogAnomaly(
+            anomaly_id=first.anomaly_id,
+            anomaly_type=first.anomaly_type,
+            severity=self.severity,
+            title=f"{first.title} (x{self.count})",
+            description=first.description,
+            log_content=first.log_content,
+            timestamp=first.timestamp,
+            count=self.count,
+            affected_endpoints=list(self.endpoints),
+            stack_trace=first.stack_trace,
+            suggested_actions=first.suggested_actions,
+            metadata={**first.metadata, "occurrence_count": self.count}
+        )
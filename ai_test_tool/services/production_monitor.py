@@ -5,18 +5,74 @@
 
 import json
 import hashlib
+import importlib.util
 import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable
 from typing import Any
 from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
 
+import httpx
+
+try:
+    import orjson  # 可选依赖：存在时用于更快的 JSON 编解码
+except ImportError:
+    orjson = None
+
 from ..database import get_db_manager
+from ..database.repository import ProductionRequestRepository
 from ..llm.chains import ResultValidatorChain
 from ..llm.provider import get_llm_provider
 from ..utils.logger import get_logger
 from ..health.models import HealthStatus
 from ..database.models.monitoring import RequestSource
 
+# 安装了 h2（httpx[http2]）时启用 HTTP/2，同一主机的并发请求复用单个连接
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# URL 中的数字 ID 路径段
+_NUMERIC_ID_RE = re.compile(r'/\d+(?=/|$)')
+# 正则元字符；期望响应模式不含这些字符时按普通子串匹配
+_REGEX_META_RE = re.compile(r'[\\\[\]().*+?{}|^$]')
+
+
+def _dumps(obj: Any) -> str:
+    """序列化为 JSON 字符串（保留非 ASCII 字符）；安装了 orjson 时使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+def _loads(text: str | bytes) -> Any:
+    """解析 JSON；安装了 orjson 时使用 orjson（解析失败同样抛出 json.JSONDecodeError）"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _json_column(value: Any) -> str:
+    """将 headers/query_params 规范化为存储用 JSON 文本"""
+    if isinstance(value, str):
+        return _reencode_json(value) if value else '{}'
+    return _dumps(value)
+
+
+@lru_cache(maxsize=1024)
+def _reencode_json(text: str) -> str:
+    """重新编码数据库中读出的 JSON 文本（同一接口的请求常共享相同内容，按原文缓存）"""
+    return _dumps(_loads(text))
+
+
+@lru_cache(maxsize=1024)
+def _tags_json(tags: tuple[str, ...]) -> str:
+    """编码标签列表（同一接口的请求标签相同，按内容缓存）"""
+    return _dumps(tags)
+
 
 @dataclass
 class ProductionRequest:
@@ -61,11 +117,29 @@ class ProductionMonitorService:
     4. 异常告警通知
     """
     
+    # 批量 IN 查询/更新的分批大小
+    QUERY_CHUNK_SIZE = 500
+    # 健康检查读取/保存的响应体最大字符数
+    RESPONSE_BODY_LIMIT = 5000
+    # 健康检查 HTTP 连接池上限
+    HTTP_MAX_CONNECTIONS = 64
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+    
     def __init__(self, verbose: bool = False):
         self.logger = get_logger(verbose)
         self.verbose = verbose
         self.db = get_db_manager()
         self._validator_chain: ResultValidatorChain | None = None
+        # 期望响应模式的匹配函数缓存（按模式文本）
+        self._pattern_cache: dict[str, Callable[[str], Any]] = {}
+        # 跨多次健康检查复用的 HTTP 客户端（连接池）
+        self._http_client: httpx.Client | None = None
+        self._http_client_lock = threading.Lock()
+    
+    @property
+    def request_repo(self) -> ProductionRequestRepository:
+        """生产请求仓库（基于当前数据库连接管理器，仓库本身无状态）"""
+        return ProductionRequestRepository(self.db)
     
     @property
     def validator_chain(self) -> ResultValidatorChain:
@@ -117,20 +191,36 @@ class ProductionMonitorService:
                 endpoint_groups[key] = []
             endpoint_groups[key].append(row)
         
-        saved_count = 0
+        # 先构建全部候选行（同一请求只保留一次），再批量去重、批量写入
+        candidates: dict[str, tuple[Any, ...]] = {}
+        seen: set[tuple[str, str, Any]] = set()
         skipped_count = 0
         
         for endpoint_key, requests in endpoint_groups.items():
             # 每个接口只保留部分请求
             for req in requests[:max_requests_per_endpoint]:
+                # 相同 method/url/body 的请求在计算 ID、编码字段前直接跳过
+                key = (req['method'], req['url'], req.get('body', ''))
+                if key in seen:
+                    skipped_count += 1
+                    continue
+                seen.add(key)
                 try:
-                    if self._save_production_request(req, task_id, tags):
-                        saved_count += 1
-                    else:
-                        skipped_count += 1
+                    row = self._build_production_row(req, task_id, tags)
                 except Exception as e:
                     self.logger.error(f"保存请求失败: {e}")
                     skipped_count += 1
+                    continue
+                if row[0] in candidates:
+                    skipped_count += 1
+                else:
+                    candidates[row[0]] = row
+        
+        existing = self._get_existing_request_ids(list(candidates))
+        new_rows = [row for request_id, row in candidates.items() if request_id not in existing]
+        skipped_count += len(candidates) - len(new_rows)
+        saved_count = self._insert_production_requests(new_rows)
+        skipped_count += len(new_rows) - saved_count
         
         self.logger.end_step(f"保存 {saved_count} 个请求，跳过 {skipped_count} 个")
         
@@ -146,7 +236,8 @@ class ProductionMonitorService:
         base_url: str,
         tag_filter: str | None = None,
         use_ai_validation: bool = True,
-        timeout_seconds: int = 30
+        timeout_seconds: int = 30,
+        parallel: int = 5
     ) -> dict[str, Any]:
         """
         执行线上健康检查
@@ -156,12 +247,11 @@ class ProductionMonitorService:
             tag_filter: 按标签筛选
             use_ai_validation: 是否使用AI验证返回结果
             timeout_seconds: 请求超时时间
+            parallel: 最大并发请求数
             
         Returns:
             检查结果统计
         """
-        import httpx
-        
         self.logger.start_step("执行线上健康检查")
         
         # 获取要检查的请求
@@ -179,27 +269,28 @@ class ProductionMonitorService:
         # 创建执行记录
         execution_id = self._create_execution_record(base_url, total)
         
-        with httpx.Client(timeout=timeout_seconds) as client:
-            for i, req in enumerate(requests):
+        # 检查结果与请求状态先在内存中累积，结束后批量写库
+        check_rows: list[tuple[Any, ...]] = []
+        success_ids: list[str] = []
+        failure_ids: list[str] = []
+        
+        # 请求与 AI 验证在线程池中并发执行（共享同一 httpx.Client 连接池），
+        # 结果按原顺序在当前线程汇总
+        client = self._get_http_client()
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(parallel, total)), thread_name_prefix="health-check"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._check_single_request, client, req, base_url, use_ai_validation, timeout_seconds
+                )
+                for req in requests
+            ]
+            for i, (req, future) in enumerate(zip(requests, futures)):
                 self.logger.debug(f"检查 {i+1}/{total}: {req['method']} {req['url']}")
                 
                 try:
-                    result = self._check_single_request(
-                        client, req, base_url, use_ai_validation
-                    )
-                    results.append(result)
-                    
-                    if result.success:
-                        healthy_count += 1
-                        self._update_request_status(req['request_id'], True)
-                    else:
-                        unhealthy_count += 1
-                        self._update_request_status(req['request_id'], False)
-                        self._record_failure(req, result)
-                    
-                    # 保存检查结果
-                    self._save_check_result(execution_id, result)
-                    
+                    result = future.result()
                 except Exception as e:
                     unhealthy_count += 1
                     self.logger.error(f"检查失败: {e}")
@@ -212,7 +303,24 @@ class ProductionMonitorService:
                         error_message=str(e)
                     )
                     results.append(error_result)
-                    self._update_request_status(req['request_id'], False)
+                    failure_ids.append(req['request_id'])
+                    continue
+                
+                results.append(result)
+                if result.success:
+                    healthy_count += 1
+                    success_ids.append(req['request_id'])
+                else:
+                    unhealthy_count += 1
+                    failure_ids.append(req['request_id'])
+                    self._record_failure(req, result)
+                
+                check_rows.append(self._check_result_row(execution_id, result))
+        
+        # 保存检查结果并更新请求状态
+        self._save_check_results(check_rows)
+        self._update_request_statuses(success_ids, True)
+        self._update_request_statuses(failure_ids, False)
         
         # 更新执行记录
         self._complete_execution_record(execution_id, healthy_count, unhealthy_count)
@@ -243,20 +351,15 @@ class ProductionMonitorService:
         client: Any,
         req: dict[str, Any],
         base_url: str,
-        use_ai_validation: bool
+        use_ai_validation: bool,
+        timeout_seconds: float | None = None
     ) -> HealthCheckResult:
         """检查单个请求"""
-        import time
-        
         method = req['method']
         url = req['url']
-        headers = req.get('headers', {})
+        headers = req.get('headers') or {}
         body = req.get('body')
         
-        # 解析 JSON 字段
-        if isinstance(headers, str):
-            headers = json.loads(headers) if headers else {}
-        
         # 构建完整 URL
         if not url.startswith('http'):
             full_url = f"{base_url.rstrip('/')}{url}"
@@ -271,46 +374,41 @@ class ProductionMonitorService:
             "url": full_url,
             "headers": headers
         }
+        if timeout_seconds is not None:
+            request_kwargs["timeout"] = timeout_seconds
         
         if body and method.upper() in ['POST', 'PUT', 'PATCH']:
             if isinstance(body, str):
                 try:
-                    request_kwargs["json"] = json.loads(body)
+                    request_kwargs["json"] = _loads(body)
                 except json.JSONDecodeError:
                     request_kwargs["content"] = body
             else:
                 request_kwargs["json"] = body
         
-        response = client.request(**request_kwargs)
+        # 流式读取响应，只保留前 RESPONSE_BODY_LIMIT 个字符，不下载/解码剩余部分
+        with client.stream(**request_kwargs) as response:
+            response_body = self._read_response_prefix(response)
         response_time_ms = (time.time() - start_time) * 1000
         
-        # 获取响应内容
-        try:
-            response_body = response.text
-        except Exception:
-            response_body = ""
-        
         # 基础验证
         expected_status = req.get('expected_status_code', 200)
         status_ok = response.status_code == expected_status
         
         # 响应模式验证
-        pattern_ok = True
         expected_pattern = req.get('expected_response_pattern')
-        if expected_pattern and response_body:
-            pattern_ok = bool(re.search(expected_pattern, response_body))
+        pattern_checked = bool(expected_pattern and response_body)
+        pattern_ok = not pattern_checked or bool(self._get_matcher(expected_pattern)(response_body))
         
-        # AI 验证
+        # AI 验证：状态码不符（结果已确定）或已按期望模式判定时跳过，避免无谓的 LLM 调用
         ai_analysis = None
-        if use_ai_validation and response_body:
+        ai_ok = True
+        if use_ai_validation and response_body and status_ok and not pattern_checked:
             try:
                 ai_analysis = self._ai_validate_response(req, response.status_code, response_body)
                 ai_ok = ai_analysis.get('is_valid', True)
             except Exception as e:
                 self.logger.warn(f"AI 验证失败: {e}")
-                ai_ok = True
-        else:
-            ai_ok = True
         
         success = status_ok and pattern_ok and ai_ok
         error_message = None
@@ -327,11 +425,58 @@ class ProductionMonitorService:
             success=success,
             status_code=response.status_code,
             response_time_ms=response_time_ms,
-            response_body=response_body[:5000],  # 限制长度
+            response_body=response_body,
             error_message=error_message,
             ai_analysis=ai_analysis
         )
     
+    def _get_http_client(self) -> httpx.Client:
+        """获取共享的 HTTP 客户端（超时按请求传入，连接在多次健康检查间保持）"""
+        if self._http_client is None:
+            with self._http_client_lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(
+                        http2=_HTTP2_AVAILABLE,
+                        limits=httpx.Limits(
+                            max_connections=self.HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=self.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                        ),
+                    )
+        return self._http_client
+    
+    def close(self) -> None:
+        """关闭共享的 HTTP 客户端（之后再次检查时会重新创建）"""
+        with self._http_client_lock:
+            client, self._http_client = self._http_client, None
+        if client is not None:
+            client.close()
+    
+    def _read_response_prefix(self, response: httpx.Response) -> str:
+        """读取并解码响应体前缀（最多 RESPONSE_BODY_LIMIT 个字符）"""
+        # UTF-8 单个字符最多 4 字节，按字符上限的 4 倍读取字节即可保证前缀完整
+        max_bytes = self.RESPONSE_BODY_LIMIT * 4
+        buf = bytearray()
+        try:
+            for chunk in response.iter_bytes(chunk_size=4096):
+                buf += chunk
+                if len(buf) >= max_bytes:
+                    break
+            text = bytes(buf[:max_bytes]).decode(response.encoding or 'utf-8', errors='replace')
+        except Exception:
+            return ""
+        return text[:self.RESPONSE_BODY_LIMIT]
+    
+    def _get_matcher(self, pattern: str) -> Callable[[str], Any]:
+        """获取期望响应模式的匹配函数（不含正则元字符时用子串查找代替正则搜索）"""
+        matcher = self._pattern_cache.get(pattern)
+        if matcher is None:
+            if _REGEX_META_RE.search(pattern):
+                matcher = re.compile(pattern).search
+            else:
+                matcher = lambda text: pattern in text
+            self._pattern_cache[pattern] = matcher
+        return matcher
+    
     def _ai_validate_response(
         self,
         req: dict[str, Any],
@@ -377,9 +522,9 @@ class ProductionMonitorService:
         Returns:
             请求ID
         """
-        request_id = hashlib.md5(
-            f"{method}:{url}:{datetime.now().isoformat()}".encode()
-        ).hexdigest()[:16]
+        request_id = hashlib.blake2b(
+            f"{method}:{url}:{datetime.now().isoformat()}".encode(), digest_size=8
+        ).hexdigest()
         
         sql = """
             INSERT INTO production_requests 
@@ -391,14 +536,15 @@ class ProductionMonitorService:
             request_id,
             method.upper(),
             url,
-            json.dumps(headers or {}, ensure_ascii=False),
+            _dumps(headers or {}),
             body,
             expected_status_code,
             expected_response_pattern,
             RequestSource.MANUAL.value,
-            json.dumps(tags or [], ensure_ascii=False),
+            _dumps(tags or []),
             True
         ))
+        self.request_repo.sync_tags({request_id: tags or []})
         
         return request_id
     
@@ -426,17 +572,25 @@ class ProductionMonitorService:
                 "trend": "unknown"
             }
         
-        # 计算平均健康率
-        total_healthy = sum(e['healthy_count'] for e in executions)
-        total_requests = sum(e['total_requests'] for e in executions)
+        # 单次遍历累计整体、最近 10 次及之前 10 次的健康/请求数，用于平均健康率和趋势
+        total_healthy = total_requests = 0
+        recent_healthy = recent_requests = 0
+        older_healthy = older_requests = 0
+        for i, e in enumerate(executions):
+            healthy, requests = e['healthy_count'], e['total_requests']
+            total_healthy += healthy
+            total_requests += requests
+            if i < 10:
+                recent_healthy += healthy
+                recent_requests += requests
+            elif i < 20:
+                older_healthy += healthy
+                older_requests += requests
         avg_health_rate = total_healthy / total_requests if total_requests > 0 else 0
         
         # 计算趋势（最近10次 vs 之前）
-        recent = executions[:10]
-        older = executions[10:20] if len(executions) > 10 else []
-        
-        recent_rate = sum(e['healthy_count'] for e in recent) / sum(e['total_requests'] for e in recent) if recent else 0
-        older_rate = sum(e['healthy_count'] for e in older) / sum(e['total_requests'] for e in older) if older else recent_rate
+        recent_rate = recent_healthy / recent_requests if recent_requests > 0 else 0
+        older_rate = older_healthy / older_requests if older_requests > 0 else recent_rate
         
         if recent_rate > older_rate + 0.05:
             trend = "improving"
@@ -445,15 +599,17 @@ class ProductionMonitorService:
         else:
             trend = "stable"
         
-        # 获取失败最多的接口
+        # 获取失败最多的接口（先在检查结果上按索引筛选、分组，再关联请求）
         sql = """
-            SELECT pr.method, pr.url, pr.consecutive_failures,
-                   COUNT(hcr.id) as failure_count
-            FROM production_requests pr
-            LEFT JOIN health_check_results hcr ON pr.request_id = hcr.request_id AND hcr.success = 0
-            WHERE hcr.checked_at >= datetime('now', '-' || %s || ' days')
-            GROUP BY pr.request_id
-            ORDER BY failure_count DESC
+            SELECT pr.method, pr.url, pr.consecutive_failures, f.failure_count
+            FROM (
+                SELECT request_id, COUNT(*) as failure_count
+                FROM health_check_results
+                WHERE success = 0 AND checked_at >= datetime('now', '-' || %s || ' days')
+                GROUP BY request_id
+            ) f
+            JOIN production_requests pr ON pr.request_id = f.request_id
+            ORDER BY f.failure_count DESC
             LIMIT 10
         """
         top_failures = self.db.fetch_all(sql, (days,))
@@ -474,38 +630,17 @@ class ProductionMonitorService:
         # 移除查询参数
         path = url.split('?')[0]
         # 替换数字ID
-        path = re.sub(r'/\d+(?=/|$)', '/{id}', path)
+        path = _NUMERIC_ID_RE.sub('/{id}', path)
         return path
     
-    def _save_production_request(self, req: dict[str, Any], task_id: str, extra_tags: list[str] | None = None) -> bool:
-        """保存请求到线上自测库"""
-        # 生成请求ID
+    def _build_production_row(
+        self, req: dict[str, Any], task_id: str, extra_tags: list[str] | None = None
+    ) -> tuple[Any, ...]:
+        """构建线上自测库的插入行（首列为请求ID）"""
+        # 生成请求ID（按内容寻址，用于与库中已有请求去重，保持 MD5 以兼容历史数据）
         content = f"{req['method']}:{req['url']}:{req.get('body', '')}"
         request_id = hashlib.md5(content.encode()).hexdigest()[:16]
         
-        # 检查是否已存在
-        existing = self.db.fetch_one(
-            "SELECT request_id FROM production_requests WHERE request_id = %s",
-            (request_id,)
-        )
-        if existing:
-            return False
-        
-        sql = """
-            INSERT INTO production_requests 
-            (request_id, method, url, headers, body, query_params,
-             expected_status_code, source, source_task_id, tags, is_enabled)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        headers = req.get('headers', {})
-        if isinstance(headers, str):
-            headers = json.loads(headers) if headers else {}
-        
-        query_params = req.get('query_params', {})
-        if isinstance(query_params, str):
-            query_params = json.loads(query_params) if query_params else {}
-        
         # 推断期望状态码
         expected_status = req.get('http_status', 200)
         
@@ -514,21 +649,67 @@ class ProductionMonitorService:
         if extra_tags:
             tags = list(set(tags + extra_tags))
         
-        self.db.execute(sql, (
+        return (
             request_id,
             req['method'],
             req['url'],
-            json.dumps(headers, ensure_ascii=False),
+            _json_column(req.get('headers', {})),
             req.get('body'),
-            json.dumps(query_params, ensure_ascii=False),
+            _json_column(req.get('query_params', {})),
             expected_status,
             RequestSource.LOG_PARSE.value,
             task_id,
-            json.dumps(tags, ensure_ascii=False),
+            _tags_json(tuple(tags)),
             True
-        ))
+        )
+    
+    def _get_existing_request_ids(self, request_ids: list[str]) -> set[str]:
+        """查询自测库中已存在的请求ID"""
+        existing: set[str] = set()
+        
+        # 分批 IN 查询，避免逐条查询以及超出 SQLite 参数数量上限
+        for start in range(0, len(request_ids), self.QUERY_CHUNK_SIZE):
+            chunk = request_ids[start:start + self.QUERY_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            sql = f"SELECT request_id FROM production_requests WHERE request_id IN ({placeholders})"
+            existing.update(row['request_id'] for row in self.db.fetch_all(sql, tuple(chunk)))
+        
+        return existing
+    
+    def _insert_production_requests(self, rows: list[tuple[Any, ...]]) -> int:
+        """
+        在单个事务中批量写入自测库，返回写入数量
+        
+        整批失败时逐条重试，单条坏数据（如重复的 request_id）只丢弃该条
+        """
+        if not rows:
+            return 0
+        
+        sql = """
+            INSERT INTO production_requests 
+            (request_id, method, url, headers, body, query_params,
+             expected_status_code, source, source_task_id, tags, is_enabled)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        try:
+            self.db.execute_many(sql, rows)
+            saved_rows = rows
+        except Exception as e:
+            self.logger.warn(f"批量保存请求失败，逐条重试: {e}")
+            saved_rows = []
+            for row in rows:
+                try:
+                    self.db.execute(sql, row)
+                    saved_rows.append(row)
+                except Exception as row_error:
+                    self.logger.error(f"保存请求失败 {row[0]}: {row_error}")
         
-        return True
+        # 请求已经保存，标签同步失败只记录日志
+        try:
+            self.request_repo.sync_tags({row[0]: _loads(row[9]) for row in saved_rows})
+        except Exception as e:
+            self.logger.error(f"同步请求标签失败: {e}")
+        return len(saved_rows)
     
     def _extract_tags_from_url(self, url: str) -> list[str]:
         """从 URL 提取标签"""
@@ -548,22 +729,31 @@ class ProductionMonitorService:
         """获取启用的监控请求"""
         if tag_filter:
             sql = """
-                SELECT * FROM production_requests 
-                WHERE is_enabled = 1 AND JSON_CONTAINS(tags, %s)
-                ORDER BY url
+                SELECT pr.* FROM production_requests pr
+                JOIN request_tags rt ON pr.request_id = rt.request_id
+                WHERE pr.is_enabled = 1 AND rt.tag = %s
+                ORDER BY pr.url
             """
-            rows = self.db.fetch_all(sql, (json.dumps(tag_filter),))
+            rows = self.db.fetch_all(sql, (tag_filter,))
         else:
             sql = "SELECT * FROM production_requests WHERE is_enabled = 1 ORDER BY url"
             rows = self.db.fetch_all(sql)
         
-        return [dict(row) for row in rows]
+        # headers 在此统一解析一次，检查时直接使用
+        for row in rows:
+            headers = row.get('headers')
+            try:
+                row['headers'] = _loads(headers) if headers else {}
+            except json.JSONDecodeError:
+                self.logger.warn(f"请求头格式错误，按空请求头处理: {row['request_id']}")
+                row['headers'] = {}
+        return rows
     
     def _create_execution_record(self, base_url: str, total: int) -> str:
         """创建执行记录"""
-        execution_id = hashlib.md5(
-            f"health_check:{datetime.now().isoformat()}".encode()
-        ).hexdigest()[:16]
+        execution_id = hashlib.blake2b(
+            f"health_check:{datetime.now().isoformat()}".encode(), digest_size=8
+        ).hexdigest()
         
         sql = """
             INSERT INTO health_check_executions 
@@ -591,26 +781,30 @@ class ProductionMonitorService:
         """
         self.db.execute(sql, (healthy_count, unhealthy_count, execution_id))
     
-    def _update_request_status(self, request_id: str, success: bool) -> None:
-        """更新请求状态"""
+    def _update_request_statuses(self, request_ids: list[str], success: bool) -> None:
+        """批量更新请求状态"""
         if success:
             sql = """
                 UPDATE production_requests SET
                     last_check_at = datetime('now'),
                     last_check_status = 'healthy',
                     consecutive_failures = 0
-                WHERE request_id = %s
+                WHERE request_id IN ({placeholders})
             """
-            self.db.execute(sql, (request_id,))
         else:
             sql = """
                 UPDATE production_requests SET
                     last_check_at = datetime('now'),
                     last_check_status = 'unhealthy',
                     consecutive_failures = consecutive_failures + 1
-                WHERE request_id = %s
+                WHERE request_id IN ({placeholders})
             """
-            self.db.execute(sql, (request_id,))
+        
+        # 分批 IN 更新，避免超出 SQLite 参数数量上限
+        for start in range(0, len(request_ids), self.QUERY_CHUNK_SIZE):
+            chunk = request_ids[start:start + self.QUERY_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            self.db.execute(sql.format(placeholders=placeholders), tuple(chunk))
     
     def _record_failure(self, req: dict[str, Any], result: HealthCheckResult) -> None:
         """记录失败"""
@@ -623,24 +817,31 @@ class ProductionMonitorService:
             # 创建告警洞察
             self._create_alert_insight(req, result, consecutive)
     
-    def _save_check_result(self, execution_id: str, result: HealthCheckResult) -> None:
-        """保存检查结果"""
-        sql = """
-            INSERT INTO health_check_results 
-            (execution_id, request_id, success, status_code, response_time_ms,
-             response_body, error_message, ai_analysis, checked_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, datetime('now'))
-        """
-        self.db.execute(sql, (
+    def _check_result_row(self, execution_id: str, result: HealthCheckResult) -> tuple[Any, ...]:
+        """构建检查结果的插入行"""
+        return (
             execution_id,
             result.request_id,
             result.success,
             result.status_code,
             result.response_time_ms,
-            result.response_body[:5000] if result.response_body else None,
+            result.response_body or None,
             result.error_message,
-            json.dumps(result.ai_analysis, ensure_ascii=False) if result.ai_analysis else None
-        ))
+            _dumps(result.ai_analysis) if result.ai_analysis else None
+        )
+    
+    def _save_check_results(self, rows: list[tuple[Any, ...]]) -> None:
+        """在单个事务中批量保存检查结果"""
+        if not rows:
+            return
+        
+        sql = """
+            INSERT INTO health_check_results 
+            (execution_id, request_id, success, status_code, response_time_ms,
+             response_body, error_message, ai_analysis, checked_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, datetime('now'))
+        """
+        self.db.execute_many(sql, rows)
     
     def _result_to_dict(self, result: HealthCheckResult) -> dict[str, Any]:
         """转换结果为字典"""
@@ -661,8 +862,6 @@ class ProductionMonitorService:
         consecutive_failures: int
     ) -> None:
         """创建告警洞察"""
-        import uuid
-
         # 生成唯一的告警ID（基于请求ID和时间）
         alert_id = f"alert_{uuid.uuid4().hex[:12]}"
 
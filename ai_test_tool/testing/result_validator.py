@@ -3,13 +3,18 @@
 使用LLM进行智能结果验证
 """
 
+import hashlib
+import json
+from collections import Counter
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from operator import attrgetter
 from typing import Any
 
 from .test_case_generator import TestCase
 from .test_executor import TestResult, TestStatus
 from ..llm.chains import ResultValidatorChain
+from ..database.repository import LLMCacheRepository
 from ..utils.logger import get_logger
 
 
@@ -33,14 +38,28 @@ class ValidationSummary:
 class ResultValidator:
     """智能结果验证器"""
     
+    # 失败分析缓存有效期（小时）
+    FAILURE_ANALYSIS_CACHE_TTL_HOURS = 24
+    
     def __init__(
         self,
         llm_chain: ResultValidatorChain | None = None,
-        verbose: bool = False
+        verbose: bool = False,
+        use_llm_cache: bool = True,
+        llm_cache: LLMCacheRepository | None = None
     ) -> None:
         self.llm_chain = llm_chain
         self.verbose = verbose
         self.logger = get_logger(verbose)
+        self.use_llm_cache = use_llm_cache
+        self._llm_cache = llm_cache
+    
+    @property
+    def llm_cache(self) -> LLMCacheRepository:
+        """懒加载 LLM 缓存仓库，仅在需要 LLM 分析时才连接数据库"""
+        if self._llm_cache is None:
+            self._llm_cache = LLMCacheRepository()
+        return self._llm_cache
     
     def validate_results(
         self,
@@ -63,8 +82,11 @@ class ResultValidator:
         response_times = [r.actual_response_time_ms for r in results if r.actual_response_time_ms > 0]
         avg_response_time = sum(response_times) / len(response_times) if response_times else 0
         
+        # 状态码分布只统计一次，供建议生成复用
+        status_codes = Counter(map(attrgetter("actual_status_code"), results))
+        
         issues = self._collect_issues(test_cases, results, result_map)
-        recommendations = self._generate_recommendations(results, issues)
+        recommendations = self._generate_recommendations(status_codes, issues)
         
         if self.llm_chain and failed > 0:
             llm_insights = self._llm_analyze_failures(test_cases, results, result_map)
@@ -141,18 +163,13 @@ class ResultValidator:
     
     def _generate_recommendations(
         self,
-        results: list[TestResult],
+        status_codes: Counter[int],
         issues: list[dict[str, Any]]
     ) -> list[str]:
         """生成建议"""
         recommendations: list[str] = []
         
-        issue_types: dict[str, int] = {}
-        for issue in issues:
-            issue_type = issue.get("type")
-            if issue_type not in issue_types:
-                issue_types[issue_type] = 0
-            issue_types[issue_type] += 1
+        issue_types = Counter(issue.get("type") for issue in issues)
         
         if issue_types.get("test_failed", 0) > 0:
             count = issue_types["test_failed"]
@@ -166,13 +183,6 @@ class ResultValidator:
             count = issue_types["performance"]
             recommendations.append(f"有{count}个接口响应时间超标，建议进行性能优化")
         
-        status_codes: dict[int, int] = {}
-        for result in results:
-            code = result.actual_status_code
-            if code not in status_codes:
-                status_codes[code] = 0
-            status_codes[code] += 1
-        
         if status_codes.get(401, 0) > 0 or status_codes.get(403, 0) > 0:
             recommendations.append("存在认证/授权失败，建议检查Token配置")
         
@@ -214,6 +224,14 @@ class ResultValidator:
         if not failed_cases or len(failed_cases) > 10:
             return {"recommendations": []}
         
+        cache_key = self._failure_cache_key(
+            failed_cases, self.llm_chain.provider.cache_signature
+        ) if self.use_llm_cache else None
+        if cache_key:
+            cached = self._get_cached_recommendations(cache_key)
+            if cached is not None:
+                return {"recommendations": cached}
+        
         try:
             self.logger.ai_start("失败用例分析", f"{len(failed_cases)}个失败用例")
             
@@ -225,14 +243,64 @@ class ResultValidator:
                 suggestions = validation.get("suggestions", [])
                 recommendations.extend(suggestions)
             
-            recommendations = list(set(recommendations))
+            recommendations = list(set(recommendations))[:5]
             
             self.logger.ai_end()
-            return {"recommendations": recommendations[:5]}
         
         except Exception as e:
             self.logger.error(f"LLM分析失败: {e}")
             return {"recommendations": []}
+        
+        if cache_key:
+            self._set_cached_recommendations(cache_key, recommendations)
+        return {"recommendations": recommendations}
+    
+    def _get_cached_recommendations(self, cache_key: str) -> list[str] | None:
+        """读取失败分析缓存，缓存不可用时视为未命中"""
+        try:
+            cached = self.llm_cache.get(cache_key, self.FAILURE_ANALYSIS_CACHE_TTL_HOURS)
+            if cached is None:
+                return None
+            recommendations = json.loads(cached)
+        except Exception as e:
+            self.logger.warn(f"读取失败分析缓存失败: {e}")
+            return None
+        
+        self.logger.debug(f"命中失败分析缓存: {cache_key}")
+        return recommendations
+    
+    def _set_cached_recommendations(self, cache_key: str, recommendations: list[str]) -> None:
+        """写入失败分析缓存，写入失败不影响分析结果"""
+        try:
+            self.llm_cache.set(
+                cache_key,
+                json.dumps(recommendations, ensure_ascii=False),
+                self.FAILURE_ANALYSIS_CACHE_TTL_HOURS
+            )
+        except Exception as e:
+            self.logger.warn(f"写入失败分析缓存失败: {e}")
+    
+    @staticmethod
+    def _failure_cache_key(failed_cases: list[dict[str, Any]], llm_signature: str) -> str:
+        """
+        失败分析缓存键
+        
+        响应耗时每次运行都不同，不参与计算，保证相同的失败结果命中同一缓存；
+        提供商与模型参与计算，切换模型后不会复用旧模型的结果
+        """
+        cases = [
+            {
+                **case,
+                "actual_response": {
+                    k: v for k, v in case["actual_response"].items()
+                    if k != "response_time_ms"
+                },
+            }
+            for case in failed_cases
+        ]
+        signature = {"llm": llm_signature, "cases": cases}
+        canonical = json.dumps(signature, sort_keys=True, ensure_ascii=False, default=str)
+        return "failure_analysis:" + hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
     
     def generate_test_report(
         self,
@@ -31,6 +31,7 @@ ALLOWED_TABLES: frozenset[str] = frozenset({
     "execution_cases",
     "test_results",
     "analysis_reports",
+    "analysis_issues",
     "test_scenarios",
     "scenario_steps",
     "scenario_executions",
@@ -41,6 +42,7 @@ ALLOWED_TABLES: frozenset[str] = frozenset({
     "knowledge_usage",
     "ai_insights",
     "production_requests",
+    "request_tags",
     "health_check_executions",
     "health_check_results",
     "chat_sessions",
@@ -107,6 +109,10 @@ TABLE_FIELDS: dict[str, frozenset[str]] = {
         "statistics", "issues", "recommendations", "severity", "metadata",
         "created_at"
     }),
+    "analysis_issues": frozenset({
+        "id", "report_id", "task_id", "anomaly_id", "anomaly_type", "severity",
+        "title", "description", "count", "created_at"
+    }),
     "test_scenarios": frozenset({
         "id", "scenario_id", "name", "description", "tags", "variables",
         "setup_hooks", "teardown_hooks", "retry_on_failure", "max_retries",
@@ -160,6 +166,9 @@ TABLE_FIELDS: dict[str, frozenset[str]] = {
         "source_task_id", "tags", "is_enabled", "last_check_at",
         "last_check_status", "consecutive_failures", "created_at", "updated_at"
     }),
+    "request_tags": frozenset({
+        "request_id", "tag", "created_at"
+    }),
     "health_check_executions": frozenset({
         "id", "execution_id", "base_url", "total_requests", "healthy_count",
         "unhealthy_count", "status", "trigger_type", "started_at",
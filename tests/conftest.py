@@ -21,6 +21,16 @@ def test_db():
     conn.close()
 
 
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """已初始化表结构的临时 SQLite 数据库"""
+    from ai_test_tool.database.connection import DatabaseConfig, DatabaseManager
+    manager = DatabaseManager(DatabaseConfig(db_path=str(tmp_path / "test.db")))
+    manager.init_database()
+    yield manager
+    manager.close()
+
+
 @pytest.fixture
 def mock_config():
     """模拟配置"""
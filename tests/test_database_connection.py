@@ -0,0 +1,31 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+数据库连接管理测试
+"""
+
+import pytest
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    sqlite_db.execute_many(
+        "INSERT INTO items (id, name) VALUES (%s, %s)",
+        [(i, f"item{i}") for i in range(25)]
+    )
+    return sqlite_db
+
+
+class TestFetchIter:
+    """流式查询测试"""
+
+    def test_yields_all_rows_across_batches(self, db):
+        rows = list(db.fetch_iter("SELECT id, name FROM items ORDER BY id", batch_size=10))
+        assert len(rows) == 25
+        assert rows[0] == {"id": 0, "name": "item0"}
+        assert rows[-1]["id"] == 24
+
+    def test_params_and_empty_result(self, db):
+        assert list(db.fetch_iter("SELECT id FROM items WHERE id > %s", (100,))) == []
+        rows = list(db.fetch_iter("SELECT id FROM items WHERE id >= %s", (20,)))
+        assert [r["id"] for r in rows] == [20, 21, 22, 23, 24]
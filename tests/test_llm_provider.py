@@ -0,0 +1,32 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+LLM Provider 测试
+"""
+
+from unittest.mock import MagicMock
+
+from ai_test_tool.config import LLMConfig
+from ai_test_tool.llm.provider import OllamaProvider
+
+
+class TestBatchGenerate:
+    """批量生成测试"""
+
+    def test_sorted_chunks_and_original_order(self):
+        provider = OllamaProvider(LLMConfig())
+        llm = MagicMock()
+        llm.batch.side_effect = lambda prompts: [f"out:{p}" for p in prompts]
+        provider._llm = llm
+
+        prompts = ["cccc", "a", "bbbbbb", "dd", "e"]
+        results = provider.batch_generate(prompts, batch_size=2)
+
+        assert results == [f"out:{p}" for p in prompts]
+        submitted = [call.args[0] for call in llm.batch.call_args_list]
+        assert submitted == [["a", "e"], ["dd", "cccc"], ["bbbbbb"]]
+
+    def test_empty(self):
+        provider = OllamaProvider(LLMConfig())
+        provider._llm = MagicMock()
+        assert provider.batch_generate([]) == []
+        provider._llm.batch.assert_not_called()
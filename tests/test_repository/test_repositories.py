@@ -11,7 +11,8 @@ from ai_test_tool.database.repository import (
     AIInsightRepository,
     ProductionRequestRepository,
     HealthCheckResultRepository,
-    KnowledgeRepository
+    KnowledgeRepository,
+    LLMCacheRepository
 )
 from ai_test_tool.database.models import (
     AIInsight,
@@ -296,5 +297,34 @@ class TestKnowledgeRepository:
         assert result['module_context'] == 10
 
 
+
+class TestLLMCacheRepository:
+    """LLM 缓存仓库测试"""
+
+    @pytest.fixture
+    def repo(self, sqlite_db):
+        return LLMCacheRepository(sqlite_db)
+
+    def test_set_purges_expired_rows_at_most_once_per_interval(self, repo):
+        repo.db.execute(
+            "INSERT INTO llm_cache (cache_key, response, created_at) VALUES (%s, %s, datetime('now', '-2 days'))",
+            ("old", "x")
+        )
+        with patch.object(LLMCacheRepository, '_last_purge_at', float("-inf")):
+            repo.set("new", "y", ttl_hours=24)
+            keys = [r["cache_key"] for r in repo.db.fetch_all("SELECT cache_key FROM llm_cache")]
+            assert keys == ["new"]
+
+            repo.db.execute(
+                "INSERT INTO llm_cache (cache_key, response, created_at) VALUES (%s, %s, datetime('now', '-2 days'))",
+                ("old2", "x")
+            )
+            repo.set("newer", "z", ttl_hours=24)
+            # 清理间隔内不重复清理
+            assert repo.db.fetch_one("SELECT cache_key FROM llm_cache WHERE cache_key = %s", ("old2",))
+
+        assert repo.get("new") == "y"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,245 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+ResultValidator 结果验证器测试
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai_test_tool.database.repository import LLMCacheRepository
+from ai_test_tool.database.models.base import TestCaseCategory, TestCasePriority
+from ai_test_tool.llm.chains import ResultValidatorChain
+from ai_test_tool.testing.result_validator import ResultValidator
+from ai_test_tool.testing.test_case_generator import ExpectedResult, TestCase
+from ai_test_tool.testing.test_executor import TestResult, TestStatus
+
+
+@pytest.fixture
+def llm_cache(sqlite_db):
+    return LLMCacheRepository(sqlite_db)
+
+
+def _case(case_id, priority=TestCasePriority.MEDIUM, max_time=3000):
+    return TestCase(
+        id=case_id,
+        name=f"用例{case_id}",
+        description="",
+        category=TestCaseCategory.NORMAL,
+        priority=priority,
+        method="GET",
+        url=f"/api/{case_id}",
+        expected=ExpectedResult(max_response_time_ms=max_time),
+    )
+
+
+def _result(case_id, status, code=200, time_ms=100.0):
+    return TestResult(
+        test_case_id=case_id,
+        test_case_name=f"用例{case_id}",
+        status=status,
+        actual_status_code=code,
+        actual_response_time_ms=time_ms,
+    )
+
+
+class TestValidateResults:
+    """结果汇总测试"""
+
+    def test_summary_counts_and_recommendations(self):
+        cases = [
+            _case("a", priority=TestCasePriority.HIGH),
+            _case("b", max_time=50),
+            _case("c"),
+            _case("d"),
+        ]
+        results = [
+            _result("a", TestStatus.FAILED, code=401),
+            _result("b", TestStatus.PASSED, time_ms=200),
+            _result("c", TestStatus.ERROR, code=0, time_ms=0),
+            _result("d", TestStatus.SKIPPED, code=404, time_ms=0),
+        ]
+
+        summary = ResultValidator().validate_results(cases, results)
+
+        assert (summary.total_cases, summary.passed_cases, summary.failed_cases,
+                summary.error_cases, summary.skipped_cases) == (4, 1, 1, 1, 1)
+        assert summary.pass_rate == "25.00%"
+        assert summary.avg_response_time_ms == 150
+        assert [(i["type"], i["test_case_id"]) for i in summary.issues] == [
+            ("test_failed", "a"), ("performance", "b"), ("execution_error", "c")
+        ]
+        assert summary.issues[0]["severity"] == "high"
+        assert summary.recommendations == [
+            "有1个测试用例失败，建议检查接口实现是否符合预期",
+            "有1个测试执行错误，建议检查测试环境和网络连接",
+            "有1个接口响应时间超标，建议进行性能优化",
+            "存在认证/授权失败，建议检查Token配置",
+            "存在404错误，建议检查接口路径是否正确",
+        ]
+
+    def test_all_passed(self):
+        summary = ResultValidator().validate_results(
+            [_case("a")], [_result("a", TestStatus.PASSED)]
+        )
+
+        assert summary.issues == []
+        assert summary.recommendations == ["所有测试通过，建议继续保持"]
+
+    def test_empty(self):
+        summary = ResultValidator().validate_results([], [])
+
+        assert summary.total_cases == 0
+        assert summary.pass_rate == "0%"
+        assert summary.avg_response_time_ms == 0
+
+
+def _failed_case(case_id):
+    return {
+        "test_case": {"id": case_id, "url": f"/api/{case_id}"},
+        "actual_response": {"status_code": 500},
+        "expected_response": {"status_code": 200},
+    }
+
+
+class TestBatchValidate:
+    """批量结果验证测试"""
+
+    def test_single_llm_call(self):
+        provider = MagicMock()
+        provider.generate.return_value = "```json\n" + json.dumps([
+            {"test_case_id": "a", "suggestions": ["检查参数"]},
+            {"test_case_id": "b", "suggestions": ["检查权限"]},
+        ]) + "\n```"
+        chain = ResultValidatorChain(provider=provider)
+
+        validations = chain.batch_validate([_failed_case("a"), _failed_case("b")])
+
+        provider.generate.assert_called_once()
+        prompt = provider.generate.call_args.args[0]
+        assert "2个失败的测试用例" in prompt
+        assert "## 用例 2" in prompt and "/api/b" in prompt
+        assert [v["test_case_id"] for v in validations] == ["a", "b"]
+        assert validations[1]["validation"]["suggestions"] == ["检查权限"]
+
+    def test_falls_back_to_per_case_when_unparseable(self):
+        provider = MagicMock()
+        provider.generate.side_effect = [
+            "[{\"suggestions\": []}]",
+            json.dumps({"suggestions": ["a"]}),
+            json.dumps({"suggestions": ["b"]}),
+        ]
+        chain = ResultValidatorChain(provider=provider)
+
+        validations = chain.batch_validate([_failed_case("a"), _failed_case("b")])
+
+        assert provider.generate.call_count == 3
+        assert [v["validation"]["suggestions"] for v in validations] == [["a"], ["b"]]
+
+    def test_empty(self):
+        provider = MagicMock()
+
+        assert ResultValidatorChain(provider=provider).batch_validate([]) == []
+        provider.generate.assert_not_called()
+
+    def test_validator_collects_suggestions(self):
+        provider = MagicMock()
+        provider.generate.return_value = json.dumps(
+            [{"test_case_id": "a", "suggestions": ["检查参数"]}]
+        )
+        validator = ResultValidator(
+            llm_chain=ResultValidatorChain(provider=provider), use_llm_cache=False
+        )
+
+        summary = validator.validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400)]
+        )
+
+        assert summary.recommendations[-1] == "检查参数"
+
+
+class TestFailureAnalysisCache:
+    """失败分析缓存测试"""
+
+    def _validator(self, llm_cache, suggestions=("检查参数",), model="ollama:m1"):
+        provider = MagicMock()
+        provider.cache_signature = model
+        provider.generate.return_value = json.dumps(
+            [{"test_case_id": "a", "suggestions": list(suggestions)}]
+        )
+        chain = ResultValidatorChain(provider=provider)
+        return ResultValidator(llm_chain=chain, llm_cache=llm_cache), provider
+
+    def test_rerun_hits_cache_ignoring_response_time(self, llm_cache):
+        validator, provider = self._validator(llm_cache)
+
+        first = validator.validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400, time_ms=120)]
+        )
+        second = validator.validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400, time_ms=80)]
+        )
+
+        provider.generate.assert_called_once()
+        assert second.recommendations == first.recommendations
+        assert second.recommendations[-1] == "检查参数"
+
+    def test_cache_shared_across_validators(self, llm_cache):
+        self._validator(llm_cache)[0].validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400)]
+        )
+        validator, provider = self._validator(llm_cache, suggestions=("其他",))
+
+        summary = validator.validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400)]
+        )
+
+        provider.generate.assert_not_called()
+        assert summary.recommendations[-1] == "检查参数"
+
+    def test_different_failure_misses(self, llm_cache):
+        validator, provider = self._validator(llm_cache)
+
+        validator.validate_results([_case("a")], [_result("a", TestStatus.FAILED, code=400)])
+        validator.validate_results([_case("a")], [_result("a", TestStatus.FAILED, code=500)])
+
+        assert provider.generate.call_count == 2
+
+    def test_llm_error_not_cached(self, llm_cache):
+        validator, provider = self._validator(llm_cache)
+        provider.generate.side_effect = [RuntimeError("llm down"), provider.generate.return_value]
+
+        first = validator.validate_results([_case("a")], [_result("a", TestStatus.FAILED)])
+        second = validator.validate_results([_case("a")], [_result("a", TestStatus.FAILED)])
+
+        assert first.recommendations[-1] != "检查参数"
+        assert second.recommendations[-1] == "检查参数"
+        assert provider.generate.call_count == 2
+
+    def test_model_change_misses(self, llm_cache):
+        self._validator(llm_cache)[0].validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400)]
+        )
+        validator, provider = self._validator(llm_cache, suggestions=("其他",), model="openai:m2")
+
+        summary = validator.validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400)]
+        )
+
+        provider.generate.assert_called_once()
+        assert summary.recommendations[-1] == "其他"
+
+    def test_cache_failure_falls_through_to_llm(self):
+        broken = MagicMock()
+        broken.get.side_effect = RuntimeError("no such table: llm_cache")
+        broken.set.side_effect = RuntimeError("no such table: llm_cache")
+        validator, provider = self._validator(broken)
+
+        summary = validator.validate_results(
+            [_case("a")], [_result("a", TestStatus.FAILED, code=400)]
+        )
+
+        provider.generate.assert_called_once()
+        broken.set.assert_called_once()
+        assert summary.recommendations[-1] == "检查参数"
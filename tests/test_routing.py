@@ -0,0 +1,289 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+智能路由模块测试
+"""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from ai_test_tool.routing import (
+    AnalysisContext,
+    AnalysisScenario,
+    AnalysisStrategy,
+    DetectionRule,
+    IntelligentRouter,
+    RouteDecision,
+    ScenarioDetector,
+    ScenarioType,
+    StrategyPriority,
+    StrategyRegistry,
+)
+
+
+def _strategy(strategy_id, handler, priority=StrategyPriority.MEDIUM):
+    return AnalysisStrategy(
+        strategy_id=strategy_id,
+        name=strategy_id,
+        description="",
+        scenario_types=[ScenarioType.ERROR_ANALYSIS],
+        handler=handler,
+        priority=priority,
+    )
+
+
+@pytest.fixture
+def router():
+    router = IntelligentRouter(registry=StrategyRegistry(), detector=MagicMock())
+    yield router
+    router.close()
+
+
+class TestParallelExecute:
+    """策略并发执行测试"""
+
+    def test_execute_all_runs_concurrently_in_priority_order(self, router):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def handler(name):
+            def run(ctx):
+                barrier.wait()
+                return {"name": name}
+            return run
+
+        strategies = [_strategy(f"s{i}", handler(f"s{i}")) for i in range(3)]
+        decision = RouteDecision(scenarios=[], selected_strategies=strategies)
+
+        results = router.execute(decision, AnalysisContext(options={"execute_all": True}))
+
+        assert [r.strategy_id for r in results] == ["s0", "s1", "s2"]
+        assert all(r.success for r in results)
+
+    def test_stops_at_first_success_in_priority_order(self, router):
+        def fail(ctx):
+            raise RuntimeError("boom")
+
+        def slow_ok(ctx):
+            time.sleep(0.05)
+            return {"ok": 1}
+
+        strategies = [_strategy("fail", fail), _strategy("slow", slow_ok), _strategy("fast", lambda ctx: {})]
+        decision = RouteDecision(scenarios=[], selected_strategies=strategies)
+
+        results = router.execute(decision, AnalysisContext(options={"max_parallel": 3}))
+
+        assert [r.strategy_id for r in results] == ["fail", "slow"]
+        assert [r.success for r in results] == [False, True]
+
+    def test_default_without_execute_all_runs_only_until_success(self, router):
+        calls = []
+
+        def run(name, ok):
+            def handler(ctx):
+                calls.append(name)
+                if not ok:
+                    raise RuntimeError("boom")
+                return {}
+            return handler
+
+        strategies = [_strategy("fail", run("fail", False)), _strategy("ok", run("ok", True)),
+                      _strategy("llm", run("llm", True))]
+        decision = RouteDecision(scenarios=[], selected_strategies=strategies)
+
+        results = router.execute(decision, AnalysisContext())
+
+        assert calls == ["fail", "ok"]
+        assert [r.strategy_id for r in results] == ["fail", "ok"]
+
+    def test_max_parallel_ignored_without_execute_all(self, router):
+        calls = []
+        strategies = [
+            _strategy(f"s{i}", lambda ctx, i=i: calls.append(i) or {}) for i in range(3)
+        ]
+        decision = RouteDecision(scenarios=[], selected_strategies=strategies)
+
+        results = router.execute(decision, AnalysisContext(options={"max_parallel": 3}))
+
+        # 不会提前启动低优先级策略
+        assert calls == [0]
+        assert len(results) == 1
+        assert router._executor is None
+
+    def test_max_parallel_limits_in_flight_strategies(self, router):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def run(ctx):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return {}
+
+        strategies = [_strategy(f"s{i}", run) for i in range(5)]
+        decision = RouteDecision(scenarios=[], selected_strategies=strategies)
+
+        results = router.execute(
+            decision, AnalysisContext(options={"execute_all": True, "max_parallel": 2})
+        )
+
+        assert [r.strategy_id for r in results] == [f"s{i}" for i in range(5)]
+        assert peak[0] <= 2
+
+    def test_executor_reused_across_calls_and_recreated_after_close(self, router):
+        strategies = [_strategy(f"s{i}", lambda ctx: {}) for i in range(2)]
+        decision = RouteDecision(scenarios=[], selected_strategies=strategies)
+        context = AnalysisContext(options={"execute_all": True})
+
+        router.execute(decision, context)
+        executor = router._executor
+        router.execute(decision, context)
+        assert router._executor is executor
+
+        router.close()
+        assert router._executor is None
+        assert all(r.success for r in router.execute(decision, context))
+        assert router._executor is not executor
+
+
+class TestScenarioDetector:
+    """场景识别器测试"""
+
+    def test_rule_precompiles_patterns_and_keywords(self):
+        rule = DetectionRule(
+            scenario_type=ScenarioType.ERROR_ANALYSIS,
+            keywords=["Timeout", "ERROR"],
+            patterns=[r"code=\d+"],
+        )
+
+        assert rule._keywords_lower == ["timeout", "error"]
+        assert rule._compiled_patterns[0].search("CODE=500")
+
+    def test_keywords_match_case_insensitively(self):
+        detector = ScenarioDetector(
+            custom_rules=[], enable_llm_fallback=False, min_confidence=0.0
+        )
+        detector.rules = []
+        detector.add_rule(DetectionRule(
+            scenario_type=ScenarioType.ERROR_ANALYSIS, keywords=["Boom"], weight=1.0
+        ))
+
+        scenarios = detector.detect(log_content="BOOM boom", user_hint="BoOm")
+
+        assert [s.scenario_type for s in scenarios] == [ScenarioType.ERROR_ANALYSIS]
+
+    @pytest.mark.parametrize("pattern_count, method", [(25, "keyword"), (40, "pattern")])
+    def test_match_method_with_capped_pattern_scan(self, pattern_count, method):
+        detector = ScenarioDetector(enable_llm_fallback=False, min_confidence=0.0)
+        detector.rules = []
+        detector.add_rule(DetectionRule(
+            scenario_type=ScenarioType.ERROR_ANALYSIS,
+            keywords=["alpha", "beta", "gamma"],
+            patterns=[r"hit\d"],
+        ))
+        # 关键词命中 30 次（每个关键词上限 10）
+        content = "alpha beta gamma\n" * 12 + "hit1 " * pattern_count
+
+        scenario = detector.detect(log_content=content)[0]
+
+        assert scenario.match_method.value == method
+        assert scenario.confidence == pytest.approx(1.0)
+
+    def test_default_rules_compiled_once(self):
+        patterns = [r._compiled_patterns for r in ScenarioDetector.DEFAULT_RULES]
+
+        ScenarioDetector(enable_llm_fallback=False)
+
+        assert all(
+            a is b for a, b in zip(patterns, [r._compiled_patterns for r in ScenarioDetector.DEFAULT_RULES])
+        )
+
+    def test_llm_failure_keeps_rule_results(self):
+        provider = MagicMock()
+        provider.generate.side_effect = RuntimeError("llm down")
+        detector = ScenarioDetector(llm_provider=provider, min_confidence=0.0)
+
+        scenarios = detector.detect(log_content="ERROR: db failed to connect")
+
+        assert scenarios
+        assert scenarios[0].scenario_type == ScenarioType.ERROR_ANALYSIS
+
+
+class TestPreDetected:
+    """预识别场景测试"""
+
+    def test_route_skips_detector(self, router):
+        router.registry.register(_strategy("s0", lambda ctx: {}))
+        scenario = AnalysisScenario(scenario_type=ScenarioType.ERROR_ANALYSIS, confidence=0.8)
+
+        decision, results = router.route_and_execute(log_content="x", pre_detected=[scenario])
+
+        router.detector.detect.assert_not_called()
+        assert decision.scenarios == [scenario]
+        assert [r.strategy_id for r in results] == ["s0"]
+
+
+class TestStrategyDictsCache:
+    """策略字典缓存测试"""
+
+    def test_cached_until_registry_changes(self):
+        registry = StrategyRegistry()
+        registry.register(_strategy("s0", lambda ctx: {}))
+
+        first = registry.get_strategy_dicts()
+        assert registry.get_strategy_dicts() is first
+        assert [d["strategy_id"] for d in first] == ["s0"]
+
+        registry.register(_strategy("s1", lambda ctx: {}, priority=StrategyPriority.HIGH))
+        by_type = registry.get_strategy_dicts(ScenarioType.ERROR_ANALYSIS)
+        assert [d["strategy_id"] for d in by_type] == ["s1", "s0"]
+        assert [d["strategy_id"] for d in registry.get_strategy_dicts()] == ["s0", "s1"]
+
+        registry.unregister("s0")
+        assert [d["strategy_id"] for d in registry.get_strategy_dicts(ScenarioType.ERROR_ANALYSIS)] == ["s1"]
+        assert registry.get_strategy_dicts(ScenarioType.SECURITY_ANALYSIS) == []
+
+
+class TestModelSlots:
+    """路由模型 __slots__ 测试"""
+
+    def test_hot_models_have_no_instance_dict(self):
+        scenario = AnalysisScenario(scenario_type=ScenarioType.ERROR_ANALYSIS, confidence=1.5)
+        strategy = _strategy("s0", lambda ctx: {})
+        decision = RouteDecision(scenarios=[scenario], selected_strategies=[strategy])
+
+        for obj in (scenario, strategy, decision):
+            assert not hasattr(obj, "__dict__")
+        # __post_init__ 仍然生效
+        assert scenario.confidence == 1.0
+        assert decision.primary_strategy is strategy
+
+
+class TestRegistryStatistics:
+    """注册表统计测试"""
+
+    def test_counts_follow_register_and_unregister(self):
+        registry = StrategyRegistry()
+        llm = _strategy("llm", lambda ctx: {}, priority=StrategyPriority.HIGH)
+        llm.requires_llm = True
+        registry.register(llm)
+        registry.register(_strategy("s1", lambda ctx: {}))
+        # 覆盖注册不重复计数
+        registry.register(_strategy("s1", lambda ctx: {}, priority=StrategyPriority.LOW))
+
+        stats = registry.get_statistics()
+        assert stats["total_strategies"] == 2
+        assert stats["priority_distribution"] == {"HIGH": 1, "LOW": 1}
+        assert stats["llm_required_count"] == 1
+        assert stats["async_count"] == 0
+
+        registry.unregister("llm")
+        stats = registry.get_statistics()
+        assert stats["priority_distribution"] == {"LOW": 1}
+        assert stats["llm_required_count"] == 0
+        assert stats["scenario_coverage"] == {"error_analysis": 1}
@@ -0,0 +1,314 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+AIAssistantService 服务层测试
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from ai_test_tool.services.ai_assistant import AIAssistantService, InsightType
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.fetch_one.return_value = None
+    return db
+
+
+@pytest.fixture
+def service(mock_db):
+    with patch('ai_test_tool.services.ai_assistant.get_db_manager', return_value=mock_db):
+        yield AIAssistantService()
+
+
+class TestDetectApiChanges:
+    """接口变更检测测试"""
+
+    def test_added_removed_modified(self, service):
+        old = [
+            {"method": "GET", "path": "/users", "name": "用户列表", "parameters": []},
+            {"method": "DELETE", "path": "/users/{id}", "name": "删除用户"},
+            {"method": "POST", "path": "/users", "name": "创建用户",
+             "parameters": [{"name": "age", "type": "integer"}]},
+        ]
+        new = [
+            {"method": "GET", "path": "/users", "name": "用户列表", "parameters": []},
+            {"method": "POST", "path": "/users", "name": "创建用户",
+             "parameters": [{"name": "age", "type": "string"}]},
+            {"method": "GET", "path": "/orders", "name": "订单列表"},
+        ]
+
+        insights = service.detect_api_changes(old, new)
+        change_types = sorted(i.details["change_type"] for i in insights)
+
+        assert change_types == ["added", "modified", "removed"]
+        assert all(i.insight_type == InsightType.API_CHANGE for i in insights)
+        modified = next(i for i in insights if i.details["change_type"] == "modified")
+        assert modified.severity == "high"
+        assert modified.title == "修改接口: POST /users"
+
+    def test_unchanged_endpoints_skip_comparison(self, service):
+        eps = [{"method": "GET", "path": f"/items/{i}", "name": f"item{i}"} for i in range(5)]
+        new = [dict(e) for e in eps]
+
+        with patch.object(service, '_compare_endpoints') as compare:
+            insights = service.detect_api_changes(eps, new)
+
+        assert insights == []
+        compare.assert_not_called()
+
+
+class TestChangeRecommendations:
+    """变更建议测试"""
+
+    def test_recommendations_for_all_change_kinds(self, service):
+        changes = [
+            {"field": "parameter:age:type", "breaking": True},
+            {"field": "request_body", "breaking": True},
+            {"field": "responses", "breaking": False},
+        ]
+        assert service._get_change_recommendations(changes) == [
+            "此变更可能影响现有功能，建议进行回归测试",
+            "更新相关测试用例的参数",
+            "检查请求体结构变化是否兼容",
+            "更新响应断言",
+        ]
+
+    def test_non_breaking_response_change_only(self, service):
+        changes = [{"field": "responses", "breaking": False}]
+        assert service._get_change_recommendations(changes) == ["更新响应断言"]
+
+
+class TestPerformanceTrend:
+    """性能趋势分析测试"""
+
+    @staticmethod
+    def _rows(times, status="passed", url="/api/slow"):
+        return [
+            {"method": "GET", "url": url, "actual_response_time_ms": t, "status": status}
+            for t in times
+        ]
+
+    def test_detects_degradation(self, service, mock_db):
+        mock_db.fetch_iter.return_value = iter(self._rows([200] * 10 + [2000] * 5))
+
+        insights = service.analyze_performance_trend(days=7)
+
+        assert len(insights) == 1
+        insight = insights[0]
+        assert insight.insight_type == InsightType.PERFORMANCE_TREND
+        assert insight.details["old_avg_ms"] == 200
+        assert insight.details["new_avg_ms"] == 2000
+        assert insight.details["endpoint"] == "GET:/api/slow"
+
+    def test_exactly_five_samples_compares_with_first_two(self, service, mock_db):
+        mock_db.fetch_iter.return_value = iter(self._rows([1000, 1000, 200, 200, 200]))
+
+        insights = service.analyze_performance_trend(days=7)
+
+        assert len(insights) == 1
+        assert insights[0].details["old_avg_ms"] == 1000
+        assert insights[0].details["new_avg_ms"] == 520
+
+    def test_error_rate(self, service, mock_db):
+        mock_db.fetch_iter.return_value = iter(
+            self._rows([100] * 6) + self._rows([100] * 4, status="failed")
+        )
+
+        insights = service.analyze_performance_trend(days=7)
+
+        assert [i.insight_type for i in insights] == [InsightType.RISK_ASSESSMENT]
+        assert insights[0].details["error_count"] == 4
+        assert insights[0].details["total_count"] == 10
+
+    def test_no_data(self, service, mock_db):
+        mock_db.fetch_iter.return_value = iter([])
+        assert service.analyze_performance_trend() == []
+
+
+class TestMockDataBatch:
+    """批量 Mock 数据生成测试"""
+
+    def test_batch_keeps_input_order(self, service, mock_db):
+        mock_db.fetch_all.return_value = [
+            {"endpoint_id": "ep2", "method": "POST", "path": "/b", "responses": "{}"},
+            {"endpoint_id": "ep1", "method": "GET", "path": "/a", "responses": None},
+        ]
+        provider = MagicMock()
+        provider.batch_generate.return_value = ['[{"id": 1}]', "not json"]
+        service._provider = provider
+
+        results = service.generate_mock_data_batch(["ep1", "ep2"], count=1)
+
+        assert [r["endpoint_id"] for r in results] == ["ep1", "ep2"]
+        assert results[0]["mock_responses"] == [{"id": 1}]
+        assert results[1]["mock_responses"][0]["error"] == "生成失败"
+        prompts = provider.batch_generate.call_args[0][0]
+        assert "/a" in prompts[0] and "/b" in prompts[1]
+
+    def test_missing_endpoint(self, service, mock_db):
+        mock_db.fetch_all.return_value = []
+        with pytest.raises(ValueError):
+            service.generate_mock_data_batch(["ep404"])
+
+
+class TestLLMCache:
+    """LLM 响应缓存测试"""
+
+    def test_cache_hit_skips_provider(self, service, mock_db):
+        mock_db.fetch_one.return_value = {"response": "cached answer"}
+        service._provider = MagicMock()
+
+        assert service._generate("prompt") == "cached answer"
+        service._provider.generate.assert_not_called()
+
+    def test_cache_miss_stores_response(self, service, mock_db):
+        service._provider = MagicMock()
+        service._provider.generate.return_value = "fresh answer"
+
+        assert service._generate("prompt") == "fresh answer"
+        sql, params = mock_db.execute.call_args[0]
+        assert "INSERT INTO llm_cache" in sql
+        assert params == (service._prompt_key("prompt"), "fresh answer")
+
+    def test_batch_only_submits_misses(self, service, mock_db):
+        service._provider = MagicMock()
+        service._provider.batch_generate.return_value = ["B"]
+        hits = {service._prompt_key("a"): {"response": "A"}}
+        mock_db.fetch_one.side_effect = lambda sql, params: hits.get(params[0])
+
+        assert service._batch_generate(["a", "b"]) == ["A", "B"]
+        service._provider.batch_generate.assert_called_once_with(["b"])
+
+    def test_model_is_part_of_key(self, service):
+        service._provider = MagicMock(cache_signature="ollama:a")
+        key = service._prompt_key("prompt")
+        service._provider = MagicMock(cache_signature="openai:b")
+
+        assert service._prompt_key("prompt") != key
+
+    def test_cache_errors_treated_as_miss(self, service, mock_db):
+        mock_db.fetch_one.side_effect = RuntimeError("no such table: llm_cache")
+        mock_db.execute.side_effect = RuntimeError("no such table: llm_cache")
+        service._provider = MagicMock()
+        service._provider.generate.return_value = "fresh answer"
+        service._provider.batch_generate.return_value = ["A", "B"]
+
+        assert service._generate("prompt") == "fresh answer"
+        assert service._batch_generate(["a", "b"]) == ["A", "B"]
+
+    def test_cache_disabled(self, mock_db):
+        with patch('ai_test_tool.services.ai_assistant.get_db_manager', return_value=mock_db):
+            service = AIAssistantService(use_llm_cache=False)
+        service._provider = MagicMock()
+        service._provider.generate.return_value = "x"
+
+        assert service._generate("prompt") == "x"
+        mock_db.fetch_one.assert_not_called()
+
+
+@pytest.fixture
+def sqlite_service(sqlite_db):
+    with patch('ai_test_tool.services.ai_assistant.get_db_manager', return_value=sqlite_db):
+        yield AIAssistantService()
+
+
+class TestCoverageGaps:
+    """覆盖率缺口分析测试（真实 SQLite）"""
+
+    def test_returns_first_twenty_with_full_total(self, sqlite_service):
+        db = sqlite_service.db
+        db.execute_many(
+            "INSERT INTO api_endpoints (endpoint_id, name, method, path) VALUES (%s, %s, %s, %s)",
+            [(f"ep{i:02d}", f"接口{i}", "GET", f"/api/{i:02d}") for i in range(25)]
+        )
+        db.execute(
+            "INSERT INTO test_cases (case_id, endpoint_id, name, method, url) VALUES (%s, %s, %s, %s, %s)",
+            ("ep00_tc1", "ep00", "用例", "GET", "/api/00")
+        )
+
+        insights = sqlite_service.analyze_coverage_gaps()
+
+        assert len(insights) == 1
+        details = insights[0].details
+        assert details["total_uncovered"] == 24
+        assert len(details["uncovered_endpoints"]) == 20
+        assert details["uncovered_endpoints"][0]["path"] == "/api/01"
+
+
+class TestCompareEndpoints:
+    """接口差异比较测试"""
+
+    def test_identical_json_strings_are_not_parsed(self, service):
+        with patch('ai_test_tool.services.ai_assistant.json.loads') as loads:
+            assert service._json_field_changed('{"a": 1}', '{"a": 1}') is False
+        loads.assert_not_called()
+
+    def test_string_and_parsed_values_compare_structurally(self, service):
+        assert service._json_field_changed('{"a": 1}', {"a": 1}) is False
+        assert service._json_field_changed('', {}) is False
+        assert service._json_field_changed('{"a": 1}', '{"a": 2}') is True
+
+    def test_body_and_response_changes(self, service):
+        old = {"request_body": '{"a": 1}', "responses": '{"200": {}}'}
+        new = {"request_body": '{"a": 2}', "responses": '{"200": {}}'}
+        changes = service._compare_endpoints(old, new)
+        assert [c["field"] for c in changes] == ["request_body"]
+
+
+class TestTestRecommendations:
+    """智能测试建议测试"""
+
+    def test_combines_analyses_in_order(self, service, mock_db):
+        with patch.object(service, '_analyze_coverage_gaps', return_value=["coverage"]), \
+             patch.object(service, '_analyze_high_risk_endpoints', return_value=["risk"]), \
+             patch.object(service, '_get_priority_recommendations', return_value=["priority"]):
+            insights = service.get_test_recommendations()
+
+        assert insights == ["coverage", "risk", "priority"]
+        assert mock_db.close.call_count == 3
+
+
+class TestInsightModel:
+    """洞察模型测试"""
+
+    def test_insight_type_is_str(self):
+        assert InsightType.API_CHANGE == "api_change"
+        assert isinstance(InsightType.COVERAGE_GAP, str)
+
+    def test_ai_insight_has_no_instance_dict(self):
+        from ai_test_tool.services.ai_assistant import AIInsight
+        insight = AIInsight(
+            insight_id="i1", insight_type=InsightType.OPTIMIZATION, title="t",
+            description="d", severity="low", confidence=0.5
+        )
+        assert not hasattr(insight, "__dict__")
+        assert insight.recommendations == []
+
+
+class TestHighRiskEndpoints:
+    """高风险接口分析测试（真实 SQLite）"""
+
+    def test_only_failure_rate_above_threshold(self, sqlite_service):
+        db = sqlite_service.db
+        db.execute_many(
+            "INSERT INTO test_cases (case_id, endpoint_id, name, method, url) VALUES (%s, %s, %s, %s, %s)",
+            [("ep1_tc", "ep1", "a", "GET", "/a"), ("ep2_tc", "ep2", "b", "GET", "/b"),
+             ("ep3_tc", "ep3", "c", "GET", "/c")]
+        )
+        statuses = {
+            "ep1_tc": ["failed"] * 3 + ["passed"] * 7,   # 30%
+            "ep2_tc": ["error"] * 2 + ["passed"] * 8,    # 20%，不超过阈值
+            "ep3_tc": ["failed"] * 6 + ["passed"] * 4,   # 60%
+        }
+        db.execute_many(
+            "INSERT INTO test_results (case_id, execution_id, status) VALUES (%s, %s, %s)",
+            [(cid, "exec1", st) for cid, sts in statuses.items() for st in sts]
+        )
+
+        insights = sqlite_service.identify_high_risk_endpoints()
+
+        assert [i.details["case_id"] for i in insights] == ["ep3_tc", "ep1_tc"]
+        assert [i.severity for i in insights] == ["high", "medium"]
+        assert insights[1].details["failure_rate"] == pytest.approx(0.3)
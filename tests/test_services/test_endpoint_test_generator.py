@@ -0,0 +1,603 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+EndpointTestGeneratorService 服务层测试
+"""
+
+import json
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from ai_test_tool.services.endpoint_test_generator import EndpointTestGeneratorService
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.fetch_one.return_value = None
+    db.fetch_all.return_value = []
+    return db
+
+
+@pytest.fixture
+def service(mock_db):
+    with patch('ai_test_tool.services.endpoint_test_generator.get_db_manager', return_value=mock_db):
+        yield EndpointTestGeneratorService()
+
+
+def _endpoint(**overrides):
+    endpoint = {
+        "endpoint_id": "ep1",
+        "method": "POST",
+        "path": "/users",
+        "name": "创建用户",
+        "parameters": [
+            {"name": "page", "in": "query", "required": True, "schema": {"type": "integer"}},
+            {"name": "keyword", "in": "query", "schema": {"type": "string", "maxLength": 8}},
+        ],
+        "request_body": {
+            "content": {"application/json": {"schema": {
+                "properties": {"age": {"type": "integer", "minimum": 0, "maximum": 150}}
+            }}}
+        },
+        "responses": {},
+    }
+    endpoint.update(overrides)
+    return endpoint
+
+
+LLM_RESULT = {
+    "test_cases": [
+        {"name": "AI用例", "category": "normal", "request": {"method": "POST", "url": "/users"}},
+    ]
+}
+
+
+class TestAICaseCache:
+    """AI 用例缓存测试"""
+
+    def test_same_signature_calls_llm_once(self, service):
+        chain = MagicMock()
+        chain.generate_test_cases.return_value = LLM_RESULT
+        service._llm_chain = chain
+
+        first = service._generate_ai_cases(_endpoint(), ["normal"])
+        second = service._generate_ai_cases(_endpoint(name="另一个名称"), ["normal"])
+
+        assert chain.generate_test_cases.call_count == 1
+        assert [c.name for c in first] == [c.name for c in second] == ["AI用例"]
+
+    def test_mutating_cases_does_not_corrupt_cache(self, service):
+        chain = MagicMock()
+        chain.generate_test_cases.return_value = {"test_cases": [{
+            "name": "AI用例",
+            "request": {"headers": {"X-Token": "a"}, "body": {"id": 1}},
+        }]}
+        service._llm_chain = chain
+
+        first = service._generate_ai_cases(_endpoint(), ["normal"])
+        first[0].headers["X-Token"] = "changed"
+        first[0].body["id"] = 2
+        second = service._generate_ai_cases(_endpoint(), ["normal"])
+        second[0].body["id"] = 3
+        third = service._generate_ai_cases(_endpoint(), ["normal"])
+
+        assert chain.generate_test_cases.call_count == 1
+        assert third[0].headers == {"X-Token": "a"}
+        assert third[0].body == {"id": 1}
+
+    def test_different_signature_misses(self, service):
+        chain = MagicMock()
+        chain.generate_test_cases.return_value = LLM_RESULT
+        service._llm_chain = chain
+
+        service._generate_ai_cases(_endpoint(), ["normal"])
+        service._generate_ai_cases(_endpoint(path="/orders"), ["normal"])
+
+        assert chain.generate_test_cases.call_count == 2
+
+    def test_model_change_misses(self, service):
+        chain = MagicMock()
+        chain.generate_test_cases.return_value = LLM_RESULT
+        chain.provider.cache_signature = "ollama:a"
+        service._llm_chain = chain
+
+        service._generate_ai_cases(_endpoint(), ["normal"])
+        chain.provider.cache_signature = "openai:b"
+        service._generate_ai_cases(_endpoint(), ["normal"])
+
+        assert chain.generate_test_cases.call_count == 2
+
+    def test_persistent_cache_hit(self, service, mock_db):
+        mock_db.fetch_one.return_value = {
+            "response": '[{"name": "缓存用例", "category": "boundary"}]'
+        }
+        service._llm_chain = MagicMock()
+
+        cases = service._generate_ai_cases(_endpoint(), ["normal"])
+
+        service._llm_chain.generate_test_cases.assert_not_called()
+        assert [c.category for c in cases] == ["boundary"]
+
+    def test_persistent_cache_errors_treated_as_miss(self, service, mock_db):
+        mock_db.fetch_one.side_effect = RuntimeError("no such table: llm_cache")
+        mock_db.execute.side_effect = RuntimeError("no such table: llm_cache")
+        service._llm_chain = MagicMock()
+        service._llm_chain.generate_test_cases.return_value = LLM_RESULT
+
+        cases = service._generate_ai_cases(_endpoint(), ["normal"])
+
+        service._llm_chain.generate_test_cases.assert_called_once()
+        assert [c.name for c in cases] == ["AI用例"]
+
+    def test_cache_disabled(self, mock_db):
+        with patch('ai_test_tool.services.endpoint_test_generator.get_db_manager', return_value=mock_db):
+            service = EndpointTestGeneratorService(use_ai_cache=False)
+        service._llm_chain = MagicMock()
+        service._llm_chain.generate_test_cases.return_value = LLM_RESULT
+
+        service._generate_ai_cases(_endpoint(), ["normal"])
+        service._generate_ai_cases(_endpoint(), ["normal"])
+
+        assert service._llm_chain.generate_test_cases.call_count == 2
+        mock_db.fetch_one.assert_not_called()
+
+
+class TestGenerateForAllEndpoints:
+    """批量生成测试"""
+
+    def test_aggregates_results_across_workers(self, service, mock_db):
+        endpoints = [_endpoint(endpoint_id=f"ep{i}", path=f"/items/{i}") for i in range(6)]
+
+        def generate(endpoint, test_types, use_ai=True):
+            if endpoint["endpoint_id"] == "ep3":
+                raise RuntimeError("boom")
+            return ["case"] * 2
+
+        def build_rows(endpoint_id, test_cases):
+            return [(endpoint_id, i) for i in range(len(test_cases))]
+
+        with patch.object(service, '_get_all_endpoints', return_value=endpoints), \
+             patch.object(service, '_generate_test_cases', side_effect=generate), \
+             patch.object(service, '_build_case_rows', side_effect=build_rows), \
+             patch.object(service, '_insert_case_rows') as insert:
+            result = service.generate_for_all_endpoints(skip_existing=False, use_ai=False)
+
+        assert result["total_endpoints"] == 6
+        assert result["success_count"] == 5
+        assert result["failed_count"] == 1
+        assert result["total_cases_generated"] == 10
+        assert result["errors"] == ["POST /items/3: boom"]
+        # 写入线程攒批后一次写库
+        insert.assert_called_once()
+        assert len(insert.call_args[0][0]) == 10
+        # 6 个生成任务 + 1 个写入线程各自关闭连接
+        assert mock_db.close.call_count == 7
+
+    def test_writer_flushes_in_batches(self, service):
+        service.SAVE_BATCH_SIZE = 4
+        endpoints = [_endpoint(endpoint_id=f"ep{i}", path=f"/items/{i}") for i in range(5)]
+
+        with patch.object(service, '_get_all_endpoints', return_value=endpoints), \
+             patch.object(service, '_generate_test_cases', return_value=["case"] * 2), \
+             patch.object(service, '_build_case_rows', side_effect=lambda eid, cases: [eid] * len(cases)), \
+             patch.object(service, '_insert_case_rows') as insert:
+            service.generate_for_all_endpoints(skip_existing=False, use_ai=False)
+
+        assert sum(len(c[0][0]) for c in insert.call_args_list) == 10
+        assert insert.call_count == 3
+
+    def test_save_errors_reported(self, service):
+        with patch.object(service, '_get_all_endpoints', return_value=[_endpoint()]), \
+             patch.object(service, '_generate_test_cases', return_value=["case"]), \
+             patch.object(service, '_build_case_rows', return_value=[("row",)]), \
+             patch.object(service, '_insert_case_rows', side_effect=RuntimeError("locked")):
+            result = service.generate_for_all_endpoints(skip_existing=False, use_ai=False)
+
+        assert result["errors"] == ["POST /users: 保存失败: locked"]
+        assert result["success_count"] == 0
+        assert result["failed_count"] == 1
+        assert result["total_cases_generated"] == 0
+        assert result["total_cases_saved"] == 0
+
+    def test_failed_batch_retried_per_endpoint(self, service):
+        endpoints = [_endpoint(endpoint_id=f"ep{i}", path=f"/items/{i}") for i in range(3)]
+
+        def insert(rows):
+            if ("ep1",) in rows:
+                raise RuntimeError("bad row")
+
+        with patch.object(service, '_get_all_endpoints', return_value=endpoints), \
+             patch.object(service, '_generate_test_cases', return_value=["case"] * 2), \
+             patch.object(service, '_build_case_rows', side_effect=lambda eid, cases: [(eid,)] * len(cases)), \
+             patch.object(service, '_insert_case_rows', side_effect=insert) as insert_rows:
+            result = service.generate_for_all_endpoints(skip_existing=False, use_ai=False)
+
+        # 整批失败后逐个接口重试
+        assert insert_rows.call_count == 4
+        assert result["success_count"] == 2
+        assert result["failed_count"] == 1
+        assert result["total_cases_generated"] == 4
+        assert result["total_cases_saved"] == 4
+        assert result["errors"] == ["POST /items/1: 保存失败: bad row"]
+
+    def test_end_to_end_with_sqlite(self, sqlite_service):
+        sqlite_service.db.execute_many(
+            "INSERT INTO api_endpoints (endpoint_id, name, method, path, parameters) VALUES (%s, %s, %s, %s, %s)",
+            [(f"ep{i}", f"接口{i}", "GET", f"/items/{i}",
+              '[{"name": "id", "in": "query", "schema": {"type": "integer"}}]') for i in range(3)]
+        )
+
+        result = sqlite_service.generate_for_all_endpoints(use_ai=False)
+        again = sqlite_service.generate_for_all_endpoints(use_ai=False)
+
+        row = sqlite_service.db.fetch_one("SELECT COUNT(*) AS count FROM test_cases")
+        assert row["count"] == result["total_cases_generated"] > 0
+        assert again["total_endpoints"] == 0
+
+    def test_no_endpoints(self, service):
+        with patch.object(service, '_get_all_endpoints', return_value=[]):
+            result = service.generate_for_all_endpoints(skip_existing=False)
+        assert result["total_endpoints"] == 0
+        assert result["success_count"] == 0
+
+
+class TestFilterEndpointsWithoutCases:
+    """已有用例接口过滤测试"""
+
+    def test_single_query_per_chunk(self, service, mock_db):
+        endpoints = [{"endpoint_id": f"ep{i}"} for i in range(5)]
+        mock_db.fetch_all.return_value = [{"endpoint_id": "ep1"}, {"endpoint_id": "ep3"}]
+
+        result = service._filter_endpoints_without_cases(endpoints)
+
+        assert [ep["endpoint_id"] for ep in result] == ["ep0", "ep2", "ep4"]
+        assert mock_db.fetch_all.call_count == 1
+        assert mock_db.fetch_all.call_args[0][1] == ("ep0", "ep1", "ep2", "ep3", "ep4")
+
+    def test_chunks_large_inputs(self, service, mock_db):
+        service.QUERY_CHUNK_SIZE = 2
+        endpoints = [{"endpoint_id": f"ep{i}"} for i in range(5)]
+
+        assert len(service._filter_endpoints_without_cases(endpoints)) == 5
+        assert mock_db.fetch_all.call_count == 3
+
+    def test_prefix_collision_not_treated_as_covered(self, sqlite_service):
+        sqlite_service.db.execute(
+            "INSERT INTO test_cases (case_id, endpoint_id, name, method, url) VALUES (%s, %s, %s, %s, %s)",
+            ("ep10_abcd1234", "ep10", "用例", "GET", "/a")
+        )
+
+        result = sqlite_service._filter_endpoints_without_cases(
+            [{"endpoint_id": "ep1"}, {"endpoint_id": "ep10"}]
+        )
+
+        assert [ep["endpoint_id"] for ep in result] == ["ep1"]
+
+
+@pytest.fixture
+def sqlite_service(sqlite_db):
+    with patch('ai_test_tool.services.endpoint_test_generator.get_db_manager', return_value=sqlite_db):
+        yield EndpointTestGeneratorService()
+
+
+class TestSaveTestCases:
+    """测试用例保存测试（真实 SQLite）"""
+
+    def test_bulk_insert_ignores_duplicates(self, sqlite_service):
+        cases = sqlite_service._generate_rule_based_cases(_endpoint(), ["normal", "exception"])
+
+        sqlite_service._save_test_cases("ep1", cases)
+        sqlite_service._save_test_cases("ep1", cases)
+
+        rows = sqlite_service.db.fetch_all(
+            "SELECT case_id, endpoint_id, category FROM test_cases ORDER BY id"
+        )
+        assert len(rows) == len(cases)
+        assert all(r["endpoint_id"] == "ep1" and r["case_id"].startswith("ep1_") for r in rows)
+        assert rows[0]["category"] == "normal"
+
+    def test_existing_cases_skipped_before_insert(self, service, mock_db):
+        cases = service._generate_rule_based_cases(_endpoint(), ["normal", "exception"])
+        mock_db.fetch_all.return_value = [{"case_id": service._case_id("ep1", cases[0])}]
+
+        service._save_test_cases("ep1", cases + [cases[1]])
+
+        mock_db.fetch_all.assert_called_once()
+        rows = mock_db.execute_many.call_args[0][1]
+        assert [r[0] for r in rows] == [service._case_id("ep1", c) for c in cases[1:]]
+
+    def test_all_existing_skips_insert(self, service, mock_db):
+        cases = service._generate_rule_based_cases(_endpoint(), ["normal"])
+        mock_db.fetch_all.return_value = [{"case_id": service._case_id("ep1", cases[0])}]
+
+        service._save_test_cases("ep1", cases)
+
+        mock_db.execute_many.assert_not_called()
+
+
+class TestCaseIdentity:
+    """用例标识与去重测试"""
+
+    def test_case_id_format(self, service):
+        case = service._generate_rule_based_cases(_endpoint(), ["normal"])[0]
+        case_id = service._case_id("ep1", case)
+
+        assert case_id.startswith("ep1_")
+        assert len(case_id) == len("ep1_") + 8
+        assert case_id == service._case_id("ep1", case)
+
+    def test_deduplicate_by_request_shape(self, service):
+        cases = service._generate_rule_based_cases(_endpoint(), ["normal"])
+        duplicated = cases + service._generate_rule_based_cases(_endpoint(name="别名"), ["normal"])
+
+        assert len(service._deduplicate_cases(duplicated)) == len(cases)
+
+    def test_body_key_handles_nested_and_flat_bodies(self, service):
+        assert service._body_key(None) is None
+        assert service._body_key({"a": 1, "b": 2}) == service._body_key({"b": 2, "a": 1})
+        assert service._body_key({"a": {"x": 1, "y": 2}}) == service._body_key({"a": {"y": 2, "x": 1}})
+        assert service._body_key({"a": [1]}) != service._body_key({"a": [2]})
+        assert service._body_key([1, 2]) == "[1, 2]"
+
+    def test_body_key_distinguishes_bool_int_float(self, service):
+        keys = {service._body_key({"a": v}) for v in (1, True, 1.0, "1")}
+        assert len(keys) == 4
+        nested = {service._body_key({"a": {"x": v}}) for v in (1, True, 1.0)}
+        assert len(nested) == 3
+
+
+class TestParseEndpointRow:
+    """接口行解析测试"""
+
+    def test_json_fields_parsed_with_defaults(self, service):
+        endpoint = service._parse_endpoint_row({
+            "endpoint_id": "ep1",
+            "parameters": '[{"name": "id"}]',
+            "request_body": "",
+            "responses": None,
+        })
+
+        assert endpoint["parameters"] == [{"name": "id"}]
+        assert endpoint["request_body"] == {}
+        assert endpoint["responses"] is None
+
+    def test_parsed_endpoint_feeds_rule_generation(self, service):
+        row = dict(_endpoint())
+        row["parameters"] = json.dumps(row["parameters"])
+        row["request_body"] = json.dumps(row["request_body"])
+
+        cases = service._generate_rule_based_cases(service._parse_endpoint_row(row), ["normal"])
+
+        assert cases[0].query_params == {"page": "1", "keyword": "test_value"}
+        assert cases[0].body == {"age": 1}
+
+
+class TestRuleBasedCases:
+    """规则用例生成测试"""
+
+    def test_cases_do_not_share_header_dicts(self, service):
+        cases = service._generate_rule_based_cases(_endpoint(), ["normal", "boundary", "exception"])
+        cases[0].headers["Authorization"] = "Bearer x"
+
+        assert all("Authorization" not in c.headers for c in cases[1:])
+
+    def test_security_payloads(self, service):
+        cases = service._generate_rule_based_cases(_endpoint(), ["security"])
+
+        sql_case = next(c for c in cases if "sql-injection" in c.tags)
+        xss_case = next(c for c in cases if "xss" in c.tags)
+        assert sql_case.query_params == {"page": "' OR '1'='1"}
+        assert xss_case.query_params == {"keyword": "<script>alert('xss')</script>"}
+
+    def test_exception_cases_limit_params_and_invalid_method(self, service):
+        params = [{"name": f"n{i}", "in": "query", "schema": {"type": "integer"}} for i in range(5)]
+        cases = service._generate_rule_based_cases(
+            _endpoint(method="GET", parameters=params, request_body={}), ["exception"]
+        )
+
+        type_errors = [c for c in cases if "type-error" in c.tags]
+        invalid = [c for c in cases if "method-not-allowed" in c.tags]
+        assert [c.query_params for c in type_errors] == [{"n0": "not_a_number"}, {"n1": "not_a_number"}, {"n2": "not_a_number"}]
+        assert [c.method for c in invalid] == ["DELETE"]
+
+
+class TestSampleValues:
+    """示例值生成测试"""
+
+    @pytest.mark.parametrize("schema, expected", [
+        ({"type": "integer", "example": 42}, "42"),
+        ({"type": "string", "default": "abc"}, "abc"),
+        ({"type": "string", "enum": ["a", "b"]}, "a"),
+        ({"type": "integer", "format": "int64"}, "1"),
+        ({"type": "number"}, "1.0"),
+        ({"type": "boolean"}, "true"),
+        ({"type": "string", "format": "email"}, "test@example.com"),
+        ({"type": "string", "format": "uuid"}, "550e8400-e29b-41d4-a716-446655440000"),
+        ({"type": "string"}, "test_value"),
+        ({}, "test_value"),
+    ])
+    def test_sample_value_lookup(self, service, schema, expected):
+        assert service._generate_sample_value({"schema": schema}) == expected
+
+    def test_date_formats_use_given_time(self, service):
+        from datetime import datetime
+        now = datetime(2024, 5, 6, 7, 8, 9)
+
+        assert service._generate_sample_value({"schema": {"format": "date"}}, now) == "2024-05-06"
+        assert service._generate_sample_value({"schema": {"format": "date-time"}}, now) == "2024-05-06T07:08:09"
+
+    def test_request_body_samples(self, service):
+        body = service._generate_request_body({"content": {"application/json": {"schema": {
+            "properties": {
+                "name": {"type": "string"},
+                "age": {"type": "integer", "default": 18},
+                "tags": {"type": "array"},
+                "meta": {"type": "object"},
+                "blob": {"type": "file"},
+            }
+        }}}})
+
+        assert body == {"name": "test_name", "age": 18, "tags": [], "meta": {}}
+
+
+class TestCaseRow:
+    """插入行构建测试"""
+
+    def test_row_matches_json_dumps_output(self, service):
+        case = service._generate_rule_based_cases(_endpoint(), ["normal"])[0]
+        case.headers["X-名称"] = "值"
+
+        row = service._case_row("ep1_x", "ep1", case)
+
+        assert row[8] == json.dumps(case.headers, ensure_ascii=False)
+        assert row[9] == json.dumps(case.body, ensure_ascii=False)
+        assert row[10] == json.dumps(case.query_params, ensure_ascii=False)
+        assert row[12] == "{}"
+        assert row[14] == json.dumps(case.tags, ensure_ascii=False)
+
+
+class TestSparseAIAugmentation:
+    """规则用例充分时跳过 AI 测试"""
+
+    @staticmethod
+    def _rich_endpoint():
+        params = [
+            {"name": f"p{i}", "in": "query", "required": True,
+             "schema": {"type": "integer", "minimum": 0, "maximum": 10}}
+            for i in range(3)
+        ]
+        return _endpoint(parameters=params)
+
+    def test_skips_ai_when_rule_cases_sufficient(self, mock_db):
+        with patch('ai_test_tool.services.endpoint_test_generator.get_db_manager', return_value=mock_db):
+            service = EndpointTestGeneratorService(ai_only_when_sparse=True)
+
+        with patch.object(service, '_generate_ai_cases') as ai:
+            service._generate_test_cases(self._rich_endpoint())
+
+        ai.assert_not_called()
+
+    def test_calls_ai_when_category_sparse(self, mock_db):
+        with patch('ai_test_tool.services.endpoint_test_generator.get_db_manager', return_value=mock_db):
+            service = EndpointTestGeneratorService(ai_only_when_sparse=True)
+
+        with patch.object(service, '_generate_ai_cases', return_value=[]) as ai:
+            service._generate_test_cases(_endpoint(parameters=[], request_body={}))
+
+        ai.assert_called_once()
+
+    def test_disabled_by_default(self, service):
+        with patch.object(service, '_generate_ai_cases', return_value=[]) as ai:
+            service._generate_test_cases(self._rich_endpoint())
+
+        ai.assert_called_once()
+
+
+class TestLLMConcurrency:
+    """LLM 并发控制测试"""
+
+    def test_llm_calls_bounded_by_semaphore(self, mock_db):
+        import threading
+        import time
+
+        with patch('ai_test_tool.services.endpoint_test_generator.get_db_manager', return_value=mock_db):
+            service = EndpointTestGeneratorService(max_workers=6, max_llm_concurrency=2, use_ai_cache=False)
+
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def generate(**kwargs):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return LLM_RESULT
+
+        service._llm_chain = MagicMock()
+        service._llm_chain.generate_test_cases.side_effect = generate
+        endpoints = [_endpoint(endpoint_id=f"ep{i}", path=f"/items/{i}") for i in range(6)]
+
+        with patch.object(service, '_get_all_endpoints', return_value=endpoints):
+            result = service.generate_for_all_endpoints(skip_existing=False, save_to_db=False)
+
+        assert result["success_count"] == 6
+        assert service._llm_chain.generate_test_cases.call_count == 6
+        assert state["peak"] <= 2
+
+    def test_lazy_chain_created_once(self, service):
+        with patch('ai_test_tool.services.endpoint_test_generator.get_llm_provider') as get_provider, \
+             patch('ai_test_tool.services.endpoint_test_generator.TestCaseGeneratorChain') as chain_cls:
+            first = service.llm_chain
+            second = service.llm_chain
+
+        assert first is second
+        get_provider.assert_called_once()
+        chain_cls.assert_called_once()
+
+
+class TestEndpointLoading:
+    """接口加载测试（真实 SQLite）"""
+
+    @staticmethod
+    def _seed(db):
+        db.execute_many(
+            "INSERT INTO api_endpoints (endpoint_id, name, method, path, parameters) VALUES (%s, %s, %s, %s, %s)",
+            [(f"ep{i}", f"接口{i}", "GET", f"/items/{i}", '[{"name": "id", "in": "query"}]') for i in range(4)]
+        )
+        db.execute(
+            "INSERT INTO test_cases (case_id, endpoint_id, name, method, url) VALUES (%s, %s, %s, %s, %s)",
+            ("ep1_tc", "ep1", "已有用例", "GET", "/items/1")
+        )
+
+    def test_only_survivors_fully_loaded(self, sqlite_service):
+        self._seed(sqlite_service.db)
+        generated = []
+
+        def generate(endpoint, test_types, use_ai=True):
+            generated.append(endpoint)
+            return []
+
+        with patch.object(sqlite_service, '_generate_test_cases', side_effect=generate):
+            result = sqlite_service.generate_for_all_endpoints(use_ai=False)
+
+        assert result["total_endpoints"] == 3
+        assert sorted(e["endpoint_id"] for e in generated) == ["ep0", "ep2", "ep3"]
+        assert all(e["parameters"] == [{"name": "id", "in": "query"}] for e in generated)
+
+    def test_summary_rows_skip_json_columns(self, sqlite_service):
+        self._seed(sqlite_service.db)
+
+        rows = sqlite_service._get_all_endpoints(summary_only=True)
+
+        assert set(rows[0]) == {"endpoint_id", "method", "path"}
+
+    def test_by_ids_keeps_order_and_drops_missing(self, sqlite_service):
+        self._seed(sqlite_service.db)
+
+        endpoints = sqlite_service._get_endpoints_by_ids(["ep3", "missing", "ep0"])
+
+        assert [e["endpoint_id"] for e in endpoints] == ["ep3", "ep0"]
+
+    def test_explicit_ids_respect_skip_existing(self, sqlite_service):
+        self._seed(sqlite_service.db)
+
+        with patch.object(sqlite_service, '_generate_test_cases', return_value=[]):
+            result = sqlite_service.generate_for_all_endpoints(endpoint_ids=["ep1", "ep2", "ep2"], use_ai=False)
+
+        assert result["total_endpoints"] == 1
+
+
+class TestGeneratedTestCaseModel:
+    """生成用例模型测试"""
+
+    def test_no_instance_dict(self):
+        from ai_test_tool.services.endpoint_test_generator import GeneratedTestCase
+        case = GeneratedTestCase(
+            name="n", description="d", category="normal", priority="high", method="GET", url="/a"
+        )
+
+        assert not hasattr(case, "__dict__")
+        assert case.headers == {} and case.tags == []
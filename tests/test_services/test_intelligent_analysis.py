@@ -0,0 +1,370 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+IntelligentAnalysisService 服务层测试
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from ai_test_tool.routing import (
+    AnalysisResult,
+    AnalysisScenario,
+    AnalysisStrategy,
+    RouteDecision,
+    ScenarioType,
+    StrategyPriority,
+)
+from ai_test_tool.services.intelligent_analysis import IntelligentAnalysisService
+
+
+def _decision():
+    scenario = AnalysisScenario(
+        scenario_type=ScenarioType.ERROR_ANALYSIS, confidence=0.9, description="错误"
+    )
+    strategy = AnalysisStrategy(
+        strategy_id="error_basic",
+        name="基础错误分析",
+        description="",
+        scenario_types=[ScenarioType.ERROR_ANALYSIS],
+        handler=lambda ctx: {},
+        priority=StrategyPriority.HIGH,
+    )
+    return RouteDecision(scenarios=[scenario], selected_strategies=[strategy], reasoning="r")
+
+
+def _result(success=True, data=None):
+    return AnalysisResult(
+        success=success,
+        strategy_id="error_basic",
+        scenario_type=ScenarioType.ERROR_ANALYSIS,
+        data=data if data is not None else {"errors": 3},
+        error_message="" if success else "失败",
+    )
+
+
+@pytest.fixture
+def service():
+    svc = IntelligentAnalysisService()
+    svc._router = MagicMock()
+    svc._router.route_and_execute.return_value = (_decision(), [_result()])
+    return svc
+
+
+class TestAnalysisCache:
+    """分析结果缓存测试"""
+
+    def test_identical_inputs_hit_cache(self, service):
+        first = service.analyze(log_content="ERROR x", user_hint="错误")
+        second = service.analyze(log_content="ERROR x", user_hint="错误")
+
+        assert service._router.route_and_execute.call_count == 1
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert second["analysis"] == first["analysis"]
+
+    def test_caller_mutation_does_not_leak_into_cache(self, service):
+        first = service.analyze(log_content="ERROR x")
+        first["results"][0]["data"]["errors"] = 99
+        first["routing"]["reasoning"] = "changed"
+
+        second = service.analyze(log_content="ERROR x")
+        second["analysis"]["errors"] = 100
+        third = service.analyze(log_content="ERROR x")
+
+        assert third["cache_hit"] is True
+        assert third["analysis"] == {"errors": 3}
+        assert third["routing"]["reasoning"] == "r"
+        # 深拷贝保留 analysis 与 results 数据的共享关系
+        assert third["analysis"] is third["results"][third["analysis_index"]]["data"]
+
+    def test_different_inputs_miss(self, service):
+        service.analyze(log_content="ERROR x")
+        service.analyze(log_content="ERROR y")
+
+        assert service._router.route_and_execute.call_count == 2
+
+    def test_cache_option_bypasses(self, service):
+        service.analyze(log_content="ERROR x", options={"cache": False})
+        service.analyze(log_content="ERROR x", options={"cache": False})
+
+        assert service._router.route_and_execute.call_count == 2
+        # cache 选项不会透传给路由器
+        assert "cache" not in service._router.route_and_execute.call_args.kwargs["options"]
+
+    def test_failed_results_not_cached(self, service):
+        service._router.route_and_execute.return_value = (_decision(), [_result(success=False)])
+
+        service.analyze(log_content="ERROR x")
+        service.analyze(log_content="ERROR x")
+
+        assert service._router.route_and_execute.call_count == 2
+
+    def test_ttl_and_lru_eviction(self):
+        svc = IntelligentAnalysisService(cache_size=1, cache_ttl_seconds=10)
+        svc._router = MagicMock()
+        svc._router.route_and_execute.return_value = (_decision(), [_result()])
+
+        svc.analyze(log_content="a")
+        svc.analyze(log_content="b")
+        svc.analyze(log_content="a")
+        assert svc._router.route_and_execute.call_count == 3
+
+        with patch('ai_test_tool.services.intelligent_analysis.time.monotonic', return_value=1e12):
+            svc.analyze(log_content="a")
+        assert svc._router.route_and_execute.call_count == 4
+
+
+class TestDetectionCache:
+    """场景识别缓存测试"""
+
+    def test_failed_analysis_retry_reuses_detection(self, service):
+        service._router.route_and_execute.return_value = (_decision(), [_result(success=False)])
+        scenarios = _decision().scenarios
+        service._router.detector.detect.return_value = scenarios
+
+        service.analyze(log_content="ERROR x", user_hint="错误")
+        service.analyze(log_content="ERROR x", user_hint="错误")
+
+        assert service._router.route_and_execute.call_count == 2
+        service._router.detector.detect.assert_called_once()
+        assert service._router.route_and_execute.call_args.kwargs["pre_detected"] == scenarios
+
+    def test_detect_then_analyze_detects_once(self, service):
+        service._router.detector.detect.return_value = _decision().scenarios
+
+        detected = service.detect_scenarios(log_content="ERROR x")
+        service.analyze(log_content="ERROR x")
+
+        assert detected[0]["scenario_type"] == "error_analysis"
+        service._router.detector.detect.assert_called_once()
+
+    def test_cached_scenarios_are_copies(self, service):
+        service._router.detector.detect.return_value = _decision().scenarios
+
+        first = service.detect_scenarios(log_content="ERROR x")
+        service._router.route_and_execute.side_effect = lambda **kwargs: (
+            kwargs["pre_detected"][0].metadata.update(touched=True) or (_decision(), [_result(success=False)])
+        )
+        service.analyze(log_content="ERROR x")
+        service._router.route_and_execute.side_effect = None
+        service.analyze(log_content="ERROR x", options={"x": 1})
+
+        pre_detected = service._router.route_and_execute.call_args.kwargs["pre_detected"]
+        assert pre_detected[0].metadata == {}
+        assert first[0]["scenario_type"] == "error_analysis"
+
+    def test_hint_is_part_of_key(self, service):
+        service.analyze(log_content="ERROR x", user_hint="错误")
+        service.analyze(log_content="ERROR x", user_hint="安全")
+
+        assert service._router.detector.detect.call_count == 2
+
+    def test_cache_disabled_lets_router_detect(self, service):
+        service.analyze(log_content="ERROR x", options={"cache": False})
+
+        service._router.detector.detect.assert_not_called()
+        assert service._router.route_and_execute.call_args.kwargs["pre_detected"] is None
+
+
+class TestAnalyzeResponse:
+    """分析响应结构测试"""
+
+    def test_response_shape(self, service):
+        response = service.analyze(log_content="ERROR x")
+
+        assert response["success"] is True
+        assert response["routing"] == {
+            "detected_scenarios": [{"type": "error_analysis", "confidence": 0.9, "description": "错误"}],
+            "primary_scenario": "error_analysis",
+            "selected_strategies": [{"id": "error_basic", "name": "基础错误分析", "priority": "HIGH"}],
+            "reasoning": "r",
+        }
+        assert response["results"] == [{
+            "strategy_id": "error_basic",
+            "scenario_type": "error_analysis",
+            "success": True,
+            "execution_time_ms": 0,
+            "data": {"errors": 3},
+            "error_message": "",
+        }]
+        assert response["analysis"] == {"errors": 3}
+        assert response["analysis_index"] == 0
+        assert response["scenario_type"] == "error_analysis"
+
+    def test_analysis_shares_primary_result_data(self, service):
+        failed, ok = _result(success=False, data={}), _result(data={"errors": 5})
+        service._router.route_and_execute.return_value = (_decision(), [failed, ok])
+
+        response = service.analyze(log_content="ERROR x")
+
+        assert response["analysis_index"] == 1
+        assert response["analysis"] is response["results"][1]["data"]
+
+    def test_no_scenarios(self, service):
+        service._router.route_and_execute.return_value = (
+            RouteDecision(scenarios=[], selected_strategies=[]), [_result(success=False)]
+        )
+
+        response = service.analyze(log_content="hello")
+
+        assert response["routing"]["primary_scenario"] is None
+        assert "analysis" not in response
+        assert "analysis_index" not in response
+
+
+class TestAnalyzeBatch:
+    """批量分析测试"""
+
+    def test_results_keep_input_order_and_share_cache(self, service):
+        service._router.route_and_execute.side_effect = lambda **kwargs: (
+            _decision(), [_result(data={"log": kwargs["log_content"]})]
+        )
+        inputs = [{"log_content": f"ERROR {i % 3}", "task_id": "t"} for i in range(6)]
+        service.analyze_batch(inputs[:3])
+
+        results = service.analyze_batch(inputs, max_parallel=4)
+
+        assert [r["analysis"]["log"] for r in results] == [i["log_content"] for i in inputs]
+        assert all(r["cache_hit"] for r in results)
+        assert service._router.route_and_execute.call_count == 3
+
+    def test_failure_is_isolated(self, service):
+        def route(**kwargs):
+            if kwargs["log_content"] == "bad":
+                raise RuntimeError("boom")
+            return _decision(), [_result()]
+        service._router.route_and_execute.side_effect = route
+
+        results = service.analyze_batch(
+            [{"log_content": "ok"}, {"log_content": "bad"}], max_parallel=2
+        )
+
+        assert results[0]["success"] is True
+        assert results[1] == {"success": False, "error": "boom", "cache_hit": False}
+
+    def test_empty(self, service):
+        assert service.analyze_batch([]) == []
+
+
+class TestAnalyzeJson:
+    """JSON 输出测试"""
+
+    def test_matches_analyze_output(self, service):
+        import json
+        service._router.route_and_execute.return_value = (_decision(), [_result(data={1: "数字键"})])
+
+        payload = service.analyze_json(log_content="ERROR x", options={"cache": False})
+
+        assert isinstance(payload, bytes)
+        assert json.loads(payload)["analysis"] == {"1": "数字键"}
+
+    def test_stdlib_fallback(self, service):
+        import json
+        with patch('ai_test_tool.services.intelligent_analysis.orjson', None):
+            payload = service.analyze_json(log_content="ERROR x")
+
+        assert json.loads(payload)["results"][0]["strategy_id"] == "error_basic"
+
+
+class TestAnalyzePerformance:
+    """性能分析指标测试"""
+
+    def test_metrics(self, service):
+        requests = [{"response_time_ms": t} for t in range(1, 201)]
+        requests += [{"response_time_ms": 0}, {"url": "/no-time"}, {"response_time_ms": None}]
+        requests[0]["response_time_ms"] = 5000
+
+        service.analyze_performance(requests)
+
+        metrics = service._router.route_and_execute.call_args.kwargs["metrics"]
+        times = sorted([5000] + list(range(2, 201)))
+        assert metrics == {
+            "avg_latency_ms": pytest.approx(sum(times) / 200),
+            "p90_latency_ms": times[180],
+            "p99_latency_ms": times[198],
+            "slow_request_rate": pytest.approx(1 / 200),
+        }
+        assert all(isinstance(v, float) for v in metrics.values())
+
+    def test_small_sample_uses_max_for_p99(self, service):
+        service.analyze_performance([{"response_time_ms": t} for t in (100, 300, 200)])
+
+        metrics = service._router.route_and_execute.call_args.kwargs["metrics"]
+        assert metrics["p90_latency_ms"] == 300
+        assert metrics["p99_latency_ms"] == 300
+
+    def test_percentiles_match_sorted_reference(self, service):
+        import random
+        times = [float(t) for t in random.Random(42).sample(range(1, 100000), 1000)]
+        service.analyze_performance([{"response_time_ms": t} for t in times])
+
+        metrics = service._router.route_and_execute.call_args.kwargs["metrics"]
+        ordered = sorted(times)
+        assert metrics["p90_latency_ms"] == ordered[900]
+        assert metrics["p99_latency_ms"] == ordered[990]
+
+    def test_no_timings(self, service):
+        service.analyze_performance([{"url": "/a"}])
+
+        assert service._router.route_and_execute.call_args.kwargs["metrics"] == {}
+
+    def test_request_table_matches_dict_input(self, service):
+        from ai_test_tool.services import RequestTable
+        requests = [{"response_time_ms": t, "http_status": 200, "url": f"/a/{t}"} for t in range(1, 151)]
+        requests.append({"url": "/missing"})
+
+        service.analyze_performance(requests)
+        from_dicts = service._router.route_and_execute.call_args.kwargs["metrics"]
+        table = RequestTable.from_dicts(requests)
+        service._cache.clear()
+        service.analyze_performance(table)
+
+        assert service._router.route_and_execute.call_count == 2
+        from_table = service._router.route_and_execute.call_args.kwargs
+
+        assert from_table["metrics"] == from_dicts
+        # 策略仍收到原始请求列表
+        assert from_table["requests"] is requests
+        assert table.http_status[0] == 200
+        assert table.http_status[-1] == 0 and table.url[-1] == "/missing"
+        assert len(table) == 151
+
+
+class TestSharedRouter:
+    """共享路由器测试"""
+
+    def test_services_share_router(self):
+        from ai_test_tool.services import intelligent_analysis as module
+        module._create_shared_router.cache_clear()
+        with patch.object(module, 'get_llm_provider', return_value=None) as get_provider:
+            first = IntelligentAnalysisService().router
+            second = IntelligentAnalysisService().router
+
+        assert first is second
+        get_provider.assert_called_once()
+        module._create_shared_router.cache_clear()
+
+    def test_provider_failure_falls_back_to_none(self):
+        from ai_test_tool.services import intelligent_analysis as module
+        module._create_shared_router.cache_clear()
+        with patch.object(module, 'get_llm_provider', side_effect=RuntimeError("no llm")):
+            svc = IntelligentAnalysisService()
+            router = svc.router
+
+        assert router.llm_provider is None
+        assert svc._llm_provider is None
+        module._create_shared_router.cache_clear()
+
+
+class TestAvailableStrategies:
+    """可用策略列表测试"""
+
+    def test_uses_registry_cache(self, service):
+        from ai_test_tool.routing import get_registry
+        registry = get_registry()
+
+        assert service.get_available_strategies() is registry.get_strategy_dicts()
+        assert service.get_available_strategies("error_analysis") == registry.get_strategy_dicts(
+            ScenarioType.ERROR_ANALYSIS
+        )
+        assert service.get_available_strategies("unknown") == []
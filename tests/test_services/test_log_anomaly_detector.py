@@ -0,0 +1,582 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+LogAnomalyDetectorService 服务层测试
+"""
+
+import json
+import re
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from ai_test_tool.services.log_anomaly_detector import (
+    AnomalySeverity,
+    AnomalyType,
+    LogAnomaly,
+    LogAnomalyDetectorService,
+)
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.fetch_one.return_value = None
+    return db
+
+
+@pytest.fixture
+def service(mock_db):
+    with patch('ai_test_tool.services.log_anomaly_detector.get_db_manager', return_value=mock_db):
+        yield LogAnomalyDetectorService()
+
+
+def _request(request_id="r1", **overrides):
+    req = {
+        "request_id": request_id,
+        "method": "GET",
+        "url": "/api/users",
+        "http_status": 200,
+        "response_time_ms": 100,
+        "has_error": False,
+        "has_warning": False,
+        "raw_logs": "",
+        "response_body": "",
+        "body": "",
+    }
+    req.update(overrides)
+    return req
+
+
+class TestPatterns:
+    """检测模式测试"""
+
+    def test_patterns_are_precompiled(self):
+        for patterns in (
+            LogAnomalyDetectorService.ERROR_PATTERNS,
+            LogAnomalyDetectorService.WARNING_PATTERNS,
+            LogAnomalyDetectorService.SECURITY_PATTERNS,
+        ):
+            assert all(isinstance(p, re.Pattern) for p, _ in patterns)
+
+
+class TestShortId:
+    """短 ID 测试"""
+
+    def test_sixteen_hex_chars_and_stable(self):
+        from ai_test_tool.services.log_anomaly_detector import _short_id
+
+        assert re.fullmatch(r'[0-9a-f]{16}', _short_id("error:r1"))
+        assert _short_id("error:r1") == _short_id("error:r1") != _short_id("error:r2")
+
+    def test_key_separates_categories(self, service):
+        req = _request(has_error=True, has_warning=True, http_status=500)
+
+        ids = [a.anomaly_id for a in service._error_log_anomalies(req)]
+
+        assert len(ids) == 3 and len(set(ids)) == 3
+
+
+class TestFusedRules:
+    """按级别合并模式测试"""
+
+    def test_runs_merge_adjacent_same_severity(self):
+        rules = dict(LogAnomalyDetectorService._LINE_RULES)
+
+        assert [sev for _, sev in rules[AnomalyType.ERROR_LOG]] == [
+            AnomalySeverity.ERROR, AnomalySeverity.CRITICAL
+        ]
+        assert len(rules[AnomalyType.WARNING_LOG]) == 1
+        assert len(rules[AnomalyType.SECURITY_ALERT]) == 4
+
+    def test_case_sensitivity_is_kept_per_pattern(self):
+        from ai_test_tool.services.log_anomaly_detector import _fuse_by_severity
+        [(fused, _)] = _fuse_by_severity([
+            (re.compile(r'\bWARN\b'), AnomalySeverity.WARNING),
+            (re.compile(r'(?i)retry'), AnomalySeverity.WARNING),
+        ])
+
+        assert fused.search("RETRY now")
+        assert not fused.search("warn only")
+
+
+class TestLineKeywords:
+    """逐行关键词预过滤测试"""
+
+    # 每个模式一条命中样例（与模式列表顺序一致）
+    SAMPLES = [
+        "FATAL boot", "Failure in x:", "job Failed", "read timed out", "Connection Reset by peer",
+        "OOM killer", "Deadlock found",
+        "WARN disk", "API Deprecation", "Slow Request /a", "Retrying 3", "High CPU",
+        "XSS payload", "Access Denied", "Token Expired", "Too Many Attempts",
+    ]
+
+    def test_every_pattern_hit_passes_prefilter(self):
+        patterns = [
+            p for group in (
+                LogAnomalyDetectorService.ERROR_PATTERNS,
+                LogAnomalyDetectorService.WARNING_PATTERNS,
+                LogAnomalyDetectorService.SECURITY_PATTERNS,
+            ) for p, _ in group
+        ]
+        assert len(patterns) == len(self.SAMPLES)
+
+        for (pattern, sample) in zip(patterns, self.SAMPLES):
+            assert pattern.search(sample), sample
+            assert any(kw in sample.lower() for kw in LogAnomalyDetectorService.LINE_KEYWORDS), sample
+            assert LogAnomalyDetectorService._LINE_KEYWORDS_RE.search(sample.lower()), sample
+
+    def test_non_ascii_lines_skip_prefilter(self, service):
+        # 非 ASCII 行不走关键词预过滤："ſ" 在忽略大小写时匹配 "s"，但 lower() 不会转换
+        anomalies = service.detect_anomalies_from_log_content("ſql injection")
+
+        assert [a.anomaly_type for a in anomalies] == [AnomalyType.SECURITY_ALERT]
+
+
+class TestLogContent:
+    """日志内容检测测试"""
+
+    @pytest.mark.parametrize("line, expected", [
+        ("INFO started", set()),
+        ("ERROR db failed", {(AnomalyType.ERROR_LOG, AnomalySeverity.ERROR)}),
+        ("kernel: out of memory", {(AnomalyType.ERROR_LOG, AnomalySeverity.CRITICAL)}),
+        ("WARN slow query", {(AnomalyType.WARNING_LOG, AnomalySeverity.WARNING)}),
+        ("blocked XSS, retrying", {
+            (AnomalyType.WARNING_LOG, AnomalySeverity.WARNING),
+            (AnomalyType.SECURITY_ALERT, AnomalySeverity.CRITICAL),
+        }),
+        ("ERROR token expired", {
+            (AnomalyType.ERROR_LOG, AnomalySeverity.ERROR),
+            (AnomalyType.SECURITY_ALERT, AnomalySeverity.WARNING),
+        }),
+    ])
+    def test_line_categories_and_severity(self, service, line, expected):
+        anomalies = service.detect_anomalies_from_log_content(line)
+
+        assert {(a.anomaly_type, a.severity) for a in anomalies} == expected
+
+    def test_line_number_and_timestamp(self, service):
+        content = "INFO ok\n\n2024-01-02 03:04:06 ERROR db failed"
+
+        [anomaly] = service.detect_anomalies_from_log_content(content)
+
+        assert anomaly.metadata["line_number"] == 3
+        assert anomaly.timestamp.isoformat() == "2024-01-02T03:04:06"
+
+    def test_python_traceback(self, service):
+        content = (
+            "Traceback (most recent call last):\n"
+            '  File "app.py", line 1, in <module>\n'
+            "ValueError: bad\n"
+            "\n"
+            "next line"
+        )
+
+        anomalies = service.detect_anomalies_from_log_content(content)
+
+        traces = [a for a in anomalies if a.anomaly_type == AnomalyType.EXCEPTION]
+        assert len(traces) == 1
+        assert traces[0].stack_trace == content.split("\n\n")[0]
+
+
+class TestParseTimestamp:
+    """时间戳解析测试"""
+
+    @pytest.mark.parametrize("line, expected", [
+        ("2024-01-02 03:04:06 ERROR x", "2024-01-02T03:04:06"),
+        ("2024-01-02T03:04:06.123Z ERROR x", "2024-01-02T03:04:06"),
+        ("[2024-01-02 03:04:06] ERROR x", "2024-01-02T03:04:06"),
+        ("2024-0x-02 03:04:06 retry at 2024-01-03 00:00:01", "2024-01-03T00:00:01"),
+        ("2024-13-02 03:04:06 ERROR x", None),
+        ("ERROR without time", None),
+    ])
+    def test_leading_and_embedded_timestamps(self, line, expected):
+        from ai_test_tool.services.log_anomaly_detector import _parse_timestamp
+        timestamp = _parse_timestamp(line)
+
+        assert (timestamp.isoformat() if timestamp else None) == expected
+
+
+class TestLogFile:
+    """日志文件流式检测测试"""
+
+    CONTENT = (
+        "INFO ok\n"
+        "2024-01-02 03:04:06 ERROR db failed\n"
+        "Traceback (most recent call last):\n"
+        '  File "app.py", line 1, in <module>\n'
+        "ValueError: bad\n"
+        "\n"
+        "TypeError: x is undefined\n"
+        "    at run (app.js:1:2)\n"
+        "WARN disk\n"
+    )
+
+    def _key(self, anomalies):
+        return [(a.anomaly_id, a.title, a.count, a.stack_trace, a.metadata) for a in anomalies]
+
+    def test_file_matches_content(self, service, tmp_path):
+        path = tmp_path / "app.log"
+        path.write_text(self.CONTENT, encoding="utf-8")
+
+        report = service.detect_anomalies_from_file(str(path), "t1", include_ai_analysis=False)
+        from_file = report.anomalies
+        from_content = service.detect_anomalies_from_log_content(self.CONTENT)
+
+        assert from_file and self._key(from_file) == self._key(from_content)
+        # Python 与 JS 堆栈按标题聚合为一条
+        [trace] = [a for a in from_file if a.anomaly_type == AnomalyType.EXCEPTION]
+        assert trace.count == 2
+
+    def test_missing_file_raises(self, service, tmp_path):
+        with pytest.raises(OSError):
+            service.detect_anomalies_from_file(str(tmp_path / "none.log"), "t1")
+
+
+class TestExceptionAnomalies:
+    """请求异常堆栈检测测试"""
+
+    def test_traces_from_logs_and_body(self, service):
+        req = _request(
+            raw_logs="Traceback (most recent call last):\n  File \"a.py\", line 1\nKeyError: 'x'\n\nINFO",
+            response_body="java.lang.IllegalStateException\n\tat com.x.A.run(A.java:10)",
+        )
+
+        anomalies = service._exception_anomalies(req)
+
+        assert [a.title for a in anomalies] == ["异常: KeyError", "异常: Unknown Exception"]
+        assert anomalies[1].stack_trace == "at com.x.A.run(A.java:10)"
+
+    def test_content_without_trace_markers_skips_scan(self, service):
+        from ai_test_tool.services import log_anomaly_detector as module
+        with patch.object(module._StackTraceCollector, 'feed') as feed:
+            anomalies = service._exception_anomalies(_request(raw_logs="ValueError: bad\nINFO ok"))
+
+        assert anomalies == []
+        feed.assert_not_called()
+
+
+class TestStackTraceCollector:
+    """逐行堆栈收集测试"""
+
+    def _collect(self, content):
+        from ai_test_tool.services.log_anomaly_detector import _StackTraceCollector
+        collector = _StackTraceCollector()
+        for line in content.split("\n"):
+            collector.feed(line)
+        return collector.finish()
+
+    def test_js_trailing_frame_without_newline_is_dropped(self):
+        content = "Error: y\n    at a (a.js:1:1)\n   \n    at b (b.js:2:2)"
+
+        assert self._collect(content) == ["Error: y\n    at a (a.js:1:1)\n"]
+
+    def test_js_header_without_frames_is_ignored(self):
+        assert self._collect("Error: bad\n\n    at b (b.js:2:2)") == []
+
+    def test_java_trace(self):
+        content = "boom\n\tat com.x.A.run(A.java:10)\nnext\n\nother"
+
+        # 与原正则一致：从首个帧开始，到空行为止
+        assert self._collect(content) == ["at com.x.A.run(A.java:10)\nnext"]
+
+
+class TestDetectFromTask:
+    """任务请求流式检测测试"""
+
+    def _requests(self):
+        reqs = [_request(f"r{i}", url=f"/api/a?i={i}", http_status=500, response_time_ms=100) for i in range(6)]
+        reqs[0].update(has_error=True, raw_logs="Error: boom\n    at f (a.js:1:1)\n", response_time_ms=40000)
+        reqs.append(_request("s", body="sql injection"))
+        return reqs
+
+    def test_streams_rows_in_single_pass(self, service, mock_db):
+        reqs = self._requests()
+        fed = []
+
+        def rows():
+            for req in reqs:
+                fed.append(req["request_id"])
+                yield req
+        mock_db.fetch_iter.return_value = rows()
+
+        report = service.detect_anomalies_from_task("t1", include_ai_analysis=False)
+
+        mock_db.fetch_all.assert_not_called()
+        assert mock_db.fetch_iter.call_args.args[1] == ("t1",)
+        assert fed == [r["request_id"] for r in reqs]
+        assert {a.anomaly_type for a in report.anomalies} == {
+            AnomalyType.ERROR_LOG, AnomalyType.EXCEPTION, AnomalyType.HIGH_LATENCY,
+            AnomalyType.TIMEOUT, AnomalyType.SECURITY_ALERT, AnomalyType.ERROR_RATE_SPIKE,
+        }
+
+    def test_matches_per_detector_passes(self, service):
+        reqs = self._requests()
+        separate = []
+        for detect in (
+            service._detect_error_logs, service._detect_exceptions, service._detect_performance_anomalies,
+            service._detect_security_anomalies, service._detect_error_rate_anomalies,
+        ):
+            separate.extend(detect(reqs))
+
+        streamed = service._detect_anomalies_from_requests(iter(reqs))
+
+        key = lambda anomalies: [(a.anomaly_id, a.title, a.count) for a in anomalies]
+        assert key(streamed) == key(service._aggregate_anomalies(separate))
+
+
+class TestPerformanceAnomalies:
+    """性能异常检测测试"""
+
+    def test_slow_and_timeout_in_request_order(self, service):
+        reqs = [_request(f"r{i}", response_time_ms=100) for i in range(20)]
+        reqs[3]["response_time_ms"] = 40000
+        reqs[7]["response_time_ms"] = 12000
+        reqs[9]["response_time_ms"] = None
+        reqs[11]["response_time_ms"] = 0
+
+        anomalies = service._detect_performance_anomalies(reqs)
+
+        assert [(a.anomaly_type, a.severity) for a in anomalies] == [
+            (AnomalyType.HIGH_LATENCY, AnomalySeverity.ERROR),
+            (AnomalyType.TIMEOUT, AnomalySeverity.ERROR),
+            (AnomalyType.HIGH_LATENCY, AnomalySeverity.ERROR),
+        ]
+        # 平均值只统计有响应时间的请求
+        avg = (40000 + 12000 + 100 * 16) / 18
+        assert anomalies[0].metadata == {
+            "response_time_ms": 40000.0, "threshold_ms": pytest.approx(avg * 3), "avg_time_ms": pytest.approx(avg)
+        }
+        assert type(anomalies[0].metadata["response_time_ms"]) is float
+
+    def test_no_timings(self, service):
+        assert service._detect_performance_anomalies([_request(response_time_ms=None)]) == []
+
+
+class TestErrorRateAnomalies:
+    """错误率异常检测测试"""
+
+    def test_groups_by_path_without_query(self, service):
+        reqs = [_request(f"a{i}", url=f"/api/a?page={i}", http_status=500) for i in range(4)]
+        reqs += [_request("a4", url="/api/a", has_error=True), _request("a5", url="/api/a")]
+        reqs += [_request(f"b{i}", url="/api/b", http_status=404) for i in range(4)]
+        reqs.append(_request("c", url="/api/a", method="POST", http_status=None))
+
+        [anomaly] = service._detect_error_rate_anomalies(reqs)
+
+        assert anomaly.affected_endpoints == ["GET /api/a"]
+        assert anomaly.severity == AnomalySeverity.CRITICAL
+        assert anomaly.metadata == {"error_rate": 5 / 6, "total_requests": 6, "error_count": 5}
+
+
+def _anomaly(anomaly_id, severity, title="t", anomaly_type=AnomalyType.ERROR_LOG, endpoint="GET /a"):
+    return LogAnomaly(
+        anomaly_id=anomaly_id,
+        anomaly_type=anomaly_type,
+        severity=severity,
+        title=title,
+        description="",
+        log_content="",
+        affected_endpoints=[endpoint],
+    )
+
+
+class TestAggregation:
+    """异常聚合测试"""
+
+    def test_merged_group_takes_most_severe_level(self, service):
+        group = [
+            _anomaly("a", AnomalySeverity.WARNING),
+            _anomaly("b", AnomalySeverity.CRITICAL),
+            _anomaly("c", AnomalySeverity.ERROR),
+        ]
+
+        [merged] = service._aggregate_anomalies(group)
+
+        assert merged.severity == AnomalySeverity.CRITICAL
+        assert merged.anomaly_id == "a"
+        assert merged.count == 3
+
+    def test_endpoints_deduplicated_in_order_and_capped(self, service):
+        group = [_anomaly(f"a{i}", AnomalySeverity.ERROR, endpoint=f"GET /e{i % 12}") for i in range(30)]
+
+        [merged] = service._aggregate_anomalies(group)
+
+        assert merged.affected_endpoints == [f"GET /e{i}" for i in range(10)]
+        assert merged.title == "t (x30)"
+        assert merged.metadata == {"occurrence_count": 30}
+
+    def test_inputs_not_modified(self, service):
+        first, second = _anomaly("a", AnomalySeverity.WARNING), _anomaly("b", AnomalySeverity.ERROR)
+
+        service._aggregate_anomalies([first, second])
+
+        assert (first.title, first.count, first.severity) == ("t", 1, AnomalySeverity.WARNING)
+        assert first.affected_endpoints == ["GET /a"]
+
+    def test_sorted_by_severity_then_count(self, service):
+        anomalies = [
+            _anomaly("w", AnomalySeverity.WARNING, title="w"),
+            _anomaly("e1", AnomalySeverity.ERROR, title="e1"),
+            _anomaly("e2", AnomalySeverity.ERROR, title="e2"),
+            _anomaly("e2b", AnomalySeverity.ERROR, title="e2"),
+            _anomaly("i", AnomalySeverity.INFO, title="i"),
+        ]
+
+        aggregated = service._aggregate_anomalies(anomalies)
+
+        assert [a.anomaly_id for a in aggregated] == ["e2", "e1", "w", "i"]
+
+
+class TestSaveReport:
+    """报告保存测试"""
+
+    def test_issues_written_as_rows(self, service, sqlite_db):
+        db = sqlite_db
+        db.execute("INSERT INTO analysis_tasks (task_id, name) VALUES (%s, %s)", ("t1", "任务"))
+        service.db = db
+        anomalies = [
+            _anomaly("a", AnomalySeverity.CRITICAL, title="内存溢出"),
+            _anomaly("b", AnomalySeverity.WARNING, title="慢查询"),
+        ]
+        report = service._create_report("t1", anomalies, None, [])
+
+        service._save_report(report)
+
+        row = db.fetch_one("SELECT issues, metadata FROM analysis_reports WHERE task_id = %s", ("t1",))
+        assert [i["id"] for i in json.loads(row["issues"])] == ["a", "b"]
+        issues = db.fetch_all(
+            "SELECT anomaly_id, severity, title, count FROM analysis_issues WHERE report_id = %s ORDER BY id",
+            (report.report_id,)
+        )
+        assert issues == [
+            {"anomaly_id": "a", "severity": "critical", "title": "内存溢出", "count": 1},
+            {"anomaly_id": "b", "severity": "warning", "title": "慢查询", "count": 1},
+        ]
+
+    def test_no_anomalies_skips_issue_insert(self, service, mock_db):
+        service._save_report(service._create_report("t1", [], None, []))
+
+        cursor = mock_db.get_cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once()
+        cursor.executemany.assert_not_called()
+
+    def test_issue_failure_rolls_back_report(self, service, sqlite_db):
+        db = sqlite_db
+        db.execute("INSERT INTO analysis_tasks (task_id, name) VALUES (%s, %s)", ("t1", "任务"))
+        db.execute("DROP TABLE analysis_issues")
+        service.db = db
+        report = service._create_report("t1", [_anomaly("a", AnomalySeverity.CRITICAL)], None, [])
+
+        with pytest.raises(Exception):
+            service._save_report(report)
+
+        assert db.fetch_all("SELECT id FROM analysis_reports") == []
+
+    def test_inline_schema_fallback(self, service, tmp_path):
+        from ai_test_tool.database.connection import DatabaseConfig, DatabaseManager
+        db = DatabaseManager(DatabaseConfig(db_path=str(tmp_path / "test.db")))
+        db._create_tables_inline()
+        service.db = db
+        report = service._create_report("t1", [_anomaly("a", AnomalySeverity.CRITICAL)], None, [])
+
+        service._save_report(report)
+
+        assert len(db.fetch_all("SELECT id FROM analysis_issues")) == 1
+        db.close()
+
+
+class TestMarkdownReport:
+    """Markdown 报告测试"""
+
+    def test_sections_limited_per_severity(self, service):
+        anomalies = [_anomaly(f"c{i}", AnomalySeverity.CRITICAL, title=f"c{i}") for i in range(12)]
+        anomalies += [_anomaly(f"w{i}", AnomalySeverity.WARNING, title=f"w{i}") for i in range(3)]
+        anomalies += [_anomaly("i", AnomalySeverity.INFO, title="info")]
+        report = service._create_report("t1", anomalies, "AI 结论", ["加索引"])
+
+        content = service._generate_markdown_report(report)
+
+        assert content.count("### c") == 10 and "### c10" not in content
+        assert "## 🟠 错误" not in content
+        assert content.count("- **w") == 3
+        assert "info" not in content
+        assert content.endswith("## 改进建议\n\n1. 加索引\n")
+
+    def test_section_layout(self, service):
+        critical = _anomaly("c", AnomalySeverity.CRITICAL, title="宕机")
+        critical.suggested_actions = ["重启"]
+        report = service._create_report(
+            "t1", [critical, _anomaly("e", AnomalySeverity.ERROR, title="失败")], None, []
+        )
+
+        content = service._generate_markdown_report(report)
+
+        assert "- 警告: 0\n\n## 🔴 严重问题\n\n### 宕机\n\n" in content
+        assert "\n\n**建议操作**:\n- 重启\n\n## 🟠 错误\n\n### 失败\n\n" in content
+        assert not content.endswith("\n\n")
+
+
+class TestJsonPayloads:
+    """JSON 序列化测试"""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_saved_report_payloads(self, service, mock_db, use_orjson):
+        import json
+        from ai_test_tool.services import log_anomaly_detector as module
+        anomalies = [_anomaly("a", AnomalySeverity.ERROR, title="数据库错误")]
+        report = service._create_report("t1", anomalies, None, ["检查连接池"])
+
+        with patch.object(module, 'orjson', module.orjson if use_orjson else None):
+            service._save_report(report)
+
+        cursor = mock_db.get_cursor.return_value.__enter__.return_value
+        params = cursor.execute.call_args.args[1]
+        assert json.loads(params[5])["error_count"] == 1
+        assert json.loads(params[6])[0]["title"] == "数据库错误"
+        assert json.loads(params[7]) == ["检查连接池"]
+        assert "检查连接池" in params[7]
+        assert json.loads(params[8]) == {"report_id": report.report_id}
+
+    def test_indented_output_matches_stdlib(self):
+        import json
+        from ai_test_tool.services.log_anomaly_detector import _dumps
+        summary = [{"title": "超时", "count": 2, "affected_endpoints": ["GET /a"]}]
+
+        assert _dumps(summary, indent=True) == json.dumps(summary, ensure_ascii=False, indent=2)
+
+
+class TestModelSlots:
+    """异常模型 __slots__ 测试"""
+
+    def test_models_have_no_instance_dict(self, service):
+        anomaly = _anomaly("a", AnomalySeverity.ERROR)
+        report = service._create_report("t1", [anomaly], None, [])
+
+        for obj in (anomaly, report):
+            assert not hasattr(obj, "__dict__")
+        assert report.recommendations == [] and anomaly.metadata == {}
+
+
+class TestSecurityAnomalies:
+    """安全异常检测测试"""
+
+    def test_first_matching_pattern_wins(self, service):
+        reqs = [_request(body="UNAUTHORIZED then XSS payload")]
+
+        anomalies = service._detect_security_anomalies(reqs)
+
+        assert len(anomalies) == 1
+        assert anomalies[0].severity == AnomalySeverity.CRITICAL
+        assert anomalies[0].title == "安全告警: XSS"
+
+    def test_matched_text_keeps_original_case(self, service):
+        [anomaly] = service._detect_security_anomalies([_request(body="got Sql Injection here")])
+
+        assert anomaly.title == "安全告警: Sql Injection"
+
+    def test_non_ascii_content_keeps_ignorecase_semantics(self, service):
+        # "ſ" 在忽略大小写时匹配 "s"，但 lower() 不会转换
+        [anomaly] = service._detect_security_anomalies([_request(body="ſql injection")])
+
+        assert anomaly.title == "安全告警: ſql injection"
+        assert anomaly.severity == AnomalySeverity.CRITICAL
@@ -0,0 +1,505 @@
+# 该文件内容使用AI生成，注意识别准确性
+"""
+ProductionMonitorService 服务层测试
+"""
+
+import json
+import threading
+
+import httpx
+import pytest
+from unittest.mock import MagicMock, patch
+
+from ai_test_tool.services.production_monitor import ProductionMonitorService
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.execute("INSERT INTO analysis_tasks (task_id, name) VALUES (%s, %s)", ("t1", "任务"))
+    return sqlite_db
+
+
+@pytest.fixture
+def service(db):
+    with patch('ai_test_tool.services.production_monitor.get_db_manager', return_value=db):
+        yield ProductionMonitorService()
+
+
+def _insert_parsed(db, request_id, method, url, body=None, http_status=200):
+    db.execute(
+        """
+        INSERT INTO parsed_requests (task_id, request_id, method, url, body, http_status, timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """,
+        ("t1", request_id, method, url, body, http_status, f"2024-01-01 00:00:{request_id[-2:]}")
+    )
+
+
+def _response(status_code=200, text='{"ok": true}', encoding="utf-8"):
+    """模拟 client.stream() 返回的流式响应"""
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = status_code
+    response.encoding = encoding
+    data = text.encode(encoding)
+    response.iter_bytes.side_effect = lambda chunk_size: iter(
+        [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    )
+    return response
+
+
+class TestExtractRequestsFromLog:
+    """日志请求提取测试"""
+
+    def test_batch_insert_with_dedup(self, service, db):
+        _insert_parsed(db, "r01", "GET", "/api/users/1")
+        _insert_parsed(db, "r02", "GET", "/api/users/2")
+        _insert_parsed(db, "r03", "GET", "/api/users/3")
+        # 与 r04 完全相同的请求只保存一次
+        _insert_parsed(db, "r04", "POST", "/api/orders", body='{"a": 1}')
+        _insert_parsed(db, "r05", "POST", "/api/orders", body='{"a": 1}')
+        _insert_parsed(db, "r06", "GET", "/api/fail", http_status=500)
+
+        result = service.extract_requests_from_log("t1", max_requests_per_endpoint=2, tags=["smoke"])
+
+        assert result == {"total": 5, "endpoints": 2, "saved": 3, "skipped": 1}
+        rows = db.fetch_all("SELECT url, tags, source, source_task_id FROM production_requests ORDER BY url")
+        assert [r["url"] for r in rows] == ["/api/orders", "/api/users/2", "/api/users/3"]
+        assert sorted(json.loads(rows[0]["tags"])) == ["api", "api/orders", "smoke"]
+        assert {(r["source"], r["source_task_id"]) for r in rows} == {("log_parse", "t1")}
+
+        # 再次提取时全部视为已存在
+        again = service.extract_requests_from_log("t1", max_requests_per_endpoint=2)
+        assert again["saved"] == 0 and again["skipped"] == 4
+
+    def test_duplicates_skipped_before_building_rows(self, service):
+        db = MagicMock()
+        rows = [{"method": "GET", "url": "/a", "body": None}] * 3 + [{"method": "GET", "url": "/a", "body": "x"}]
+        db.fetch_all.side_effect = [rows, []]
+        service.db = db
+
+        with patch.object(service, '_build_production_row', wraps=service._build_production_row) as build:
+            result = service.extract_requests_from_log("t1")
+
+        assert build.call_count == 2
+        assert (result["saved"], result["skipped"]) == (2, 2)
+
+    def test_single_existence_query_and_insert(self, service):
+        db = MagicMock()
+        db.fetch_all.side_effect = [
+            [{"method": "GET", "url": f"/api/items/{i}", "http_status": 200} for i in range(1200)],
+            [{"request_id": "x"}],
+            [],
+            [],
+        ]
+        service.db = db
+        service.QUERY_CHUNK_SIZE = 500
+
+        result = service.extract_requests_from_log("t1", max_requests_per_endpoint=2000)
+
+        # 1 次取数 + 3 次分批 IN 查询，写入只调用一次
+        assert db.fetch_all.call_count == 4
+        db.fetch_one.assert_not_called()
+        db.execute.assert_not_called()
+        # 请求一次批量写入，标签同步为一次批量删除 + 一次批量写入
+        rows_call, delete_call, tags_call = db.execute_many.call_args_list
+        assert len(rows_call.args[1]) == 1200
+        assert "DELETE FROM request_tags" in delete_call.args[0]
+        assert "INSERT INTO request_tags" in tags_call.args[0]
+        assert result["saved"] == 1200
+
+    def test_insert_failure_counts_as_skipped(self, service):
+        db = MagicMock()
+        db.fetch_all.side_effect = [[{"method": "GET", "url": "/a", "headers": "{bad"},
+                                     {"method": "GET", "url": "/b"}], []]
+        db.execute_many.side_effect = RuntimeError("locked")
+        db.execute.side_effect = RuntimeError("locked")
+        service.db = db
+
+        result = service.extract_requests_from_log("t1")
+
+        assert result["saved"] == 0
+        assert result["skipped"] == 2
+
+    def test_failed_batch_retried_row_by_row(self, service, db):
+        service.add_manual_request("GET", "/dup")
+        dup_id = db.fetch_one("SELECT request_id FROM production_requests")["request_id"]
+        rows = [service._build_production_row({"method": "GET", "url": f"/api/{i}"}, "t1") for i in range(3)]
+        rows[1] = (dup_id,) + rows[1][1:]
+
+        saved = service._insert_production_requests(rows)
+
+        assert saved == 2
+        urls = {r["url"] for r in db.fetch_all("SELECT url FROM production_requests")}
+        assert urls == {"/dup", "/api/0", "/api/2"}
+        tags = {r["request_id"] for r in db.fetch_all("SELECT request_id FROM request_tags")}
+        assert {rows[0][0], rows[2][0]} <= tags
+
+    def test_tag_sync_failure_keeps_saved_count(self, service, db):
+        rows = [service._build_production_row({"method": "GET", "url": "/api/a"}, "t1")]
+
+        from ai_test_tool.database.repository import ProductionRequestRepository
+        with patch.object(ProductionRequestRepository, 'sync_tags', side_effect=RuntimeError("locked")):
+            saved = service._insert_production_requests(rows)
+
+        assert saved == 1
+        assert db.fetch_one("SELECT COUNT(*) AS n FROM production_requests")["n"] == 1
+
+
+class TestPatterns:
+    """正则模式测试"""
+
+    def test_normalize_url(self, service):
+        assert service._normalize_url("/api/users/12/orders/7?x=1") == "/api/users/{id}/orders/{id}"
+        assert service._normalize_url("/api/v2/users") == "/api/v2/users"
+
+    def test_expected_pattern_compiled_once(self, service):
+        client = MagicMock()
+        client.stream.return_value = _response(text='{"status": "ok"}')
+        req = {"request_id": "r1", "method": "GET", "url": "/a", "expected_response_pattern": r'"status":\s*"ok"'}
+
+        results = [service._check_single_request(client, req, "http://svc", False) for _ in range(2)]
+
+        assert all(r.success for r in results)
+        assert list(service._pattern_cache) == [r'"status":\s*"ok"']
+        req["expected_response_pattern"] = "missing"
+        assert not service._check_single_request(client, req, "http://svc", False).success
+
+    @pytest.mark.parametrize("pattern, text, expected", [
+        ('"status": "ok"', '{"status": "ok"}', True),
+        ("成功", "操作成功", True),
+        ("OK", "ok", False),
+        (r"code=\d+", "code=200", True),
+        ("a.c", "abc", True),
+        ("(?i)ok", "OK", True),
+    ])
+    def test_plain_patterns_use_substring_search(self, service, pattern, text, expected):
+        matcher = service._get_matcher(pattern)
+
+        assert bool(matcher(text)) is expected
+        assert service._get_matcher(pattern) is matcher
+        is_regex = any(c in pattern for c in "\\[]().*+?{}|^$")
+        assert hasattr(matcher, "__self__") is is_regex
+
+
+class TestRequestTags:
+    """请求标签关联测试"""
+
+    def test_tag_filter_uses_join_table(self, service, db):
+        _insert_parsed(db, "r01", "GET", "/api/users/1")
+        _insert_parsed(db, "r02", "GET", "/shop/items")
+        service.extract_requests_from_log("t1", tags=["smoke"])
+        manual_id = service.add_manual_request("GET", "/health", tags=["core", "core"])
+
+        assert [r["url"] for r in service._get_enabled_requests("smoke")] == ["/api/users/1", "/shop/items"]
+        assert [r["url"] for r in service._get_enabled_requests("api")] == ["/api/users/1"]
+        assert [r["request_id"] for r in service._get_enabled_requests("core")] == [manual_id]
+        assert service._get_enabled_requests("missing") == []
+        assert len(service._get_enabled_requests()) == 3
+
+    def test_enabled_requests_headers_parsed_once(self, service, db):
+        service.add_manual_request("GET", "/a", headers={"X-名称": "值"})
+        service.add_manual_request("GET", "/b")
+        db.execute("UPDATE production_requests SET headers = %s WHERE url = %s", ("{bad", "/b"))
+        db.execute(
+            "INSERT INTO production_requests (request_id, method, url, headers) VALUES (%s, %s, %s, NULL)",
+            ("c", "GET", "/c")
+        )
+
+        rows = service._get_enabled_requests()
+
+        assert [r["headers"] for r in rows] == [{"X-名称": "值"}, {}, {}]
+
+    def test_repository_keeps_tags_in_sync(self, db):
+        from ai_test_tool.database.models import ProductionRequest
+        from ai_test_tool.database.repositories.monitoring import ProductionRequestRepository
+        repo = ProductionRequestRepository(db)
+
+        repo.create(ProductionRequest(request_id="m1", method="GET", url="/a", tags='["a", "b"]'))
+        repo.update("m1", {"tags": '["b", "c"]'})
+        repo.update("missing", {"tags": '["x"]'})
+
+        rows = db.fetch_all("SELECT request_id, tag FROM request_tags ORDER BY tag")
+        assert [(r["request_id"], r["tag"]) for r in rows] == [("m1", "b"), ("m1", "c")]
+
+        db.execute("DELETE FROM production_requests WHERE request_id = %s", ("m1",))
+        assert db.fetch_all("SELECT * FROM request_tags") == []
+
+    def test_existing_tags_backfilled_on_init(self, db):
+        db.execute(
+            "INSERT INTO production_requests (request_id, method, url, tags) VALUES (%s, %s, %s, %s)",
+            ("old", "GET", "/old", '["legacy"]')
+        )
+        db._initialized = False
+        db.init_database()
+
+        assert db.fetch_all("SELECT request_id, tag FROM request_tags") == [{"request_id": "old", "tag": "legacy"}]
+
+
+class TestBuildProductionRow:
+    """自测库行构建测试"""
+
+    def test_json_columns(self, service):
+        from ai_test_tool.services import production_monitor as module
+        module._reencode_json.cache_clear()
+        req = {"method": "GET", "url": "/api/users/1", "headers": '{"X-名称":  "值"}', "query_params": ""}
+
+        rows = [service._build_production_row(dict(req), "t1", ["smoke"]) for _ in range(3)]
+
+        assert "值" in rows[0][3]
+        assert json.loads(rows[0][3]) == {"X-名称": "值"}
+        assert rows[0][5] == "{}"
+        assert sorted(json.loads(rows[0][9])) == ["api", "api/users", "smoke"]
+        assert module._reencode_json.cache_info().hits == 2
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dict_and_missing_fields(self, service, use_orjson):
+        from ai_test_tool.services import production_monitor as module
+        with patch.object(module, 'orjson', module.orjson if use_orjson else None):
+            row = service._build_production_row(
+                {"method": "GET", "url": "/", "headers": {"a": 1}}, "t1"
+            )
+
+        assert json.loads(row[3]) == {"a": 1}
+        assert (row[5], row[9]) == ("{}", "[]")
+
+
+class TestJsonPayloads:
+    """JSON 编解码测试"""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_request_body_and_ai_analysis(self, service, use_orjson):
+        from ai_test_tool.services import production_monitor as module
+        client = MagicMock()
+        client.stream.return_value = _response()
+        req = {"request_id": "r1", "method": "POST", "url": "/a", "headers": {"X-T": "1"}}
+
+        with patch.object(module, 'orjson', module.orjson if use_orjson else None):
+            for body, key in (('{"id": 1}', "json"), ("not json", "content")):
+                service._check_single_request(client, dict(req, body=body), "http://svc", False)
+                kwargs = client.stream.call_args.kwargs
+                assert kwargs["headers"] == {"X-T": "1"}
+                assert kwargs[key] == ({"id": 1} if key == "json" else body)
+
+            result = module.HealthCheckResult("r1", False, 500, 1.0, "", ai_analysis={"原因": "异常", 1: True})
+            row = service._check_result_row("e1", result)
+
+        assert json.loads(row[7]) == {"原因": "异常", "1": True}
+        assert row[5] is None
+
+
+class TestAIValidation:
+    """AI 验证调用测试"""
+
+    @pytest.mark.parametrize("status_code, pattern, ai_called, success", [
+        (200, None, True, False),       # 仅 AI 可判定
+        (500, None, False, False),      # 状态码已失败
+        (200, "ok", False, True),       # 已命中期望模式
+        (200, "missing", False, False), # 期望模式未命中
+    ])
+    def test_skips_ai_when_cheap_checks_decide(self, service, status_code, pattern, ai_called, success):
+        client = MagicMock()
+        client.stream.return_value = _response(status_code)
+        req = {"request_id": "r1", "method": "GET", "url": "/a", "expected_response_pattern": pattern}
+
+        with patch.object(
+            service, '_ai_validate_response', return_value={"is_valid": False, "reason": "内容异常"}
+        ) as validate:
+            result = service._check_single_request(client, req, "http://svc", True)
+
+        assert validate.called is ai_called
+        assert result.success is success
+        if ai_called:
+            assert result.error_message == "内容异常"
+
+
+class TestResponseBody:
+    """响应体读取测试"""
+
+    def test_reads_only_prefix(self, service):
+        service.RESPONSE_BODY_LIMIT = 10
+        response = _response(text="中" * 100)
+
+        assert service._read_response_prefix(response) == "中" * 10
+
+    def test_short_and_non_utf8_bodies(self, service):
+        assert service._read_response_prefix(_response(text="正常", encoding="gbk")) == "正常"
+        assert service._read_response_prefix(_response(text="")) == ""
+
+    def test_read_error_returns_empty(self, service):
+        response = _response()
+        response.iter_bytes.side_effect = httpx.ReadError("reset")
+
+        assert service._read_response_prefix(response) == ""
+
+    def test_chunks_stop_at_limit(self, service):
+        service.RESPONSE_BODY_LIMIT = 3
+        chunks = iter([b"abcdef", b"ghijkl", b"never"])
+        response = _response()
+        response.iter_bytes.side_effect = lambda chunk_size: chunks
+
+        assert service._read_response_prefix(response) == "abc"
+        assert next(chunks) == b"never"
+
+
+class TestIds:
+    """ID 生成测试"""
+
+    def test_generated_ids_are_16_hex_chars(self, service):
+        execution_id = service._create_execution_record("http://svc", 0)
+        request_id = service.add_manual_request("GET", "/a")
+
+        for value in (execution_id, request_id):
+            assert len(value) == 16
+            int(value, 16)
+
+    def test_log_request_id_stays_content_addressed(self, service):
+        import hashlib
+        row = service._build_production_row({"method": "GET", "url": "/a", "body": None}, "t1")
+
+        assert row[0] == hashlib.md5(b"GET:/a:None").hexdigest()[:16]
+
+
+class TestRunHealthCheck:
+    """健康检查执行测试"""
+
+    def test_requests_run_concurrently_and_results_keep_order(self, service, db):
+        ids = [service.add_manual_request("GET", f"/api/items/{i}") for i in range(3)]
+        barrier = threading.Barrier(3, timeout=2)
+
+        def request(**kwargs):
+            barrier.wait()
+            return _response(500 if kwargs["url"].endswith("/1") else 200)
+
+        with patch('httpx.Client') as client_cls:
+            client_cls.return_value.stream.side_effect = request
+            result = service.run_health_check("http://svc", use_ai_validation=False, parallel=3)
+
+        assert (result["total"], result["healthy"], result["unhealthy"]) == (3, 2, 1)
+        # 结果顺序与请求顺序（按 url 排序）一致
+        assert [r["request_id"] for r in result["results"]] == ids
+        assert [r["success"] for r in result["results"]] == [True, False, True]
+        rows = db.fetch_all(
+            "SELECT last_check_status, consecutive_failures FROM production_requests ORDER BY url"
+        )
+        assert [(r["last_check_status"], r["consecutive_failures"]) for r in rows] == [
+            ("healthy", 0), ("unhealthy", 1), ("healthy", 0)
+        ]
+        saved = db.fetch_one(
+            "SELECT COUNT(*) AS n FROM health_check_results WHERE execution_id = %s", (result["execution_id"],)
+        )
+        assert saved["n"] == 3
+
+    def test_request_error_is_isolated(self, service):
+        service.add_manual_request("GET", "/a")
+        service.add_manual_request("GET", "/b")
+
+        def request(**kwargs):
+            if kwargs["url"].endswith("/a"):
+                raise RuntimeError("connection refused")
+            return _response()
+
+        with patch('httpx.Client') as client_cls:
+            client_cls.return_value.stream.side_effect = request
+            result = service.run_health_check("http://svc", use_ai_validation=False, parallel=1)
+
+        assert [r["error_message"] for r in result["results"]] == ["connection refused", None]
+        assert result["healthy"] == 1
+
+    def test_client_reused_across_runs_with_per_request_timeout(self, service):
+        from ai_test_tool.services import production_monitor as module
+        service.add_manual_request("GET", "/a")
+
+        with patch('httpx.Client') as client_cls:
+            client_cls.return_value.stream.return_value = _response()
+            service.run_health_check("http://svc", use_ai_validation=False, timeout_seconds=5)
+            service.run_health_check("http://svc", use_ai_validation=False, timeout_seconds=10)
+
+            client_cls.assert_called_once()
+            assert client_cls.call_args.kwargs["http2"] is module._HTTP2_AVAILABLE
+            timeouts = [c.kwargs["timeout"] for c in client_cls.return_value.stream.call_args_list]
+            assert timeouts == [5, 10]
+
+            service.close()
+            client_cls.return_value.close.assert_called_once()
+            assert service._http_client is None
+
+    def test_results_and_statuses_written_in_batches(self, service):
+        db = MagicMock()
+        db.fetch_all.return_value = [
+            {"request_id": f"r{i}", "method": "GET", "url": f"/{i}", "headers": "{}"} for i in range(5)
+        ]
+        service.db = db
+        service.QUERY_CHUNK_SIZE = 2
+
+        with patch('httpx.Client') as client_cls:
+            client_cls.return_value.stream.side_effect = (
+                lambda **kwargs: _response(500 if kwargs["url"].endswith("/0") else 200)
+            )
+            service.run_health_check("http://svc", use_ai_validation=False)
+
+        db.execute_many.assert_called_once()
+        assert [row[1] for row in db.execute_many.call_args.args[1]] == [f"r{i}" for i in range(5)]
+        updates = [c.args for c in db.execute.call_args_list if "UPDATE production_requests" in c.args[0]]
+        # 成功 4 个分 2 批，失败 1 个 1 批
+        assert [params for _, params in updates] == [("r1", "r2"), ("r3", "r4"), ("r0",)]
+        assert "consecutive_failures + 1" in updates[-1][0]
+
+
+class TestHealthSummary:
+    """健康摘要测试"""
+
+    @pytest.mark.parametrize("recent, older, trend", [
+        (10, 5, "improving"), (5, 10, "degrading"), (10, 10, "stable"),
+    ])
+    def test_rates_and_trend(self, service, recent, older, trend):
+        executions = [{"healthy_count": recent, "total_requests": 10}] * 10
+        executions += [{"healthy_count": older, "total_requests": 10}] * 10
+        executions += [{"healthy_count": 0, "total_requests": 10}] * 5
+        db = MagicMock()
+        db.fetch_all.side_effect = [executions, []]
+        service.db = db
+
+        summary = service.get_health_summary()
+
+        assert summary["avg_health_rate"] == pytest.approx((recent + older) * 10 / 250)
+        assert summary["trend"] == trend
+        assert summary["total_checks"] == 25
+
+    def test_few_or_empty_executions(self, service):
+        db = MagicMock()
+        db.fetch_all.side_effect = [[{"healthy_count": 0, "total_requests": 0}] * 3, []]
+        service.db = db
+
+        summary = service.get_health_summary()
+
+        assert (summary["avg_health_rate"], summary["trend"]) == (0, "stable")
+
+    def test_top_failures(self, service, db):
+        ids = [service.add_manual_request("GET", f"/api/{i}") for i in range(3)]
+        execution_id = service._create_execution_record("http://svc", 3)
+        rows = [(execution_id, ids[0], 0, "-1 days")] * 3 + [(execution_id, ids[1], 0, "-1 days")]
+        rows += [(execution_id, ids[1], 0, "-30 days"), (execution_id, ids[2], 1, "-1 days")]
+        db.execute_many(
+            """
+            INSERT INTO health_check_results (execution_id, request_id, success, checked_at)
+            VALUES (%s, %s, %s, datetime('now', %s))
+            """,
+            rows
+        )
+        db.execute(
+            "INSERT INTO health_check_executions (execution_id, base_url, total_requests) VALUES (%s, %s, %s)",
+            ("e2", "http://svc", 1)
+        )
+
+        summary = service.get_health_summary(days=7)
+
+        assert [(f["url"], f["failure_count"]) for f in summary["top_failures"]] == [
+            ("/api/0", 3), ("/api/1", 1)
+        ]
+        plan = db.fetch_all(
+            "EXPLAIN QUERY PLAN SELECT request_id, COUNT(*) FROM health_check_results "
+            "WHERE success = 0 AND checked_at >= %s GROUP BY request_id",
+            ("2024-01-01",)
+        )
+        assert any("idx_health_check_results_success_checked_at" in p["detail"] for p in plan)